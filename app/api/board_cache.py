@@ -0,0 +1,126 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Board artifacts kept in memory (one per date file; a new mtime replaces the entry)
+BOARD_CACHE_SIZE = int(os.getenv("BOARD_CACHE_SIZE", "8"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def dumps(obj):
+    # Compact UTF-8 bytes; orjson when installed, stdlib otherwise
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+class CachedBody:
+    """One serialized board: identity, gzip and (if available) brotli bodies,
+    each with its own strong ETag derived from the content hash."""
+
+    def __init__(self, body):
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.bodies = {"identity": body, "gzip": gzip.compress(body, GZIP_LEVEL, mtime=0)}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+        self.etags = {enc: f'"{digest}"' if enc == "identity" else f'"{digest}-{enc}"' for enc in self.bodies}
+
+    def matches(self, if_none_match):
+        # Any representation's tag (or *) means the client already has this version
+        if not if_none_match:
+            return False
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        return "*" in tags or bool(tags & set(self.etags.values()))
+
+
+def accepted_encodings(header):
+    """Codings the client accepts (q > 0) from an Accept-Encoding header."""
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def pick_encoding(entry, accept_encoding):
+    accepted = accepted_encodings(accept_encoding)
+    for enc in ("br", "gzip"):
+        if enc in entry.bodies and (enc in accepted or "*" in accepted):
+            return enc
+    return "identity"
+
+
+class BoardCache:
+    """
+    In-process LRU of board artifacts keyed by (path, mtime, size). A hit is
+    one os.stat plus a dict lookup; only a new or rewritten file is read,
+    parsed and re-serialized (compact) and compressed, once.
+    """
+
+    def __init__(self, max_entries=BOARD_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path):
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+
+    def lookup(self, path):
+        """Cached body for the file's current version, or None (cheap; no file read)."""
+        key = self._key(path)
+        with self._lock:
+            hit = self._entries.get(path)
+            if hit is not None and hit[0] == key:
+                self._entries.move_to_end(path)
+                return hit[1]
+        return None
+
+    def load(self, path):
+        key = self._key(path)
+        with open(path, "rb") as f:
+            entry = CachedBody(dumps(loads(f.read())))
+        with self._lock:
+            self._entries[path] = (key, entry)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def get(self, path):
+        return self.lookup(path) or self.load(path)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+board_cache = BoardCache()
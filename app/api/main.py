@@ -1,14 +1,29 @@
 import os
-import requests
 import json
-from fastapi import FastAPI, Query, Body
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Query, Body, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.board_cache import board_cache, pick_encoding
+from app.core.modeling.config import MODEL_VERSION
+from app.core.normalization.players import get_index
+from app.core.storage.async_db import AsyncNBARepository, dispose_engine, get_session
+from app.core.utils import http_client
 
 load_dotenv()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    # Return pooled connections on shutdown
+    await dispose_engine()
+
+
+app = FastAPI(lifespan=lifespan)
 @app.post("/run_full")
 def run_full():
     """
@@ -19,13 +34,14 @@ def run_full():
         if not api_key:
             return JSONResponse(content={"status": "error", "message": "Missing THEODDS_API_KEY in .env"}, status_code=500)
 
-        odds_url = f"https://api.the-odds-api.com/v4/sports/basketball_nba/odds?regions=us&oddsFormat=american&apiKey={api_key}"
-        odds_resp = requests.get(odds_url)
+        odds_url = "https://api.the-odds-api.com/v4/sports/basketball_nba/odds"
+        odds_params = {"regions": "us", "oddsFormat": "american", "apiKey": api_key}
+        odds_resp = http_client.cached_get(odds_url, params=odds_params, ttl=300)
         if odds_resp.status_code != 200:
             return JSONResponse(content={"status": "error", "message": f"Failed to fetch odds: {odds_resp.text}"}, status_code=500)
         odds_data = odds_resp.json()
 
-        today = str(json.loads(requests.get("http://worldtimeapi.org/api/timezone/America/New_York").text)["datetime"]).split("T")[0]
+        today = str(json.loads(http_client.get("http://worldtimeapi.org/api/timezone/America/New_York").text)["datetime"]).split("T")[0]
         board_path = f"output/daily_board_{today}.json"
         if not os.path.exists(board_path):
             return JSONResponse(content={"status": "error", "message": f"No board found for {today}"}, status_code=500)
@@ -34,39 +50,17 @@ def run_full():
 
         def enrich_market_with_odds(board, odds_data):
             """Enriches each market in board with game odds context from TheODDS API."""
-            nba_teams = [
-                "Atlanta Hawks", "Boston Celtics", "Brooklyn Nets", "Charlotte Hornets", "Chicago Bulls",
-                "Cleveland Cavaliers", "Dallas Mavericks", "Denver Nuggets", "Detroit Pistons", "Golden State Warriors",
-                "Houston Rockets", "Indiana Pacers", "Los Angeles Clippers", "Los Angeles Lakers", "Memphis Grizzlies",
-                "Miami Heat", "Milwaukee Bucks", "Minnesota Timberwolves", "New Orleans Pelicans", "New York Knicks",
-                "Oklahoma City Thunder", "Orlando Magic", "Philadelphia 76ers", "Phoenix Suns", "Portland Trail Blazers",
-                "Sacramento Kings", "San Antonio Spurs", "Toronto Raptors", "Utah Jazz", "Washington Wizards"
-            ]
             sharp_books = [
                 "circa", "pinnacle", "westgate", "draftkings", "fanduel", "betmgm", "caesars", "betonlineag",
                 "pointsbetus", "unibet", "sugarhouse", "betrivers", "barstool", "bovada", "williamhill_us"
             ]
-            player_team_map = {
-                "Cade Cunningham": "Detroit Pistons",
-                "James Harden": "Philadelphia 76ers",
-                "Tobias Harris": "Philadelphia 76ers",
-                "Evan Mobley": "Cleveland Cavaliers",
-                "Jalen Duren": "Detroit Pistons",
-                "Jarrett Allen": "Cleveland Cavaliers",
-                "Duncan Robinson": "Miami Heat",
-                "Jaylon Tyson": "Houston Rockets",
-                "Sam Merrill": "Cleveland Cavaliers",
-                "Paul Reed Jr": "Philadelphia 76ers",
-                "Ausar Thompson": "Detroit Pistons",
-                "Ron Holland": "Houston Rockets"
-            }
-            import difflib
+            players = get_index()
             for market in board.get("markets", []):
                 player = market.get("player_id")
-                team = player_team_map.get(player, None)
+                # Index lookup: the player's current team, else the market's team text
+                team = players.team_of(player) if player else None
                 if not team and "team" in market:
-                    team = difflib.get_close_matches(market["team"], nba_teams, n=1, cutoff=0.8)
-                    team = team[0] if team else None
+                    team = players.resolve_team(market["team"])
                 matched_game = None
                 if team:
                     for game in odds_data:
@@ -131,50 +125,56 @@ class PickRequest(BaseModel):
     p_hit: float
 
 @app.get("/health")
-def health():
+async def health():
     return {"status": "OK"}
 
 
 @app.get("/board")
-def board(date: str = Query(..., description="YYYY-MM-DD")):
+async def board(request: Request, date: str = Query(..., description="YYYY-MM-DD")):
     from app.core.utils.logging import logger
-    import json
     run_id = f"run_{date}"
-    model_version = "nba_v0_market_normal_001"
+    model_version = MODEL_VERSION
     logger.info(f"Board requested for {date} run_id={run_id} model_version={model_version}")
     fname = f"output/daily_board_{date}.json"
     if not os.path.exists(fname):
         return {"error": f"No board found for {date}"}
-    with open(fname, "r") as f:
-        artifact = json.load(f)
-    return artifact
+    # Memoized per file version; only a rewritten board is read and parsed (off the event loop)
+    entry = board_cache.lookup(fname) or await run_in_threadpool(board_cache.load, fname)
+    encoding = pick_encoding(entry, request.headers.get("accept-encoding"))
+    headers = {"ETag": entry.etags[encoding], "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if entry.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=entry.bodies[encoding], media_type="application/json", headers=headers)
 
 
 @app.get("/edges")
-def edges(date: str = Query(...), stat_type: str = Query(None), limit: int = Query(50)):
+async def edges(date: str = Query(...), stat_type: str = Query(None), limit: int = Query(50),
+                session: AsyncSession = Depends(get_session)):
     from app.core.utils.logging import logger
     run_id = f"run_{date}"
-    model_version = "nba_v0_market_normal_001"
+    model_version = MODEL_VERSION
     logger.info(f"Edges requested for {date} stat_type={stat_type} run_id={run_id} model_version={model_version}")
-    # TODO: Query DB for edges
-    return {"date": date, "stat_type": stat_type, "run_id": run_id, "model_version": model_version, "edges": [], "limit": limit}
+    rows = await AsyncNBARepository(session).get_edges(date, stat_type=stat_type, limit=limit)
+    return {"date": date, "stat_type": stat_type, "run_id": run_id, "model_version": model_version, "edges": rows, "limit": limit}
 
 
 @app.get("/metrics")
-def metrics(date: str = Query(...)):
+async def metrics(date: str = Query(...)):
     from app.core.utils.logging import logger
     run_id = f"run_{date}"
-    model_version = "nba_v0_market_normal_001"
+    model_version = MODEL_VERSION
     logger.info(f"Metrics requested for {date} run_id={run_id} model_version={model_version}")
     # TODO: Compute metrics
     return {"date": date, "run_id": run_id, "model_version": model_version, "metrics": {}}
 
 @app.post("/picks")
-def log_pick(pick: PickRequest = Body(...)):
-    # TODO: Log pick in DB
-    return {"status": "logged", "pick": pick}
+async def log_pick(pick: PickRequest = Body(...), session: AsyncSession = Depends(get_session)):
+    row = await AsyncNBARepository(session).store_pick(pick.model_dump())
+    return {"status": "logged", "pick": row}
 
 @app.post("/ingest/run")
-def ingest_run(date: str = Query(...)):
+async def ingest_run(date: str = Query(...)):
     # TODO: Run ingestion pipeline
     return {"status": "ingested", "date": date}
@@ -9,18 +9,19 @@ import datetime
 app = typer.Typer()
 
 @app.command("board")
-def board_today():
+def board_today(
+    devig_method: str = typer.Option(None, "--devig", help="multiplicative, additive, power or shin (default DEVIG_METHOD)"),
+    incremental: bool = typer.Option(None, "--incremental/--full", help="Recompute only props whose inputs moved (default BOARD_INCREMENTAL)"),
+):
     """Run ingestion and output board for today's NBA games."""
     from app.core.adapters.ingest_pipeline import ingest_nba_props
     from app.core.artifacts.writer import write_daily_board
     today = datetime.date.today().strftime("%Y-%m-%d")
     run_id = f"run_{today}"
-    model_version = "nba_v0_market_normal_001"
+    from app.core.modeling.config import MODEL_VERSION
+    model_version = MODEL_VERSION
     markets = ingest_nba_props(today)
-    board_data = []
-    from app.core.modeling.projection import consensus_mean
-    from app.core.pricing.odds_math import american_to_implied_prob, remove_vig
-    from app.core.modeling.config import STAT_STDEV_PRIORS
+    from app.core.modeling.board import build_board, group_quotes
     # Debug: Log normalization output
     import logging
     logging.basicConfig(level=logging.INFO)
@@ -34,53 +35,152 @@ def board_today():
     else:
         logger.warning("No markets after normalization!")
 
-    # Group by (player_id, stat_type, line_value, source) and collect both Over and Under prices
-    from collections import defaultdict
-    grouped = defaultdict(lambda: {"over": None, "under": None, "player_id": None, "stat_type": None, "line": None, "source": None})
-    for m in markets:
-        key = (m.get("player_id"), m.get("stat_type"), m.get("line_value"), m.get("source"))
-        side = m.get("side", "").lower()
-        if side in ("over", "under"):
-            grouped[key][side] = m["price_american"]
-            grouped[key]["player_id"] = m.get("player_id")
-            grouped[key]["stat_type"] = m.get("stat_type")
-            grouped[key]["line"] = m.get("line_value")
-            grouped[key]["source"] = m.get("source")
-    logger.info(f"Grouped props count: {len(grouped)}")
-    if grouped:
-        sample_key = next(iter(grouped))
-        logger.info(f"Sample grouped entry: {grouped[sample_key]}")
+    # One quote per (player, stat, line, book) with both sides, then devig and
+    # combine all books and lines into one weighted consensus row per prop
+    quotes = group_quotes(markets)
+    logger.info(f"Grouped quotes count: {len(quotes)}")
+    if quotes:
+        logger.info(f"Sample grouped quote: {quotes[0]}")
     else:
         logger.warning("No grouped props after grouping!")
-    for key, entry in grouped.items():
-        # If either over or under is present, include the prop
-        if entry["over"] is not None or entry["under"] is not None:
-            # Use whichever price is present for projection math
-            price = entry["over"] if entry["over"] is not None else entry["under"]
-            p_implied = american_to_implied_prob(price)
-            p_over, p_under = remove_vig(p_implied, 1 - p_implied)
-            stat_type = entry["stat_type"]
-            line = entry["line"]
-            mean = consensus_mean(line, p_over, stat_type)
-            board_data.append({
-                "player_id": entry["player_id"],
-                "stat_type": stat_type,
-                "line": line,
-                "source": entry["source"],
-                "over_price": entry["over"],
-                "under_price": entry["under"],
-                "projection": round(mean, 2)
-            })
+    from app.core.metrics.edge import board_edges
+    from app.core.modeling import incremental as inc
+    from app.core.modeling.combos import player_correlations
+    from app.core.storage.gamelogs import GameLogStore
+    from app.core.storage.repository import NBARepository
+    # Per-player stat correlations for combo pricing; the prior when there are no logs
+    try:
+        with GameLogStore() as store:
+            correlations = player_correlations({q["player_id"] for q in quotes}, store)
+    except Exception as e:
+        logger.warning(f"No per-player correlations, combos price on the prior: {e}")
+        correlations = {}
+    logger.info(f"Per-player correlations: {len(correlations)} players")
+    if incremental if incremental is not None else inc.BOARD_INCREMENTAL:
+        state = inc.BoardState(today)
+        board_data, edges, changed_edges, holds, stats = inc.incremental_board(
+            quotes, today, state=state, devig_method=devig_method, model_version=model_version,
+            correlations=correlations)
+        logger.info(f"Incremental board: {stats['dirty']} of {stats['props']} props recomputed, "
+                    f"{stats['dropped']} dropped")
+    else:
+        state = None
+        board_data, holds = build_board(quotes, devig_method=devig_method, correlations=correlations)
+        edges = changed_edges = board_edges(board_data, today, model_version=model_version)
+    if holds:
+        logger.info("Hold by book: " + ", ".join(f"{b}={h:.2%}" for b, h in sorted(holds.items())))
+    logger.info(f"Consensus props count: {len(board_data)}")
     write_daily_board(today, board_data, run_id, model_version)
     typer.echo(f"Board output generated for {today}")
-    # For now, create empty edges and metrics artifacts to avoid NameError
-    edges = []
+    with NBARepository() as repo:
+        repo.store_edges(changed_edges)
+        # Freeze closes for games that tipped since the last poll (CLV source)
+        closed = repo.capture_closing_lines()
+    if closed:
+        logger.info(f"Closing lines captured: {closed}")
+    if state is not None:
+        # Only after the edges are stored, so a failed write recomputes next poll
+        state.save()
+    logger.info(f"Edges computed: {len(changed_edges)} written, {len(edges)} on the board")
     metrics = {}
     from app.core.artifacts.writer import write_daily_edges, write_daily_metrics
     write_daily_edges(today, edges, run_id, model_version)
     write_daily_metrics(today, metrics, run_id, model_version)
     typer.echo(f"Artifacts generated for {today}")
 
+@app.command("quota")
+def quota(plan: bool = typer.Option(True, help="Show the refresh plan for current events")):
+    """Show TheOdds credit budget and what the next poll would fetch."""
+    from app.core.adapters.theodds import TheOddsClient
+    from app.core.adapters.quota import RequestPlanner
+    client = TheOddsClient()
+    ledger = client.ledger
+    typer.echo(f"Credits remaining: {ledger.remaining if ledger.remaining is not None else 'unknown'}")
+    typer.echo(f"Credits used: {ledger.used if ledger.used is not None else 'unknown'}")
+    typer.echo(f"Ledger updated: {ledger.state.get('updated_at') or 'never'}")
+    if not plan:
+        return
+    planner = RequestPlanner(ledger)
+    budget = planner.budget()
+    typer.echo(f"Budget for next poll: {budget if budget is not None else 'unlimited'}")
+    decisions = client.plan_requests(planner=planner)
+    for d in decisions:
+        markets = ",".join(d.markets) or "-"
+        typer.echo(f"{d.event_id} {d.commence_time} {d.action:<7} cost={d.cost} markets={markets} ({d.reason})")
+    typer.echo(f"Planned cost: {sum(d.cost for d in decisions)} credits")
+
+@app.command("replay")
+def replay(
+    date: str = typer.Option(..., help="YYYY-MM-DD"),
+    ingest: bool = typer.Option(False, help="Re-ingest the normalized outcomes into the DB"),
+):
+    """Re-normalize archived raw TheOdds payloads for a day (no network)."""
+    from app.core.storage.archive import RawArchive
+    archive = RawArchive()
+    if ingest:
+        from app.core.adapters.ingest_pipeline import iter_ingest
+        count = sum(1 for _ in iter_ingest(date, events=archive.iter_payloads(date, latest_only=True)))
+    else:
+        count = sum(1 for _ in archive.replay(date))
+    typer.echo(f"Replayed {len(archive.entries(date))} archived payloads for {date}: {count} outcomes")
+
+@app.command("maintain-lines")
+def maintain_lines(
+    retention_days: int = typer.Option(None, help="Keep raw lines this many days (default LINES_RETENTION_DAYS)"),
+    days_ahead: int = typer.Option(None, help="Create daily partitions this many days ahead"),
+):
+    """Create upcoming lines partitions, roll old lines up hourly and drop them."""
+    from app.core.storage.repository import NBARepository
+    from app.core.storage import partitions
+    with NBARepository() as repo:
+        # Capture closes before old raw lines are rolled up and dropped
+        closed = repo.capture_closing_lines()
+        created = partitions.ensure_line_partitions(
+            repo.session, days_ahead=days_ahead if days_ahead is not None else partitions.LINES_PARTITION_DAYS_AHEAD)
+        summary = partitions.compact_lines(
+            repo, retention_days=retention_days if retention_days is not None else partitions.LINES_RETENTION_DAYS)
+    typer.echo(f"Closing lines captured: {closed}")
+    typer.echo(f"Partitions created: {', '.join(created) or 'none'}")
+    typer.echo(f"Rolled up {summary['rollups']} hourly rows before {summary['cutoff']}; "
+               f"dropped partitions: {', '.join(summary['dropped_partitions']) or 'none'}; "
+               f"deleted rows: {summary['deleted_rows'] if summary['deleted_rows'] is not None else '-'}")
+
+@app.command("capture-closing")
+def capture_closing():
+    """Freeze the last pre-tip line per market/book/side for games that have started."""
+    from app.core.storage.repository import NBARepository
+    with NBARepository() as repo:
+        closed = repo.capture_closing_lines()
+    typer.echo(f"Closing lines captured: {closed}")
+
+@app.command("gamelogs-refresh")
+def gamelogs_refresh(
+    through: str = typer.Option(None, help="Last game date to pull, YYYY-MM-DD (default yesterday)"),
+    since: str = typer.Option(None, help="Force the first date (default: day after the last refresh)"),
+):
+    """Pull new balldontlie box scores into the local game-log store and rebuild the player index."""
+    from app.core.normalization.players import PlayerIndex
+    from app.core.storage.gamelogs import GameLogStore
+    with GameLogStore() as store:
+        stored = store.refresh(through=through, since=since)
+        last = store.last_refreshed()
+        index = PlayerIndex.from_store(store, aliases=PlayerIndex.load().aliases)
+    index.save()
+    typer.echo(f"Stored {stored} player-games; game logs current through {last}; {len(index)} players indexed")
+
+@app.command("init-db")
+def init_db(url: str = typer.Option(None, help="Database URL (default DATABASE_URL)")):
+    """Create or upgrade the schema by running the Alembic migrations."""
+    from alembic import command
+    from alembic.config import Config
+    from app.core.storage.repository import DATABASE_URL
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    cfg = Config(os.path.join(root, "alembic.ini"))
+    cfg.set_main_option("script_location", os.path.join(root, "migrations"))
+    cfg.attributes["database_url"] = url or DATABASE_URL
+    command.upgrade(cfg, "head")
+    typer.echo(f"Schema at head for {url or DATABASE_URL}")
+
 @app.command("pick")
 def pick_add(
     market_id: str,
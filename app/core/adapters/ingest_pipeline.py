@@ -1,66 +1,134 @@
+import os
 from app.core.adapters.theodds import TheOddsClient
-from app.core.normalization.nba_props import normalize_props
+from app.core.normalization.nba_props import iter_normalized
 from app.core.storage.repository import NBARepository
+from app.core.storage.snapshots import LineSnapshotStore
+from app.core.utils.ids import line_id, market_id as make_market_id
 from app.core.utils.logging import logger
-from datetime import datetime
+from app.core.utils.time import utc_now
+from datetime import datetime, timezone
 
+# Delta mode: markets insert-if-missing and only lines whose price/point moved are written
+INGEST_DELTA = os.getenv("INGEST_DELTA", "1") == "1"
+# Lines buffered before a DB write
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "500"))
 
-def ingest_nba_props(date):
-    def parse_dt(val):
-        if isinstance(val, str):
-            # Handle 'Z' UTC suffix
-            if val.endswith('Z'):
-                val = val[:-1] + '+00:00'
-            try:
-                return datetime.fromisoformat(val)
-            except Exception:
-                return None
-        return val
 
-    client = TheOddsClient()
+def parse_dt(val):
+    if isinstance(val, str):
+        # Handle 'Z' UTC suffix
+        if val.endswith('Z'):
+            val = val[:-1] + '+00:00'
+        try:
+            return datetime.fromisoformat(val)
+        except Exception:
+            return None
+    return val
+
+
+def iter_ingest(date, delta=INGEST_DELTA, snapshots=None, events=None, batch_size=INGEST_BATCH_SIZE):
+    """
+    Streaming ingest: event -> normalized outcomes -> batched DB writes.
+
+    Yields the CLI market dict for every outcome as it is processed. Markets and
+    lines are flushed every `batch_size` lines, so the first rows land in the DB
+    while later events are still downloading; the run commits once at the end.
+    `events` overrides the live
+    TheOdds fetch (e.g. archived payloads for a backfill).
+    """
     repo = NBARepository()
-    raw_props = client.fetch_odds(date)
-    if raw_props:
-        from app.core.utils.ids import generate_id
-        normalized = normalize_props(raw_props)
-        markets = []
-        lines = []
-        for m in normalized:
-            market_id = generate_id()
-            market_db = {
-                "id": market_id,
-                "game_id": m["game_id"],
-                "player_id": m["player_id"],
-                "stat_type": m["stat_type"],
-                "created_at": parse_dt(m.get("timestamp"))
-            }
-            # For CLI/board, include extra fields
-            market_cli = dict(market_db)
-            market_cli["price_american"] = m["price_american"]
-            market_cli["source"] = m["source"]
-            market_cli["line_value"] = m["line_value"]
-            market_cli["side"] = m["side"]  # PATCH: include side for CLI grouping
-            markets.append(market_cli)
-            lines.append({
-                "id": generate_id(),
-                "market_id": market_id,
-                "source": m["source"],
-                "side": m["side"],
-                "line_value": m["line_value"],
-                "price_american": m["price_american"],
-                "timestamp": parse_dt(m.get("timestamp")),
-                "latency_ms": m.get("latency_ms", 0)
-            })
-        repo.store_markets([{
-            "id": m["id"],
-            "game_id": m["game_id"],
-            "player_id": m["player_id"],
-            "stat_type": m["stat_type"],
-            "created_at": m["created_at"]
-        } for m in markets])
+    repo.ensure_line_partitions()
+    if events is None:
+        events = TheOddsClient().iter_odds(date)
+    if delta and snapshots is None:
+        snapshots = LineSnapshotStore()
+    observed_at = utc_now().replace(tzinfo=None)
+    market_ids = {}
+    new_markets = []
+    lines = []
+    totals = {"events": 0, "outcomes": 0, "markets": 0, "lines": 0}
+
+    def flush():
+        repo.store_markets(new_markets, on_conflict="nothing" if delta else "update")
         repo.store_lines(lines)
-        repo.store_raw_response(raw_props, date)
-        logger.info(f"Ingestion complete for {date}: {len(markets)} markets, {len(lines)} lines")
-        return markets
-    logger.error(f"No data ingested for {date}")
-    return []
+        totals["markets"] += len(new_markets)
+        totals["lines"] += len(lines)
+        new_markets.clear()
+        lines.clear()
+
+    # One transaction per ingest; batches are written as they fill but only
+    # committed (and the delta snapshot saved) once the whole run succeeds
+    with repo, repo.transaction():
+        if delta:
+            # A snapshot taken against another (or a since recreated) DB would skip lines it never saw
+            snapshots.validate(repo.database_url(), repo.existing_market_ids)
+        for event in events:
+            totals["events"] += 1
+            repo.store_raw_response(event, date)
+            for m in iter_normalized([event]):
+                market_key = (m["game_id"], m["player_id"], m["stat_type"])
+                market_id = market_ids.get(market_key)
+                if market_id is None:
+                    # Deterministic id: reruns and retries upsert onto the same market row.
+                    # Always written (DO NOTHING in delta mode), so the DB never depends on the snapshot
+                    market_id = make_market_id(*market_key)
+                    new_markets.append({
+                        "id": market_id,
+                        "game_id": m["game_id"],
+                        "player_id": m["player_id"],
+                        "stat_type": m["stat_type"],
+                        "created_at": parse_dt(m.get("timestamp"))
+                    })
+                    if delta:
+                        snapshots.set_market_id(m, market_id, m.get("commence_time"))
+                    market_ids[market_key] = market_id
+                totals["outcomes"] += 1
+                write_line = True
+                if delta:
+                    write_line = snapshots.changed(m)
+                    if write_line:
+                        snapshots.update(m)
+                timestamp = parse_dt(m.get("last_update")) or observed_at
+                if timestamp.tzinfo is not None:
+                    timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+                if write_line:
+                    lines.append({
+                        "id": line_id(market_id, m["source"], m["side"], m["line_value"],
+                                      m["price_american"], timestamp.isoformat()),
+                        "market_id": market_id,
+                        "source": m["source"],
+                        "side": m["side"],
+                        "line_value": m["line_value"],
+                        "price_american": m["price_american"],
+                        "timestamp": timestamp,
+                        "latency_ms": m.get("latency_ms", 0)
+                    })
+                    if len(lines) >= batch_size:
+                        flush()
+                # For CLI/board, include extra fields
+                yield {
+                    "id": market_id,
+                    "game_id": m["game_id"],
+                    "player_id": m["player_id"],
+                    "player_key": m.get("player_key"),
+                    "stat_type": m["stat_type"],
+                    "created_at": parse_dt(m.get("timestamp")),
+                    "price_american": m["price_american"],
+                    "source": m["source"],
+                    "line_value": m["line_value"],
+                    "side": m["side"],  # PATCH: include side for CLI grouping
+                    "last_update": timestamp,
+                }
+        if new_markets or lines:
+            flush()
+    if delta and totals["markets"] + totals["lines"]:
+        snapshots.save()
+    if totals["events"]:
+        logger.info(f"Ingestion complete for {date}: {totals['events']} events, {totals['outcomes']} outcomes, "
+                    f"{totals['markets']} markets, {totals['lines']} lines written")
+    else:
+        logger.error(f"No data ingested for {date}")
+
+
+def ingest_nba_props(date, delta=INGEST_DELTA, snapshots=None):
+    return list(iter_ingest(date, delta=delta, snapshots=snapshots))
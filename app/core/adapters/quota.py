@@ -0,0 +1,180 @@
+import json
+import os
+import threading
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from app.core.utils.logging import logger
+from app.core.utils.time import utc_now
+
+QUOTA_LEDGER_PATH = os.getenv("THEODDS_QUOTA_LEDGER", "output/theodds_quota.json")
+# Credits held back for manual runs / end of month
+QUOTA_RESERVE = int(os.getenv("THEODDS_QUOTA_RESERVE", "50"))
+# Optional hard cap on credits one poll may spend (0 = no cap)
+MAX_CREDITS_PER_RUN = int(os.getenv("THEODDS_MAX_CREDITS_PER_RUN", "0"))
+# Events further than this from tip only refresh CORE_MARKETS
+FAR_FROM_TIP_HOURS = float(os.getenv("THEODDS_FAR_FROM_TIP_HOURS", "12"))
+
+# Combo props (PRA, P+R, P+A, R+A); each costs credits like any other market, so
+# they roughly double a near-tip refresh: opt in, and they are the first thing a tight budget drops
+COMBO_MARKETS = ("player_points_rebounds_assists", "player_points_rebounds", "player_points_assists",
+                 "player_rebounds_assists")
+FETCH_COMBO_MARKETS = os.getenv("THEODDS_COMBO_MARKETS", "0") == "1"
+FULL_MARKETS = ("player_points", "player_assists", "player_rebounds", "player_threes") + (
+    COMBO_MARKETS if FETCH_COMBO_MARKETS else ())
+CORE_MARKETS = ("player_points",)
+REGIONS = ("us",)
+HISTORY_LIMIT = 500
+
+
+def parse_commence(val):
+    if not val:
+        return None
+    if val.endswith("Z"):
+        val = val[:-1] + "+00:00"
+    try:
+        dt = datetime.fromisoformat(val)
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def request_cost(markets, regions=REGIONS):
+    # TheOdds bills one credit per market per region on event odds
+    return len(markets) * len(regions)
+
+
+class QuotaLedger:
+    """Persisted view of TheOdds credit usage, fed from response headers."""
+
+    def __init__(self, path=QUOTA_LEDGER_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.state = {"remaining": None, "used": None, "updated_at": None, "history": []}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self.state.update(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable quota ledger {path}: {e}")
+
+    @property
+    def remaining(self):
+        return self.state["remaining"]
+
+    @property
+    def used(self):
+        return self.state["used"]
+
+    def record(self, headers, endpoint=None):
+        remaining = headers.get("x-requests-remaining")
+        used = headers.get("x-requests-used")
+        if remaining is None and used is None:
+            return
+        with self._lock:
+            now = utc_now().isoformat()
+            if remaining is not None:
+                self.state["remaining"] = int(float(remaining))
+            if used is not None:
+                self.state["used"] = int(float(used))
+            self.state["updated_at"] = now
+            self.state["history"].append({
+                "ts": now,
+                "endpoint": endpoint,
+                "cost": int(float(headers.get("x-requests-last", 0) or 0)),
+                "remaining": self.state["remaining"],
+                "used": self.state["used"],
+            })
+            self.state["history"] = self.state["history"][-HISTORY_LIMIT:]
+            self._save()
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class PlanDecision:
+    event_id: str
+    commence_time: str
+    action: str  # "refresh" or "skip"
+    markets: tuple
+    cost: int
+    reason: str
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class RequestPlanner:
+    """Decides which events and markets a poll refreshes.
+
+    Tipped events are skipped, events far from tip refresh only CORE_MARKETS,
+    and if the plan still exceeds the available budget the furthest events are
+    downgraded and then skipped until it fits.
+    """
+
+    def __init__(self, ledger=None, reserve=QUOTA_RESERVE, max_credits=MAX_CREDITS_PER_RUN,
+                 far_hours=FAR_FROM_TIP_HOURS, now=None):
+        self.ledger = ledger
+        self.reserve = reserve
+        self.max_credits = max_credits
+        self.far_hours = far_hours
+        self.now = now
+
+    def budget(self):
+        limits = []
+        if self.ledger is not None and self.ledger.remaining is not None:
+            limits.append(max(0, self.ledger.remaining - self.reserve))
+        if self.max_credits:
+            limits.append(self.max_credits)
+        return min(limits) if limits else None
+
+    def plan(self, events):
+        now = self.now or utc_now()
+        decisions = []
+        for event in events:
+            commence = parse_commence(event.get("commence_time"))
+            if commence is not None and commence <= now:
+                decisions.append(PlanDecision(event["id"], event.get("commence_time"), "skip", (), 0, "tipped"))
+                continue
+            if commence is not None and commence - now > timedelta(hours=self.far_hours):
+                markets, reason = CORE_MARKETS, f"far from tip (>{self.far_hours:g}h)"
+            else:
+                markets, reason = FULL_MARKETS, "near tip"
+            decisions.append(PlanDecision(event["id"], event.get("commence_time"), "refresh",
+                                          markets, request_cost(markets), reason))
+        budget = self.budget()
+        if budget is not None:
+            self._fit_budget(decisions, budget)
+        return decisions
+
+    def _fit_budget(self, decisions, budget):
+        # Furthest-from-tip first: drop combo markets, downgrade to core markets, then skip
+        active = [d for d in decisions if d.action == "refresh"]
+        active.sort(key=lambda d: d.commence_time or "", reverse=True)
+        total = sum(d.cost for d in active)
+        for d in active:
+            if total <= budget:
+                return
+            singles = tuple(m for m in d.markets if m not in COMBO_MARKETS)
+            if singles != d.markets:
+                saved = d.cost - request_cost(singles)
+                d.markets, d.cost, d.reason = singles, request_cost(singles), "budget: combos dropped"
+                total -= saved
+        for d in active:
+            if total <= budget:
+                return
+            if d.markets != CORE_MARKETS:
+                saved = d.cost - request_cost(CORE_MARKETS)
+                d.markets, d.cost, d.reason = CORE_MARKETS, request_cost(CORE_MARKETS), "budget: downgraded"
+                total -= saved
+        for d in active:
+            if total <= budget:
+                return
+            total -= d.cost
+            d.action, d.markets, d.cost, d.reason = "skip", (), 0, "budget: skipped"
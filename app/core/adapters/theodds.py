@@ -1,53 +1,149 @@
 import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import requests
 from datetime import datetime
+from app.core.adapters.quota import FULL_MARKETS, QuotaLedger, RequestPlanner
+from app.core.modeling.config import RATE_LIMITS
+from app.core.utils import http_client
 from app.core.utils.logging import logger
+from app.core.utils.ratelimit import TokenBucket
 
 THEODDS_API_KEY = os.getenv("THEODDS_API_KEY")
 BASE_URL = "https://api.the-odds-api.com/v4/sports/basketball_nba/odds"
+EVENTS_URL = "https://api.the-odds-api.com/v4/sports/basketball_nba/events"
+EVENT_ODDS_URL = "https://api.the-odds-api.com/v4/sports/basketball_nba/events/{event_id}/odds"
+PLAYER_MARKETS = ",".join(FULL_MARKETS)
+
+FETCH_WORKERS = int(os.getenv("THEODDS_FETCH_WORKERS", "4"))
+MAX_RETRIES = 3
+BACKOFF_BASE_SEC = 0.5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Cache TTLs (seconds) so repeat polls inside a window do not spend quota
+EVENTS_CACHE_TTL = int(os.getenv("THEODDS_EVENTS_TTL", "300"))
+ODDS_CACHE_TTL = int(os.getenv("THEODDS_ODDS_TTL", "60"))
+
+# One bucket per process: the budget belongs to the API key, not the client instance
+_rate_limiter = TokenBucket(RATE_LIMITS["theodds"])
+
 
 class TheOddsClient:
-    def __init__(self, api_key=THEODDS_API_KEY):
+    def __init__(self, api_key=THEODDS_API_KEY, max_workers=FETCH_WORKERS, rate_limiter=None, ledger=None):
         self.api_key = api_key
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiter or _rate_limiter
+        self.ledger = ledger or QuotaLedger()
 
-    def get_event_ids(self):
-        # Fetch NBA event IDs for today/upcoming
-        events_url = "https://api.the-odds-api.com/v4/sports/basketball_nba/events"
+    def _get(self, url, params, ttl=0):
+        # Rate-limited GET with exponential backoff on 429/5xx and connection errors.
+        # Fresh cache hits return before spending a rate-limit token.
+        if ttl > 0:
+            cached = http_client.get_fresh(url, params=params)
+            if cached is not None:
+                return cached
+        for attempt in range(MAX_RETRIES + 1):
+            self.rate_limiter.acquire()
+            try:
+                if ttl > 0:
+                    resp = http_client.cached_get(url, params=params, ttl=ttl)
+                else:
+                    resp = http_client.get(url, params=params)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == MAX_RETRIES:
+                    raise
+                logger.warning(f"Request error for {url}: {e}; retrying")
+                time.sleep(self._backoff(attempt))
+                continue
+            if not getattr(resp, "from_cache", False):
+                self.ledger.record(resp.headers, url)
+            if resp.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                return resp
+            retry_after = resp.headers.get("Retry-After")
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else self._backoff(attempt)
+            logger.warning(f"{url} returned {resp.status_code}; retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+    def _backoff(self, attempt):
+        return BACKOFF_BASE_SEC * (2 ** attempt) + random.uniform(0, BACKOFF_BASE_SEC)
+
+    def get_events(self):
+        # Fetch NBA events (id, teams, commence_time) for today/upcoming
         params = {
             "apiKey": self.api_key,
             "dateFormat": "iso",
         }
-        resp = requests.get(events_url, params=params)
+        resp = self._get(EVENTS_URL, params, ttl=EVENTS_CACHE_TTL)
         logger.info(f"NBA events response: {resp.status_code}")
         if resp.status_code == 200:
-            return [event["id"] for event in resp.json()]
+            return resp.json()
         else:
             logger.error(f"Failed to fetch NBA events: {resp.text}")
             return []
 
-    def fetch_odds(self, date: str):
-        # Fetch player prop odds for all NBA events for the date
-        event_ids = self.get_event_ids()
-        if not event_ids:
+    def get_event_ids(self):
+        return [event["id"] for event in self.get_events()]
+
+    def plan_requests(self, events=None, planner=None):
+        planner = planner or RequestPlanner(self.ledger)
+        return planner.plan(self.get_events() if events is None else events)
+
+    def fetch_event_odds(self, event_id, markets=PLAYER_MARKETS):
+        params = {
+            "apiKey": self.api_key,
+            "regions": "us",
+            "markets": markets,
+            "dateFormat": "iso",
+            "oddsFormat": "american",
+        }
+        try:
+            resp = self._get(EVENT_ODDS_URL.format(event_id=event_id), params, ttl=ODDS_CACHE_TTL)
+        except requests.RequestException as e:
+            logger.error(f"Failed to fetch odds for event {event_id}: {e}")
+            return None
+        logger.info(f"Event odds {event_id} response: {resp.status_code}")
+        if resp.status_code == 200:
+            return resp.json() or None
+        logger.error(f"Failed to fetch odds for event {event_id}: {resp.text}")
+        return None
+
+    def iter_odds(self, date: str, concurrent: bool = True, plan: bool = True):
+        # Yield event odds payloads in event order as they arrive.
+        # With plan=True the quota planner chooses which events/markets to spend credits on.
+        events = self.get_events()
+        if not events:
             logger.error("No NBA events found for odds fetch.")
-            return []
-        all_props = []
-        markets = "player_points,player_assists,player_rebounds,player_threes"
-        for event_id in event_ids:
-            odds_url = f"https://api.the-odds-api.com/v4/sports/basketball_nba/events/{event_id}/odds"
-            params = {
-                "apiKey": self.api_key,
-                "regions": "us",
-                "markets": markets,
-                "dateFormat": "iso",
-                "oddsFormat": "american",
-            }
-            resp = requests.get(odds_url, params=params)
-            logger.info(f"Event odds {event_id} response: {resp.status_code}")
-            if resp.status_code == 200:
-                data = resp.json()
+            return
+        if plan:
+            decisions = self.plan_requests(events)
+            jobs = [(d.event_id, ",".join(d.markets)) for d in decisions if d.action == "refresh"]
+            skipped = len(decisions) - len(jobs)
+            logger.info(f"Quota plan: {len(jobs)} events refreshed, {skipped} skipped, "
+                        f"{sum(d.cost for d in decisions)} credits, remaining={self.ledger.remaining}")
+        else:
+            jobs = [(event["id"], PLAYER_MARKETS) for event in events]
+        if not (concurrent and self.max_workers > 1):
+            for job in jobs:
+                data = self.fetch_event_odds(*job)
                 if data:
-                    all_props.append(data)
-            else:
-                logger.error(f"Failed to fetch odds for event {event_id}: {resp.text}")
-        return all_props
+                    yield data
+            return
+        # Bounded in-flight window keeps memory flat on large backfills
+        window = self.max_workers * 2
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = deque()
+            for job in jobs:
+                pending.append(pool.submit(self.fetch_event_odds, *job))
+                if len(pending) >= window:
+                    data = pending.popleft().result()
+                    if data:
+                        yield data
+            while pending:
+                data = pending.popleft().result()
+                if data:
+                    yield data
+
+    def fetch_odds(self, date: str, concurrent: bool = True, plan: bool = True):
+        # Fetch player prop odds for all NBA events for the date, in event order
+        return list(self.iter_odds(date, concurrent=concurrent, plan=plan))
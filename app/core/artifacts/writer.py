@@ -30,7 +30,9 @@ def write_daily_edges(date, edges, run_id, model_version):
             writer.writeheader()
         return
     with open(fname, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=["run_id", "model_version"] + list(edges[0].keys()))
+        # Edge rows carry their own model_version; don't repeat the column
+        columns = ["run_id", "model_version"]
+        writer = csv.DictWriter(f, fieldnames=columns + [k for k in edges[0] if k not in columns])
         writer.writeheader()
         for edge in edges:
             edge_row = {"run_id": run_id, "model_version": model_version}
@@ -0,0 +1,85 @@
+import os
+from datetime import timedelta
+from zoneinfo import ZoneInfo
+import numpy as np
+import pandas as pd
+from app.core.modeling.board import build_board, group_quotes
+from app.core.modeling.distribution import count_probs
+from app.core.pricing.odds_math import american_to_implied_prob_array
+
+# Pick logs are dated in US time; a 7:30pm ET tip is the next day in UTC
+GAME_DATE_TZ = os.getenv("GAME_DATE_TZ", "America/New_York")
+
+
+def game_date_bounds(dates):
+    """Naive-UTC [start, end) covering the local game days in `dates`."""
+    tz = ZoneInfo(GAME_DATE_TZ)
+    dates = sorted(dates)
+    start = pd.Timestamp(dates[0]).tz_localize(tz).tz_convert("UTC").tz_localize(None)
+    end = pd.Timestamp(dates[-1] + timedelta(days=1)).tz_localize(tz).tz_convert("UTC").tz_localize(None)
+    return start.to_pydatetime(), end.to_pydatetime()
+
+
+def closing_consensus(closing_rows, devig_method=None):
+    """
+    One closing row per (game date, player, stat) from captured closing
+    lines, through the same devig + weighted consensus as the live board:
+    columns date, player_id, stat_type, close_line (main closing line) and
+    close_mean (consensus mean at the close).
+    """
+    columns = ["date", "player_id", "stat_type", "close_line", "close_mean"]
+    if not closing_rows:
+        return pd.DataFrame(columns=columns)
+    tz = ZoneInfo(GAME_DATE_TZ)
+    by_date = {}
+    for r in closing_rows:
+        day = pd.Timestamp(r.commence_time).tz_localize("UTC").tz_convert(tz).date()
+        by_date.setdefault(day, []).append({
+            "id": r.market_id, "player_id": r.player_id, "stat_type": r.stat_type, "side": r.side,
+            "line_value": r.line_value, "source": r.source, "price_american": r.price_american,
+            "last_update": r.observed_at,
+        })
+    frames = []
+    for day, markets in by_date.items():
+        # Weight books by freshness as of the latest close that day
+        now = max(m["last_update"] for m in markets)
+        rows, _ = build_board(group_quotes(markets), devig_method=devig_method, now=now)
+        frames.append(pd.DataFrame({
+            "date": day,
+            "player_id": [r["player_id"] for r in rows],
+            "stat_type": [r["stat_type"] for r in rows],
+            "close_line": [r["line"] for r in rows],
+            "close_mean": [r["projection"] for r in rows],
+        }, columns=columns))
+    return pd.concat(frames, ignore_index=True)
+
+
+def compute_clv(picks, close):
+    """
+    Line and no-vig price CLV for pick rows (date, player_id, stat_type,
+    prop_line, recommended_side, price) against closing_consensus output, in
+    one join. Positive means the pick beat the close.
+
+    - clv: closing line minus pick line (sign flipped for unders)
+    - clv_price: the close's fair win probability at the pick's line (pushes
+      excluded, on the stat's count model) minus the pick price's implied
+      probability, in percentage points like the edges
+    Returns a DataFrame aligned to picks.index; NaN where there is no close.
+    """
+    merged = picks[["date", "player_id", "stat_type", "prop_line", "recommended_side", "price"]].merge(
+        close, how="left", on=["date", "player_id", "stat_type"])
+    merged.index = picks.index
+    line = merged["prop_line"].astype(float).to_numpy()
+    over = merged["recommended_side"].astype(str).str.lower().eq("over").to_numpy()
+    close_line = merged["close_line"].astype(float).to_numpy()
+    sign = np.where(over, 1.0, -1.0)
+    p_over, p_under, p_push = count_probs(merged["close_mean"].astype(float).to_numpy(), line,
+                                          merged["stat_type"].to_numpy())
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fair = np.where(over, p_over, p_under) / (1 - p_push)
+    implied = american_to_implied_prob_array(merged["price"].astype(float).to_numpy())
+    return pd.DataFrame({
+        "closing_line": close_line,
+        "clv": (close_line - line) * sign,
+        "clv_price": np.round((fair - implied) * 100, 2),
+    }, index=picks.index)
@@ -1,30 +1,142 @@
-from app.core.pricing.odds_math import american_to_implied_prob, remove_vig
-from app.core.modeling.distribution import normal_prob
-from app.core.modeling.config import MODEL_VERSION
+import numpy as np
+from app.core.pricing.odds_math import american_to_implied_prob_array
+from app.core.pricing.devig import devig_probs
+from app.core.modeling.consensus import freshness_array
+from app.core.modeling.distribution import count_implied_means, count_probs
+from app.core.modeling.projection import consensus_mean_array, norm_cdf_array, stat_stdevs
+from app.core.modeling.config import EDGE_MODEL, MODEL_VERSION
+from app.core.utils.ids import generate_id
 from datetime import datetime
 
 
+def model_probs(means, lines, stat_types, model=EDGE_MODEL, dispersions=None):
+    """(p_over, p_under, p_push) arrays for the given means and lines.
+    `dispersions` (count model only) overrides the per-stat dispersion."""
+    if model == "count":
+        return count_probs(means, lines, stat_types, dispersions=dispersions)
+    if model != "normal":
+        raise ValueError(f"Unknown edge model {model!r}; expected 'count' or 'normal'")
+    means = np.asarray(means, dtype=float)
+    lines = np.asarray(lines, dtype=float)
+    sd = stat_stdevs(stat_types)
+    # Continuity correction: a whole-number line pushes on [line - 0.5, line + 0.5)
+    whole = lines == np.floor(lines)
+    lo = norm_cdf_array((np.where(whole, lines - 0.5, lines) - means) / sd)
+    hi = norm_cdf_array((np.where(whole, lines + 0.5, lines) - means) / sd)
+    return 1 - hi, lo, hi - lo
+
+
+def compute_edges(means, lines, stat_types, over_prices, under_prices, timestamps=None, now=None,
+                  model=EDGE_MODEL, dispersions=None):
+    """
+    Vectorized edge stage over the whole board, one entry per market.
+
+    Pushes refund the stake, so each side is judged on its win probability
+    given no push: fair decimal odds are (1 - p_push) / p_side and the edge is
+    that probability minus the price's implied break-even, in percentage
+    points (same units as the old calculate_edge). A side with no price gets
+    NaN edge. Returns a dict of arrays.
+    """
+    p_over, p_under, p_push = model_probs(means, lines, stat_types, model=model, dispersions=dispersions)
+    decided = 1 - p_push
+    with np.errstate(divide="ignore", invalid="ignore"):
+        win_over = p_over / decided
+        win_under = p_under / decided
+        fair_odds_over = np.where(p_over > 0, decided / p_over, np.inf)
+        fair_odds_under = np.where(p_under > 0, decided / p_under, np.inf)
+    implied_over = american_to_implied_prob_array(over_prices)
+    implied_under = american_to_implied_prob_array(under_prices)
+    if timestamps is None:
+        freshness_score = np.ones(p_over.shape)
+    else:
+        freshness_score = freshness_array(timestamps, now=now)
+    return {
+        "p_over": p_over,
+        "p_under": p_under,
+        "p_push": p_push,
+        "fair_odds_over": fair_odds_over,
+        "fair_odds_under": fair_odds_under,
+        "edge_over": (win_over - implied_over) * 100,
+        "edge_under": (win_under - implied_under) * 100,
+        "freshness_score": freshness_score,
+    }
+
+
+def _column(values, digits):
+    # Rounded python floats, with NaN/inf as None (NULL in the DB and CSV)
+    out = np.round(values, digits).astype(object)
+    out[~np.isfinite(values)] = None
+    return out.tolist()
+
+
+def board_edges(board, date, now=None, model_version=MODEL_VERSION, model=EDGE_MODEL):
+    """
+    Edge rows for consensus board rows: projection vs the best offered price.
+    Rows carry the Edge columns plus player/stat/line/prices for the CSV.
+    Ids are per (market, model version, date), so reruns update in place.
+    """
+    if not board:
+        return []
+    now = now or datetime.utcnow()
+    edges = compute_edges(
+        [b["projection"] for b in board],
+        [b["line"] for b in board],
+        [b["stat_type"] for b in board],
+        [b["over_price"] for b in board],
+        [b["under_price"] for b in board],
+        timestamps=[b.get("last_update") for b in board],
+        now=now,
+        model=model,
+    )
+    digits = {"p_over": 4, "p_under": 4, "p_push": 4, "fair_odds_over": 3, "fair_odds_under": 3,
+              "edge_over": 2, "edge_under": 2, "freshness_score": 4}
+    columns = [_column(edges[k], d) for k, d in digits.items()]
+    rows = []
+    for b, (p_over, p_under, p_push, fo_over, fo_under, e_over, e_under, fresh) in zip(board, zip(*columns)):
+        rows.append({
+            "id": generate_id("edge", b.get("market_id"), model_version, date),
+            "market_id": b.get("market_id"),
+            "model_version": model_version,
+            "player_id": b["player_id"],
+            "stat_type": b["stat_type"],
+            "line": b["line"],
+            "projection": b["projection"],
+            "over_price": b["over_price"],
+            "under_price": b["under_price"],
+            "p_over": p_over,
+            "p_under": p_under,
+            "p_push": p_push,
+            "fair_odds_over": fo_over,
+            "fair_odds_under": fo_under,
+            "edge_over": e_over,
+            "edge_under": e_under,
+            "freshness_score": fresh,
+            "timestamp": now,
+        })
+    return rows
+
+
 def calculate_edge(line, price, stat_type, side, timestamp):
-    p_implied = american_to_implied_prob(price)
-    p_over, p_under = remove_vig(p_implied, 1 - p_implied)
-    # Simple normal model
-    mean = line  # Placeholder, will use consensus_mean
-    stdev = 5.0  # Placeholder, will use stat-specific
-    p_model = normal_prob(mean, stdev, line, side)
-    fair_odds = 1 / p_model if p_model > 0 else 0
-    edge = (p_model - p_implied) * 100
-    freshness_score = freshness(timestamp)
+    # Single-price wrapper: market mean from the one-sided fair probability
+    p_implied = american_to_implied_prob_array(price)
+    p_over_fair, _, _ = devig_probs(p_implied if side == "over" else np.nan,
+                                    np.nan if side == "over" else p_implied)
+    # Solve the mean on the model the edge is priced on, or the market is not reproduced
+    if EDGE_MODEL == "count":
+        mean = count_implied_means(p_over_fair, [line], [stat_type])
+    else:
+        mean = consensus_mean_array([line], p_over_fair, [stat_type])
+    over, under = (price, None) if side == "over" else (None, price)
+    edges = compute_edges(mean, [line], [stat_type], [over], [under], timestamps=[timestamp])
     return {
         "model_version": MODEL_VERSION,
-        "p_model": p_model,
-        "fair_odds": fair_odds,
-        "edge": edge,
-        "freshness_score": freshness_score,
+        "p_model": float(edges[f"p_{side}"][0]),
+        "fair_odds": float(edges[f"fair_odds_{side}"][0]),
+        "edge": float(edges[f"edge_{side}"][0]),
+        "freshness_score": float(edges["freshness_score"][0]),
     }
 
 
 def freshness(ts):
     # Exponential decay freshness score
-    age_sec = (datetime.utcnow() - ts).total_seconds()
-    decay = 0.0001
-    return max(0.0, min(1.0, math.exp(-decay * age_sec)))
+    return float(freshness_array([ts])[0])
@@ -1,4 +1,5 @@
 from datetime import datetime
+from app.core.utils.ids import generate_id
 
 class PickLogger:
     def __init__(self, repo):
@@ -14,26 +15,27 @@ class Grader:
         self.repo = repo
 
     def grade_picks(self, date):
-        # TODO: Fetch picks and results, compute grades
-        picks = self.repo.get_picks(date)
-        results = self.repo.get_results(date)
+        # Picks and their results come back already joined in SQL (one query)
+        rows = self.repo.get_picks_with_results(date)
+        graded_at = datetime.utcnow()
         grades = []
-        for pick in picks:
-            result = next((r for r in results if r["market_id"] == pick["market_id"]), None)
-            if result:
-                won = self._compute_win(pick, result)
-                profit = self._compute_profit(pick, won)
-                clv = self._compute_clv(pick, result)
-                abs_error = abs(result["actual_value"] - pick["projected_mean"])
-                grades.append({
-                    "pick_id": pick["id"],
-                    "won": won,
-                    "profit": profit,
-                    "clv": clv,
-                    "abs_error": abs_error,
-                    "graded_at": datetime.utcnow()
-                })
+        for row in rows:
+            pick = result = row._mapping
+            won = self._compute_win(pick, result)
+            profit = self._compute_profit(pick, won)
+            clv = self._compute_clv(pick, result)
+            abs_error = abs(result["actual_value"] - pick["projected_mean"])
+            grades.append({
+                "id": generate_id("grade", pick["id"]),
+                "pick_id": pick["id"],
+                "won": won,
+                "profit": profit,
+                "clv": clv,
+                "abs_error": abs_error,
+                "graded_at": graded_at
+            })
         self.repo.store_grades(grades)
+        return grades
 
     def _compute_win(self, pick, result):
         # TODO: Implement push rules
@@ -52,8 +54,10 @@ class Grader:
             return -stake
 
     def _compute_clv(self, pick, result):
-        # CLV = closing_line - line_at_pick (sign adjusted)
-        clv = result["actual_value"] - pick["line_at_pick"]
+        # CLV = closing_line - line_at_pick (sign adjusted); None until the close is captured
+        if result.get("closing_line") is None:
+            return None
+        clv = result["closing_line"] - pick["line_at_pick"]
         if pick["side"] == "under":
             clv = -clv
         return clv
@@ -0,0 +1,96 @@
+import numpy as np
+from app.core.modeling.combos import price_combos
+from app.core.modeling.consensus import weighted_consensus
+from app.core.metrics.edge import EDGE_MODEL, model_probs
+from app.core.pricing.devig import DEVIG_METHOD, book_holds, devig
+
+
+def group_quotes(markets):
+    """
+    Pair ingested outcome rows into one quote per (player, stat, line, book)
+    with both over and under prices (None when a side is not offered) and the
+    latest update time of either side.
+    """
+    grouped = {}
+    for m in markets:
+        side = (m.get("side") or "").lower()
+        if side not in ("over", "under"):
+            continue
+        key = (m.get("player_id"), m.get("stat_type"), m.get("line_value"), m.get("source"))
+        entry = grouped.get(key)
+        if entry is None:
+            entry = grouped[key] = {"player_id": key[0], "stat_type": key[1], "line": key[2], "source": key[3],
+                                    "market_id": m.get("id"), "over": None, "under": None, "last_update": None}
+        entry[side] = m["price_american"]
+        ts = m.get("last_update")
+        if ts is not None and (entry["last_update"] is None or ts > entry["last_update"]):
+            entry["last_update"] = ts
+    return list(grouped.values())
+
+
+def _price(value):
+    return None if np.isnan(value) else int(value)
+
+
+def build_board(quotes, devig_method=None, now=None, correlations=None, model=None):
+    """
+    Devig every book quote and combine them into one consensus row per
+    (player, stat). The consensus mean is solved and priced on the same
+    model (EDGE_MODEL by default), so a row reproduces the market at its
+    main line. Combo rows (PRA, PR, PA, RA) are also priced from the
+    player's component projections (see combos.price_combos). Returns
+    (rows, holds) where holds is the measured average hold per book.
+    """
+    if not quotes:
+        return [], {}
+    # Market id and newest quote per prop (a player has one game per slate)
+    props = {}
+    for q in quotes:
+        prop = props.setdefault((q["player_id"], q["stat_type"]), {"market_id": q.get("market_id"), "last_update": None})
+        ts = q["last_update"]
+        if ts is not None and (prop["last_update"] is None or ts > prop["last_update"]):
+            prop["last_update"] = ts
+    priced = devig([q["over"] for q in quotes], [q["under"] for q in quotes], method=devig_method or DEVIG_METHOD)
+    sources = [q["source"] for q in quotes]
+    cons = weighted_consensus(
+        [q["player_id"] for q in quotes],
+        [q["stat_type"] for q in quotes],
+        [q["line"] for q in quotes],
+        priced["p_over"],
+        sources,
+        timestamps=[q["last_update"] for q in quotes],
+        over_prices=[q["over"] for q in quotes],
+        under_prices=[q["under"] for q in quotes],
+        now=now,
+        model=model or EDGE_MODEL,
+    )
+    # Price the consensus mean at the main line (count model: exact pushes)
+    p_over, p_under, p_push = model_probs(cons["mean"], cons["line"], cons["stat_type"], model=model or EDGE_MODEL)
+    rows = []
+    columns = zip(cons["player_id"].tolist(), cons["stat_type"].tolist(), cons["line"].tolist(),
+                  cons["mean"].round(2).tolist(), p_over.round(4).tolist(), p_under.round(4).tolist(),
+                  p_push.round(4).tolist(), cons["over_price"], cons["under_price"], cons["n_books"].tolist(),
+                  cons["n_quotes"].tolist())
+    for (player_id, stat_type, line, mean, p_over, p_under, p_push, over_price, under_price,
+         n_books, n_quotes) in columns:
+        if mean != mean:
+            # No quote with a usable probability
+            continue
+        prop = props[(player_id, stat_type)]
+        rows.append({
+            "market_id": prop["market_id"],
+            "player_id": player_id,
+            "stat_type": stat_type,
+            "line": line,
+            "over_price": _price(over_price),
+            "under_price": _price(under_price),
+            "p_over": p_over,
+            "p_under": p_under,
+            "p_push": p_push,
+            "projection": mean,
+            "n_books": n_books,
+            "n_quotes": n_quotes,
+            "last_update": prop["last_update"].isoformat() if prop["last_update"] else None,
+        })
+    price_combos(rows, correlations=correlations)
+    return rows, book_holds(sources, priced["hold"])
@@ -0,0 +1,147 @@
+import os
+import numpy as np
+from app.core.metrics.edge import compute_edges
+from app.core.modeling.config import COMBO_COMPONENTS, STAT_CORRELATIONS
+from app.core.modeling.distribution import stat_dispersions
+from app.core.normalization.players import get_index
+
+COMPONENTS = ("PTS", "REB", "AST")
+PAIRS = (("PTS", "REB"), ("PTS", "AST"), ("REB", "AST"))
+# Game-log columns behind COMPONENTS, in the same order
+STAT_COLUMNS = ("pts", "reb", "ast")
+# Model vs best-price edge (percentage points) that flags a combo as mispriced
+COMBO_EDGE_THRESHOLD = float(os.getenv("COMBO_EDGE_THRESHOLD", "3.0"))
+# Games of evidence a per-player correlation needs to weigh as much as the prior
+CORRELATION_PRIOR_GAMES = 20
+
+
+def _pair_key(a, b):
+    return (a, b) if (a, b) in STAT_CORRELATIONS else (b, a)
+
+
+def prior_correlations():
+    return np.array([STAT_CORRELATIONS.get(_pair_key(a, b), 0.0) for a, b in PAIRS])
+
+
+def estimate_correlations(player_ids, pts, reb, ast, prior_games=CORRELATION_PRIOR_GAMES):
+    """
+    Per-player correlations of (PTS, REB), (PTS, AST), (REB, AST) from game
+    logs (one entry per player-game), shrunk toward STAT_CORRELATIONS:
+    rho = (n * r + k * prior) / (n + k). All players in one bincount pass.
+    Returns {player_id: array of 3 correlations in PAIRS order}.
+    """
+    players, idx = np.unique(np.asarray(player_ids, dtype=str), return_inverse=True)
+    idx = idx.reshape(-1)
+    stats = {"PTS": np.asarray(pts, dtype=float), "REB": np.asarray(reb, dtype=float),
+             "AST": np.asarray(ast, dtype=float)}
+    n = np.bincount(idx, minlength=len(players)).astype(float)
+
+    def moment(x):
+        return np.bincount(idx, weights=x, minlength=len(players)) / n
+
+    prior = prior_correlations()
+    out = np.empty((len(players), len(PAIRS)))
+    for j, (a, b) in enumerate(PAIRS):
+        x, y = stats[a], stats[b]
+        mx, my = moment(x), moment(y)
+        cov = moment(x * y) - mx * my
+        vx, vy = moment(x * x) - mx ** 2, moment(y * y) - my ** 2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = cov / np.sqrt(vx * vy)
+        r = np.where(np.isfinite(r), r, prior[j])
+        # Fewer than 3 games says nothing about correlation
+        weight = np.where(n >= 3, n, 0.0)
+        out[:, j] = (weight * r + prior_games * prior[j]) / (weight + prior_games)
+    return dict(zip(players.tolist(), out))
+
+
+def player_correlations(player_names, store, players=None, season=None):
+    """
+    estimate_correlations for board players (canonical names) from the
+    game-log store's current season: {name: array of 3 correlations}.
+    Players the index or the store does not know are left out (they price
+    on the prior).
+    """
+    players = players or get_index()
+    ids = {}
+    for name in set(player_names):
+        pid = players.resolve(name)
+        if pid is not None:
+            ids[name] = pid
+    if not ids:
+        return {}
+    logs = store.game_logs(ids.values(), season=season or store.latest_season())
+    logs = logs.dropna(subset=list(STAT_COLUMNS))
+    if logs.empty:
+        return {}
+    est = estimate_correlations(logs["player_id"].astype(str), *(logs[c].astype(float) for c in STAT_COLUMNS))
+    return {name: est[str(pid)] for name, pid in ids.items() if str(pid) in est}
+
+
+def combo_moments(component_means, stat_type, correlations):
+    """
+    Closed-form mean and variance of a combo stat for many players at once.
+
+    component_means: (n, 3) PTS/REB/AST means (NaN where unknown);
+    correlations: (n, 3) in PAIRS order. Component variances follow each
+    stat's count model (dispersion * mean), so
+    var = sum(var_i) + 2 * sum(rho_ij * sd_i * sd_j) over the combo's parts.
+    Any missing component makes the combo NaN.
+    """
+    component_means = np.asarray(component_means, dtype=float)
+    used = np.array([c in COMBO_COMPONENTS[stat_type] for c in COMPONENTS])
+    var = component_means * stat_dispersions(list(COMPONENTS))
+    sd = np.sqrt(var)
+    mean = component_means[:, used].sum(axis=1)
+    total_var = var[:, used].sum(axis=1)
+    for j, (a, b) in enumerate(PAIRS):
+        if a in COMBO_COMPONENTS[stat_type] and b in COMBO_COMPONENTS[stat_type]:
+            ia, ib = COMPONENTS.index(a), COMPONENTS.index(b)
+            total_var = total_var + 2 * correlations[:, j] * sd[:, ia] * sd[:, ib]
+    return mean, total_var
+
+
+def price_combos(board, correlations=None, threshold=COMBO_EDGE_THRESHOLD):
+    """
+    Price every combo row on the board (PRA, PR, PA, RA) from the same
+    player's component projections and flag mispricings. Adds model_projection,
+    model_p_over/under/push, model_edge_over/under and mispriced to combo rows
+    in place; rows whose components are not on the board are left untouched.
+    `correlations` is {player_id: 3 correlations} (see estimate_correlations);
+    players without an entry use STAT_CORRELATIONS.
+    """
+    components = {}
+    for row in board:
+        if row["stat_type"] in COMPONENTS:
+            components[(row["player_id"], row["stat_type"])] = row["projection"]
+    combos = [row for row in board if row["stat_type"] in COMBO_COMPONENTS]
+    if not combos:
+        return board
+    correlations = correlations or {}
+    prior = prior_correlations()
+    means = np.array([[components.get((row["player_id"], c), np.nan) for c in COMPONENTS] for row in combos],
+                     dtype=float)
+    rho = np.array([correlations.get(row["player_id"], prior) for row in combos], dtype=float)
+    stat_types = np.array([row["stat_type"] for row in combos])
+    mean = np.full(len(combos), np.nan)
+    var = np.full(len(combos), np.nan)
+    for stat_type in np.unique(stat_types):
+        idx = stat_types == stat_type
+        mean[idx], var[idx] = combo_moments(means[idx], stat_type, rho[idx])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dispersions = var / mean
+    edges = compute_edges(mean, [row["line"] for row in combos], stat_types,
+                          [row["over_price"] for row in combos], [row["under_price"] for row in combos],
+                          model="count", dispersions=dispersions)
+    best = np.fmax(edges["edge_over"], edges["edge_under"])
+    fields = {"model_p_over": edges["p_over"], "model_p_under": edges["p_under"], "model_p_push": edges["p_push"],
+              "model_edge_over": edges["edge_over"], "model_edge_under": edges["edge_under"]}
+    for i, row in enumerate(combos):
+        if np.isnan(mean[i]):
+            continue
+        row["model_projection"] = round(float(mean[i]), 2)
+        for name, values in fields.items():
+            value = float(values[i])
+            row[name] = None if np.isnan(value) else round(value, 4 if name.startswith("model_p") else 2)
+        row["mispriced"] = bool(best[i] >= threshold)
+    return board
@@ -1,13 +1,49 @@
 # Stat-specific stdev priors and model version
+import os
 
 STAT_STDEV_PRIORS = {
     "PTS": 5.5,
     "REB": 2.2,
     "AST": 1.8,
     "PRA": 6.8,
+    "PR": 6.2,
+    "PA": 6.0,
+    "RA": 3.0,
 }
 
-MODEL_VERSION = "nba_v0_market_normal_001"
+# Count model per stat: variance / mean. 1.0 = Poisson, > 1 = negative binomial
+# (overdispersed). Stats not listed are Poisson.
+STAT_DISPERSION = {
+    "PTS": 1.5,
+    "REB": 1.0,
+    "AST": 1.0,
+    "PRA": 1.6,
+    "PR": 1.5,
+    "PA": 1.5,
+    "RA": 1.1,
+}
+
+# Combo props and their component stats
+COMBO_COMPONENTS = {
+    "PRA": ("PTS", "REB", "AST"),
+    "PR": ("PTS", "REB"),
+    "PA": ("PTS", "AST"),
+    "RA": ("REB", "AST"),
+}
+
+# League-wide prior correlations between a player's component stats in a game;
+# per-player estimates from game logs shrink toward these
+STAT_CORRELATIONS = {
+    ("PTS", "REB"): 0.20,
+    ("PTS", "AST"): 0.25,
+    ("REB", "AST"): 0.10,
+}
+
+# "count": Poisson/negative binomial per stat (exact pushes); "normal": STAT_STDEV_PRIORS.
+# Used both to solve the consensus mean and to price the board and edges
+EDGE_MODEL = os.getenv("EDGE_MODEL", "count")
+# Bump when model output changes: incremental board state and edge ids key on it
+MODEL_VERSION = f"nba_v1_market_{EDGE_MODEL}_002"
 
 BOOK_WEIGHTS = {
     "Pinnacle": 1.0,
@@ -22,4 +58,5 @@ BOOK_WEIGHTS = {
 
 RATE_LIMITS = {
     "theodds": 30,  # requests per minute
+    "balldontlie": 60,
 }
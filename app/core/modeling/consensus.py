@@ -0,0 +1,151 @@
+from datetime import datetime
+import numpy as np
+from app.core.modeling.config import BOOK_WEIGHTS
+from app.core.modeling.distribution import count_implied_means, count_probs
+from app.core.modeling.projection import norm_cdf_array, norm_inv_array, stat_stdevs
+
+# Books missing from BOOK_WEIGHTS count as retail
+DEFAULT_BOOK_WEIGHT = BOOK_WEIGHTS.get("Retail", 0.2)
+# Per-second decay, same as metrics.edge.freshness (~1.9h half-life)
+FRESHNESS_DECAY = 0.0001
+# Floor on the freshness weight so a prop whose quotes are all old still gets a
+# consensus (relative weighting between its quotes is kept up to 1000x)
+MIN_FRESHNESS_WEIGHT = 1e-3
+# Quotes priced this close to 0/1 carry no usable information about the mean
+P_EPS = 1e-6
+
+
+def book_weights_array(sources):
+    sources = np.asarray(sources, dtype=str)
+    books, inverse = np.unique(sources, return_inverse=True)
+    weights = np.array([BOOK_WEIGHTS.get(b, DEFAULT_BOOK_WEIGHT) for b in books], dtype=float)
+    return weights[inverse].reshape(sources.shape)
+
+
+def freshness_array(timestamps, now=None):
+    """exp(-decay * age) per quote; naive-UTC datetimes, missing (None/NaT) -> 1."""
+    ts = np.asarray(timestamps, dtype="datetime64[s]")
+    now = np.datetime64(now or datetime.utcnow(), "s")
+    age = (now - ts).astype(float)
+    fresh = np.exp(-FRESHNESS_DECAY * np.clip(age, 0, None))
+    return np.where(np.isnat(ts), 1.0, fresh)
+
+
+def _group_max(values, group, n):
+    out = np.full(n, -np.inf)
+    np.fmax.at(out, group, values)
+    return np.where(np.isneginf(out), np.nan, out)
+
+
+def _empty_result(with_over, with_under):
+    result = {"player_id": np.array([], dtype=str), "stat_type": np.array([], dtype=str)}
+    for name in ("mean", "line", "p_over", "weight"):
+        result[name] = np.array([], dtype=float)
+    for name in ("n_quotes", "n_books"):
+        result[name] = np.array([], dtype=int)
+    for name, present in (("over_price", with_over), ("under_price", with_under)):
+        if present:
+            result[name] = np.array([], dtype=float)
+    return result
+
+
+def weighted_consensus(player_ids, stat_types, lines, p_over, sources, timestamps=None,
+                       over_prices=None, under_prices=None, now=None, model="count"):
+    """
+    Combine every book's fair over probability at every line into one
+    market-implied mean per (player, stat).
+
+    Each quote implies the mean mu_i at which its line's over probability is
+    p_i: on the stat's count model (model="count", the same one the board is
+    priced on, so the market is reproduced at its own lines) or under the
+    normal prior, mu_i = L_i + sd * z(p_i) (model="normal").
+    The consensus mean is the weighted least-squares solution over all quotes,
+    weight = BOOK_WEIGHTS[book] * freshness * Fisher information of the quote
+    (phi(z)^2 / p(1-p), scaled to 1 at p = 0.5), so far-off alt lines count
+    less than lines near the median. Everything is grouped with bincount, so
+    the whole slate is solved in one pass.
+
+    Returns a dict of per-prop arrays: player_id, stat_type, mean, line (the
+    line carrying the most weight), p_over (consensus probability at that
+    line, pushes excluded), over_price / under_price (best price at that line), n_quotes,
+    n_books, weight.
+    """
+    player_ids = np.asarray(player_ids, dtype=str)
+    stat_types = np.asarray(stat_types, dtype=str)
+    lines = np.asarray(lines, dtype=float)
+    p = np.asarray(p_over, dtype=float)
+    sources = np.asarray(sources, dtype=str)
+    if not len(p):
+        return _empty_result(over_prices is not None, under_prices is not None)
+
+    # Integer-code the keys once; all grouping below is on ints
+    _, player_code = np.unique(player_ids, return_inverse=True)
+    stats, stat_code = np.unique(stat_types, return_inverse=True)
+    keys = player_code.reshape(-1) * len(stats) + stat_code.reshape(-1)
+    uniq, first, group = np.unique(keys, return_index=True, return_inverse=True)
+    group = group.reshape(-1)
+    ng = len(uniq)
+
+    sd = stat_stdevs(stat_types)
+    ok = (p > P_EPS) & (p < 1 - P_EPS) & ~np.isnan(lines)
+    p_safe = np.where(ok, p, 0.5)
+    z = norm_inv_array(p_safe)
+    if model == "count":
+        mu = count_implied_means(p_safe, lines, stat_types)
+    elif model == "normal":
+        mu = lines + sd * z
+    else:
+        raise ValueError(f"Unknown consensus model {model!r}; expected 'count' or 'normal'")
+    ok &= ~np.isnan(mu)
+    info = np.exp(-z ** 2) / (4 * p_safe * (1 - p_safe))
+    w = book_weights_array(sources) * info
+    if timestamps is not None:
+        w = w * np.maximum(freshness_array(timestamps, now=now), MIN_FRESHNESS_WEIGHT)
+    w = np.where(ok, w, 0.0)
+
+    weight = np.bincount(group, weights=w, minlength=ng)
+    mean = np.bincount(group, weights=w * np.where(ok, mu, 0.0), minlength=ng)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = mean / weight
+
+    # Main line: the (prop, line) pair with the most weight behind it
+    line_values, line_code = np.unique(lines, return_inverse=True)
+    nl = len(line_values)
+    pairs, pair_idx = np.unique(group * nl + line_code.reshape(-1), return_inverse=True)
+    pair_w = np.bincount(pair_idx.reshape(-1), weights=w, minlength=len(pairs))
+    pair_group = pairs // nl
+    order = np.lexsort((-pair_w, pair_group))
+    head = order[np.r_[True, pair_group[order][1:] != pair_group[order][:-1]]]
+    main_line = np.full(ng, np.nan)
+    main_line[pair_group[head]] = line_values[pairs[head] % nl]
+
+    if model == "count":
+        over, under, _ = count_probs(mean, main_line, stat_types[first])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            p_main = over / (over + under)
+    else:
+        with np.errstate(invalid="ignore"):
+            p_main = norm_cdf_array((mean - main_line) / sd[first])
+    at_main = lines == main_line[group]
+
+    # Distinct books per prop
+    _, book = np.unique(sources, return_inverse=True)
+    nb = book.max() + 1
+    prop_books = np.unique(group * nb + book.reshape(-1))
+    n_books = np.bincount(prop_books // nb, minlength=ng)
+
+    result = {
+        "player_id": player_ids[first],
+        "stat_type": stat_types[first],
+        "mean": mean,
+        "line": main_line,
+        "p_over": p_main,
+        "n_quotes": np.bincount(group, weights=ok.astype(float), minlength=ng).astype(int),
+        "n_books": n_books,
+        "weight": weight,
+    }
+    for name, prices in (("over_price", over_prices), ("under_price", under_prices)):
+        if prices is not None:
+            prices = np.asarray(prices, dtype=float)
+            result[name] = _group_max(np.where(at_main, prices, np.nan), group, ng)
+    return result
@@ -1,4 +1,17 @@
 import math
+import numpy as np
+from app.core.modeling.config import STAT_DISPERSION
+from app.core.utils.logging import logger
+
+# CDF lookup tables: one per dispersion, rows = mean buckets, cols = counts
+MEAN_STEP = 0.05
+MAX_MEAN = 100.0
+MAX_COUNT = 250
+DEFAULT_DISPERSION = 1.0
+# Caller-supplied dispersions are snapped to this grid so the table cache stays small
+DISPERSION_STEP = 0.05
+
+_tables = {}
 
 def normal_prob(mean, stdev, line, side):
     # Compute probability for over/under/push
@@ -11,3 +24,138 @@ def normal_prob(mean, stdev, line, side):
 
 def normal_cdf(x, mean, stdev):
     return 0.5 * (1 + math.erf((x - mean) / (stdev * math.sqrt(2))))
+
+
+def count_pmf_table(means, dispersion, max_count=MAX_COUNT):
+    """P(X = k) for k = 0..max_count at each mean: Poisson when dispersion
+    (variance / mean) is 1, negative binomial with that variance otherwise.
+    Built with the pmf recurrences, so no special functions are needed."""
+    means = np.asarray(means, dtype=float)
+    pmf = np.empty((len(means), max_count + 1))
+    if dispersion <= 1.0:
+        pmf[:, 0] = np.exp(-means)
+        for k in range(1, max_count + 1):
+            pmf[:, k] = pmf[:, k - 1] * means / k
+    else:
+        # Successes r and failure prob q with mean r*q/(1-q) and variance mean*dispersion
+        q = 1 - 1 / dispersion
+        r = means / (dispersion - 1)
+        pmf[:, 0] = (1 - q) ** r
+        for k in range(1, max_count + 1):
+            pmf[:, k] = pmf[:, k - 1] * (k - 1 + r) / k * q
+    return pmf
+
+
+def cdf_table(dispersion):
+    """Cached P(X <= k) table for one dispersion, indexed [mean bucket, k]."""
+    table = _tables.get(dispersion)
+    if table is None:
+        means = np.arange(0.0, MAX_MEAN + MEAN_STEP / 2, MEAN_STEP)
+        table = np.minimum(np.cumsum(count_pmf_table(means, dispersion), axis=1), 1.0)
+        _tables[dispersion] = table
+    return table
+
+
+def stat_dispersions(stat_types):
+    stat_types = np.asarray(stat_types, dtype=str)
+    uniq, inverse = np.unique(stat_types, return_inverse=True)
+    values = np.array([STAT_DISPERSION.get(s, DEFAULT_DISPERSION) for s in uniq], dtype=float)
+    return values[inverse].reshape(stat_types.shape)
+
+
+def _dispersion_buckets(dispersions):
+    # Snap overrides to the table grid; values below 1 (or NaN) price as Poisson
+    dispersions = np.asarray(dispersions, dtype=float)
+    return np.maximum(np.round(np.nan_to_num(dispersions, nan=DEFAULT_DISPERSION) / DISPERSION_STEP)
+                      * DISPERSION_STEP, DEFAULT_DISPERSION).round(4)
+
+
+def _cdf_lookup(table, means, ks):
+    # Linear interpolation between the two nearest mean buckets; k < 0 -> 0
+    over = means > MAX_MEAN
+    if over.any():
+        logger.warning(f"{int(over.sum())} means above MAX_MEAN={MAX_MEAN} priced at {MAX_MEAN} "
+                       f"(max {float(means[over].max()):.1f})")
+    pos = np.clip(means, 0.0, MAX_MEAN) / MEAN_STEP
+    lo = np.minimum(pos.astype(int), table.shape[0] - 2)
+    frac = pos - lo
+    k = np.clip(ks, 0, MAX_COUNT).astype(int)
+    out = table[lo, k] * (1 - frac) + table[lo + 1, k] * frac
+    return np.where(ks < 0, 0.0, out)
+
+
+def count_probs(means, lines, stat_types, dispersions=None):
+    """
+    Exact (p_over, p_under, p_push) arrays for integer-valued stats under each
+    stat's count model. Half-point lines never push; on an integer line
+    P(push) = P(X = line). Each distinct dispersion is one table; the board
+    is two indexed reads per probability.
+
+    `dispersions` overrides the per-stat STAT_DISPERSION (e.g. combo props whose
+    variance comes from component covariance); values below 1 price as Poisson.
+    """
+    means = np.asarray(means, dtype=float)
+    lines = np.asarray(lines, dtype=float)
+    if dispersions is None:
+        dispersions = stat_dispersions(stat_types)
+    else:
+        dispersions = _dispersion_buckets(dispersions)
+    p_under = np.full(means.shape, np.nan)
+    p_push = np.full(means.shape, np.nan)
+    ok = ~(np.isnan(means) | np.isnan(lines))
+    # Under wins on counts <= ceil(line) - 1; push only when the line is whole
+    k_under = np.ceil(lines) - 1
+    whole = lines == np.floor(lines)
+    for dispersion in np.unique(dispersions[ok]):
+        idx = ok & (dispersions == dispersion)
+        table = cdf_table(float(dispersion))
+        m = means[idx]
+        under = _cdf_lookup(table, m, k_under[idx])
+        at_line = _cdf_lookup(table, m, np.where(whole[idx], lines[idx], k_under[idx]))
+        p_under[idx] = under
+        p_push[idx] = at_line - under
+    p_over = 1 - p_under - p_push
+    return p_over, p_under, p_push
+
+
+def count_implied_means(p_over, lines, stat_types, dispersions=None):
+    """
+    Inverse of count_probs: the mean at which each line's over probability
+    (given no push, i.e. a devigged two-way price) equals `p_over`, on the
+    stat's count model. The over curve is monotone in the mean, so each
+    distinct (dispersion, line) is one np.interp over a CDF table column.
+    Probabilities the table cannot reach clip to 0 / MAX_MEAN; p of 0/1 or
+    NaN gives NaN.
+    """
+    p, lines = np.broadcast_arrays(np.asarray(p_over, dtype=float), np.asarray(lines, dtype=float))
+    if dispersions is None:
+        dispersions = stat_dispersions(stat_types)
+    else:
+        dispersions = _dispersion_buckets(dispersions)
+    dispersions = np.broadcast_to(dispersions, p.shape)
+    means = np.full(p.shape, np.nan)
+    ok = (p > 0) & (p < 1) & ~np.isnan(lines)
+    k_under = np.ceil(lines) - 1
+    whole = lines == np.floor(lines)
+    grid = np.arange(0.0, MAX_MEAN + MEAN_STEP / 2, MEAN_STEP)
+    for dispersion in np.unique(dispersions[ok]):
+        table = cdf_table(float(dispersion))
+        in_table = ok & (dispersions == dispersion)
+        for k, is_whole in set(zip(k_under[in_table].tolist(), whole[in_table].tolist())):
+            idx = in_table & (k_under == k) & (whole == is_whole)
+            k = min(int(k), MAX_COUNT - 1)
+            under = table[:, k] if k >= 0 else np.zeros(len(grid))
+            if is_whole:
+                over = 1 - table[:, k + 1]
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    curve = np.nan_to_num(over / (over + under))
+            else:
+                curve = 1 - under
+            means[idx] = np.interp(p[idx], np.maximum.accumulate(curve), grid)
+    return means
+
+
+def count_prob(mean, line, stat_type, side):
+    # Scalar counterpart of normal_prob on the count model
+    p_over, p_under, p_push = count_probs([mean], [line], [stat_type])
+    return float({"over": p_over, "under": p_under}.get(side, p_push)[0])
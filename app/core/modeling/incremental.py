@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from app.core.metrics.edge import board_edges
+from app.core.modeling.board import build_board
+from app.core.modeling.combos import price_combos
+from app.core.modeling.config import MODEL_VERSION
+from app.core.pricing.devig import DEVIG_METHOD
+from app.core.utils.logging import logger
+
+BOARD_STATE_DIR = os.getenv("BOARD_STATE_DIR", "output")
+# Recompute only props whose inputs moved since the last poll (0 = full rebuild)
+BOARD_INCREMENTAL = os.getenv("BOARD_INCREMENTAL", "1") == "1"
+
+
+def prop_key(player_id, stat_type):
+    return f"{player_id}|{stat_type}"
+
+
+def fingerprint(quotes, model_version, devig_method):
+    """Stable hash of everything a prop's projection depends on: each book's
+    line and both prices (so the book set too), the model version and devig
+    method. Quote order and update times do not matter."""
+    items = sorted((str(q["source"]), q["line"], q["over"], q["under"]) for q in quotes)
+    # repr of str/float/int/None is stable across processes (unlike hash())
+    payload = repr((model_version, devig_method, items))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=12).hexdigest()
+
+
+class BoardState:
+    """Last poll's board rows, edge rows and input fingerprints per prop, for one date."""
+
+    def __init__(self, date, root=BOARD_STATE_DIR):
+        self.path = os.path.join(root, f"board_state_{date}.json")
+        self.props = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    self.props = json.load(f).get("props", {})
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable board state {self.path}: {e}")
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"props": self.props}, f, default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v))
+        os.replace(tmp, self.path)
+
+
+def incremental_board(quotes, date, state=None, devig_method=None, model_version=MODEL_VERSION, now=None,
+                      correlations=None):
+    """
+    Rebuild only the dirty set: props whose fingerprint changed, props new on
+    the board, and (after a model/devig change) everything. Clean props keep
+    last poll's board and edge rows; props no longer quoted drop off.
+
+    Returns (board rows, all edge rows, edge rows that changed, holds over the
+    recomputed quotes, stats). Only the changed edge rows need writing.
+    """
+    devig_method = devig_method or DEVIG_METHOD
+    state = state if state is not None else BoardState(date)
+    by_prop = {}
+    for q in quotes:
+        by_prop.setdefault(prop_key(q["player_id"], q["stat_type"]), []).append(q)
+    prints = {key: fingerprint(qs, model_version, devig_method) for key, qs in by_prop.items()}
+    dirty = {key for key, fp in prints.items() if state.props.get(key, {}).get("fingerprint") != fp}
+    dirty_quotes = [q for key in dirty for q in by_prop[key]]
+
+    new_rows, holds = build_board(dirty_quotes, devig_method=devig_method, now=now, correlations=correlations)
+    new_edges = board_edges(new_rows, date, now=now, model_version=model_version)
+    fresh = {prop_key(r["player_id"], r["stat_type"]): (r, e) for r, e in zip(new_rows, new_edges)}
+
+    dropped = len(set(state.props) - set(prints))
+    props = {}
+    for key, fp in prints.items():
+        if key in fresh:
+            row, edge = fresh[key]
+            props[key] = {"fingerprint": fp, "row": row, "edge": edge}
+        elif key in state.props and key not in dirty:
+            props[key] = state.props[key]
+    state.props = props
+    board = [p["row"] for p in props.values()]
+    # Combo model fields depend on component rows that may have moved
+    dirty_players = {by_prop[key][0]["player_id"] for key in dirty}
+    price_combos([r for r in board if r["player_id"] in dirty_players], correlations=correlations)
+    edges = [p["edge"] for p in props.values()]
+    stats = {"props": len(props), "dirty": len(dirty), "dropped": dropped}
+    return board, edges, new_edges, holds, stats
@@ -1,20 +1,71 @@
 from app.core.modeling.config import STAT_STDEV_PRIORS, MODEL_VERSION
-import math
+from app.core.pricing.devig import DEVIG_METHOD, devig
+import numpy as np
 try:
-    from scipy.special import erfinv
+    from scipy.special import ndtr, ndtri
 except ImportError:
-    erfinv = getattr(math, 'erfinv', None)
-    if erfinv is None:
-        raise ImportError('No erfinv available. Please install scipy or use Python 3.8+')
+    from statistics import NormalDist
+    # Slower fallback: element-wise stdlib normal CDF / inverse CDF
+    _cdf = np.frompyfunc(NormalDist().cdf, 1, 1)
+    _inv_cdf = np.frompyfunc(NormalDist().inv_cdf, 1, 1)
+
+    def ndtr(x):
+        x = np.asarray(x, dtype=float)
+        return _cdf(x).astype(float)
+
+    def ndtri(p):
+        p = np.asarray(p, dtype=float)
+        out = np.full(p.shape, np.nan)
+        ok = (p > 0) & (p < 1)
+        out[ok] = _inv_cdf(p[ok]).astype(float)
+        out[p == 0] = -np.inf
+        out[p == 1] = np.inf
+        return out
+
+DEFAULT_STDEV = 5.0
+
+
+def stat_stdevs(stat_types):
+    # Map stat types to prior stdevs with one dict lookup per distinct stat type
+    stat_types = np.asarray(stat_types, dtype=str)
+    uniq, inverse = np.unique(stat_types, return_inverse=True)
+    priors = np.array([STAT_STDEV_PRIORS.get(s, DEFAULT_STDEV) for s in uniq], dtype=float)
+    return priors[inverse].reshape(stat_types.shape)
+
+
+def consensus_mean_array(lines, p_over, stat_types):
+    # Solve for mean µ under normal so P(X > L) = p_over, for every prop at once:
+    # P(X > L) = Phi((µ - L) / sd)  =>  µ = L + sd * Phi^-1(p_over)
+    lines = np.asarray(lines, dtype=float)
+    z = norm_inv_array(p_over)
+    return lines + z * stat_stdevs(stat_types)
+
+
+def norm_inv_array(p):
+    return ndtri(np.asarray(p, dtype=float))
+
+
+def norm_cdf_array(x):
+    return ndtr(np.asarray(x, dtype=float))
+
+
+def price_props(over_prices, under_prices, lines, stat_types, method=DEVIG_METHOD):
+    """
+    Vectorized board pricing. Each argument is an array with one entry per prop;
+    a missing side is None/NaN. Both sides are devigged together with `method`
+    (see app.core.pricing.devig). Returns the devig dict (implied_over,
+    implied_under, p_over, p_under, hold, two_sided) plus mean, the consensus
+    projection.
+    """
+    priced = devig(over_prices, under_prices, method=method)
+    priced["mean"] = consensus_mean_array(lines, priced["p_over"], stat_types)
+    return priced
+
 
 def consensus_mean(line, p_over, stat_type):
-    # Solve for mean µ under normal so P(X > L) ≈ p_over
-    stdev = STAT_STDEV_PRIORS.get(stat_type, 5.0)
-    # Inverse normal CDF for over probability
-    z = norm_inv(1 - p_over)
-    mean = line + z * stdev
-    return mean
+    return float(consensus_mean_array(line, p_over, stat_type))
+
 
 def norm_inv(p):
-    # Approximate inverse CDF for normal
-    return math.sqrt(2) * erfinv(2 * p - 1)
+    # Inverse CDF for normal
+    return float(norm_inv_array(p))
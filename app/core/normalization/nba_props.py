@@ -1,7 +1,8 @@
 from datetime import datetime
+from app.core.normalization.players import get_index
 
 
-FOCUSED_STAT_TYPES = ["PTS", "REB", "AST", "PRA"]
+FOCUSED_STAT_TYPES = ["PTS", "REB", "AST", "PRA", "PR", "PA", "RA"]
 
 CANONICAL_MARKET_KEY = [
     "game_id", "player_id", "stat_type", "side", "line_value"
@@ -9,34 +10,59 @@ CANONICAL_MARKET_KEY = [
 
 
 
-def normalize_props(raw_props):
+# Map API market keys to canonical stat types
+MARKET_TO_STAT = {
+    "player_points": "PTS",
+    "player_rebounds": "REB",
+    "player_assists": "AST",
+    "player_threes": "3PM",
+    "player_points_rebounds_assists": "PRA",
+    "player_points_rebounds": "PR",
+    "player_points_assists": "PA",
+    "player_rebounds_assists": "RA",
+}
+
+
+def normalize_props(raw_props, players=None):
     """
     Normalize and validate event-based TheOdds API player prop odds into canonical markets.
     Args:
         raw_props (list): List of event-level odds responses from TheOdds API
+        players (PlayerIndex): name resolution (default: the shared index)
     Returns:
         list: Normalized market dicts
     """
-    normalized = []
-    # Map API market keys to canonical stat types
-    market_to_stat = {
-        "player_points": "PTS",
-        "player_rebounds": "REB",
-        "player_assists": "AST",
-        "player_threes": "3PM",
-    }
+    return list(iter_normalized(raw_props, players=players))
+
+
+def iter_normalized(raw_props, players=None):
+    """
+    Generator form of normalize_props: yields normalized market dicts event by
+    event, so callers can stream from an iterator of raw events.
+
+    Book spellings of a player are mapped to one canonical name (player_id)
+    so every book lands on the same prop; player_key is the integer
+    balldontlie id, None when the index does not know the player (the
+    book's spelling is kept). A fuzzy match must also play for one of the
+    event's teams.
+    """
+    players = players if players is not None else get_index()
     for event in raw_props:
         game_id = event.get("id")
+        teams = {players.resolve_team(t) for t in (event.get("home_team"), event.get("away_team")) if t}
+        teams.discard(None)
         bookmakers = event.get("bookmakers", [])
         for book in bookmakers:
             source = book.get("title")
             for market in book.get("markets", []):
-                stat_type = market_to_stat.get(market.get("key"))
+                stat_type = MARKET_TO_STAT.get(market.get("key"))
                 if not stat_type:
                     continue
                 for outcome in market.get("outcomes", []):
                     # Player name is in outcome["description"] or outcome["name"]
-                    player_id = outcome.get("description") or outcome.get("name")
+                    player_name = outcome.get("description") or outcome.get("name")
+                    player_key = players.resolve(player_name, teams=teams) if player_name else None
+                    player_id = players.players[player_key]["name"] if player_key is not None else player_name
                     side = outcome.get("name")  # Over/Under or player name
                     line_value = outcome.get("point")
                     price_american = outcome.get("price")
@@ -50,13 +76,16 @@ def normalize_props(raw_props):
                     market_dict = {
                         "game_id": game_id,
                         "player_id": player_id,
+                        "player_key": player_key,
                         "stat_type": stat_type,
                         "side": side.lower(),
                         "line_value": line_value,
                         "source": source,
                         "price_american": price_american,
                         "timestamp": event.get("commence_time", datetime.utcnow().isoformat()),
+                        "commence_time": event.get("commence_time"),
+                        # When the book last moved this market (observation time for lines)
+                        "last_update": market.get("last_update") or book.get("last_update"),
                         "latency_ms": 0,
                     }
-                    normalized.append(market_dict)
-    return normalized
+                    yield market_dict
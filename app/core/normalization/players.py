@@ -0,0 +1,244 @@
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from app.core.utils.logging import logger
+
+PLAYER_INDEX_PATH = os.getenv("PLAYER_INDEX_PATH", "output/player_index.json")
+# Minimum trigram Dice similarity for a fuzzy player/team match
+NAME_MATCH_CUTOFF = float(os.getenv("NAME_MATCH_CUTOFF", "0.75"))
+# A fuzzy player match must beat the runner-up (another id) by this much
+NAME_MATCH_MARGIN = float(os.getenv("NAME_MATCH_MARGIN", "0.1"))
+NGRAM = 3
+
+# balldontlie team ids 1..30 are these teams in this order
+NBA_TEAMS = [
+    "Atlanta Hawks", "Boston Celtics", "Brooklyn Nets", "Charlotte Hornets", "Chicago Bulls",
+    "Cleveland Cavaliers", "Dallas Mavericks", "Denver Nuggets", "Detroit Pistons", "Golden State Warriors",
+    "Houston Rockets", "Indiana Pacers", "Los Angeles Clippers", "Los Angeles Lakers", "Memphis Grizzlies",
+    "Miami Heat", "Milwaukee Bucks", "Minnesota Timberwolves", "New Orleans Pelicans", "New York Knicks",
+    "Oklahoma City Thunder", "Orlando Magic", "Philadelphia 76ers", "Phoenix Suns", "Portland Trail Blazers",
+    "Sacramento Kings", "San Antonio Spurs", "Toronto Raptors", "Utah Jazz", "Washington Wizards",
+]
+TEAM_ALIASES = {
+    "LA Clippers": "Los Angeles Clippers",
+    "LA Lakers": "Los Angeles Lakers",
+    "Philadelphia Sixers": "Philadelphia 76ers",
+    "GS Warriors": "Golden State Warriors",
+    "NY Knicks": "New York Knicks",
+}
+# Book spellings that normalization and trigrams cannot bridge
+PLAYER_ALIASES = {
+    "Nic Claxton": "Nicolas Claxton",
+    "Herb Jones": "Herbert Jones",
+    "Cam Thomas": "Cameron Thomas",
+    "Moe Wagner": "Moritz Wagner",
+    "Bub Carrington": "Carlton Carrington",
+}
+
+_SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+_PUNCT = re.compile(r"[^a-z0-9 ]+")
+
+
+def normalize_name(name):
+    """Lowercase ASCII, no punctuation or generational suffix:
+    "Luka Dončić" -> "luka doncic", "P.J. Washington Jr." -> "pj washington"."""
+    if not name:
+        return ""
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode("ascii").lower()
+    text = _PUNCT.sub("", text.replace("-", " "))
+    words = text.split()
+    while len(words) > 1 and words[-1] in _SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def ngrams(key, n=NGRAM):
+    padded = f"  {key} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def same_person_shape(query, candidate):
+    # Same last name, and first names where one is a prefix of the other
+    # ("nico" / "nicolas", "j" / "jalen"), so "jalen mcdaniels" never lands on
+    # "jaden mcdaniels" nor "keon johnson" on "keldon johnson"
+    q, c = query.split(), candidate.split()
+    if len(q) < 2 or len(c) < 2 or q[-1] != c[-1]:
+        return False
+    return c[0].startswith(q[0]) or q[0].startswith(c[0])
+
+
+class NameIndex:
+    """
+    Normalized-name -> id lookup with trigram fuzzy fallback. Postings
+    (trigram -> entry numbers) are built once, so a fuzzy query only scores
+    the candidates sharing a trigram with it instead of scanning every name.
+    Resolved queries are memoized.
+
+    With `people=True` a fuzzy match must also have the query's last name and
+    a compatible first name (see same_person_shape) and beat the best other
+    id by `margin`; anything less resolves to None rather than to a
+    different player.
+    """
+
+    def __init__(self, names, cutoff=NAME_MATCH_CUTOFF, people=False, margin=NAME_MATCH_MARGIN):
+        # names: iterable of (display name, id); later entries win exact ties
+        self.cutoff = cutoff
+        self.people = people
+        self.margin = margin
+        self.exact = {}
+        self.keys = []
+        self.ids = []
+        self.sizes = []
+        self.postings = {}
+        for name, ident in names:
+            key = normalize_name(name)
+            if not key:
+                continue
+            self.exact[key] = ident
+            grams = ngrams(key)
+            entry = len(self.keys)
+            self.keys.append(key)
+            self.ids.append(ident)
+            self.sizes.append(len(grams))
+            for g in grams:
+                self.postings.setdefault(g, []).append(entry)
+        self._memo = {}
+
+    def _fuzzy(self, key):
+        grams = ngrams(key)
+        shared = Counter(e for g in grams for e in self.postings.get(g, ()))
+        # Best Dice coefficient on trigram sets per id
+        scores = {}
+        for entry, count in shared.items():
+            score = 2 * count / (len(grams) + self.sizes[entry])
+            ident = self.ids[entry]
+            if score > scores.get(ident, (0.0, None))[0]:
+                scores[ident] = (score, entry)
+        ranked = sorted(scores.items(), key=lambda item: -item[1][0])
+        if not ranked or ranked[0][1][0] < self.cutoff:
+            return None
+        ident, (score, entry) = ranked[0]
+        if self.people:
+            if not same_person_shape(key, self.keys[entry]):
+                return None
+            if len(ranked) > 1 and score - ranked[1][1][0] < self.margin:
+                return None
+        return ident
+
+    def match(self, name):
+        """(id, exact) for `name`; exact is False for a fuzzy match, id None when unmatched."""
+        if name in self._memo:
+            return self._memo[name]
+        key = normalize_name(name)
+        ident = self.exact.get(key)
+        found = (ident, True) if ident is not None or not key else (self._fuzzy(key), False)
+        self._memo[name] = found
+        return found
+
+    def resolve(self, name):
+        return self.match(name)[0]
+
+
+class PlayerIndex:
+    """
+    Persisted player/team resolution shared by the adapters: any book or
+    feed spelling of a player -> stable balldontlie integer id, canonical
+    name and team. Built from the game-log store's players table (see
+    `from_store`) and saved as JSON at PLAYER_INDEX_PATH.
+    """
+
+    def __init__(self, players=None, aliases=None, cutoff=NAME_MATCH_CUTOFF):
+        # players: {player_id: {"name": ..., "team_id": ...}}
+        self.players = {int(k): v for k, v in (players or {}).items()}
+        self.aliases = dict(PLAYER_ALIASES, **(aliases or {}))
+        by_name = {normalize_name(p["name"]): pid for pid, p in sorted(self.players.items())}
+        names = [(p["name"], pid) for pid, p in sorted(self.players.items())]
+        # Aliases point at whichever id their canonical name resolves to
+        names += [(alias, by_name[normalize_name(target)]) for alias, target in self.aliases.items()
+                  if normalize_name(target) in by_name]
+        self.names = NameIndex(names, cutoff=cutoff, people=True)
+        self.teams = NameIndex([(t, t) for t in NBA_TEAMS] + list(TEAM_ALIASES.items())
+                               + [(t.rsplit(" ", 1)[-1], t) for t in NBA_TEAMS], cutoff=cutoff)
+
+    @classmethod
+    def from_store(cls, store, aliases=None):
+        from app.core.storage.gamelogs import players
+        with store.engine.connect() as conn:
+            rows = conn.execute(players.select()).fetchall()
+        return cls({r.player_id: {"name": f"{r.first_name} {r.last_name}".strip(), "team_id": r.team_id}
+                    for r in rows}, aliases=aliases)
+
+    @classmethod
+    def load(cls, path=PLAYER_INDEX_PATH):
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable player index {path}: {e}")
+            return cls()
+        return cls(data.get("players"), aliases=data.get("aliases"))
+
+    def save(self, path=PLAYER_INDEX_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        extra = {k: v for k, v in self.aliases.items() if PLAYER_ALIASES.get(k) != v}
+        with open(tmp, "w") as f:
+            json.dump({"players": {str(k): v for k, v in self.players.items()}, "aliases": extra}, f)
+        os.replace(tmp, path)
+
+    def __len__(self):
+        return len(self.players)
+
+    def resolve(self, name, teams=None):
+        """
+        balldontlie player id for any spelling of `name`, or None. A fuzzy
+        (non-exact, non-alias) match is dropped when `teams` (canonical team
+        names, e.g. the event's two sides) does not include the player's team.
+        """
+        pid, exact = self.names.match(name)
+        if pid is None or exact or not teams:
+            return pid
+        team = self._team(pid)
+        return pid if team is None or team in teams else None
+
+    def _team(self, pid):
+        team_id = self.players[pid].get("team_id")
+        return NBA_TEAMS[team_id - 1] if team_id and 1 <= team_id <= len(NBA_TEAMS) else None
+
+    def canonical_name(self, name):
+        # Canonical display name, or the input unchanged when unknown
+        pid = self.resolve(name)
+        return self.players[pid]["name"] if pid is not None else name
+
+    def team_of(self, name):
+        pid = self.resolve(name)
+        return self._team(pid) if pid is not None else None
+
+    def resolve_team(self, name):
+        """Canonical NBA team name for a full name, alias or nickname."""
+        return self.teams.resolve(name)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Process-wide index, loaded from PLAYER_INDEX_PATH on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = PlayerIndex.load()
+    return _index
+
+
+def set_index(index):
+    # Swap in a rebuilt index (after a game-log refresh) or a test fixture
+    global _index
+    _index = index
@@ -0,0 +1,115 @@
+import os
+import numpy as np
+from app.core.pricing.odds_math import american_to_implied_prob_array
+
+DEVIG_METHODS = ("multiplicative", "additive", "power", "shin")
+# Method used by the board unless a caller asks for another one
+DEVIG_METHOD = os.getenv("DEVIG_METHOD", "multiplicative")
+POWER_MAX_ITER = 50
+POWER_TOL = 1e-12
+
+
+def _multiplicative(p_over, p_under, total):
+    return p_over / total, p_under / total
+
+
+def _additive(p_over, p_under, total):
+    # Take half the overround off each side; clip longshots that would go negative
+    margin = (total - 1) / 2
+    fair_over = np.clip(p_over - margin, 0.0, 1.0)
+    fair_under = np.clip(p_under - margin, 0.0, 1.0)
+    s = fair_over + fair_under
+    return fair_over / s, fair_under / s
+
+
+def _power(p_over, p_under, total):
+    # Solve p_over**k + p_under**k = 1 for k with vectorized Newton steps.
+    # f(k) is convex and decreasing, so from k=1 the iterates converge monotonically.
+    k = np.ones_like(p_over)
+    log_o, log_u = np.log(p_over), np.log(p_under)
+    for _ in range(POWER_MAX_ITER):
+        po, pu = p_over ** k, p_under ** k
+        f = po + pu - 1
+        step = f / (po * log_o + pu * log_u)
+        k = k - step
+        if np.nanmax(np.abs(step), initial=0.0) < POWER_TOL:
+            break
+    fair_over = p_over ** k
+    return fair_over, 1 - fair_over
+
+
+def _shin(p_over, p_under, total):
+    # Closed-form insider share z for two outcomes (Jullien & Salanie). With two
+    # outcomes Shin's fair prices coincide with the additive method.
+    diff = p_over - p_under
+    z = ((total - 1) * (diff ** 2 - total)) / (total * (diff ** 2 - 1))
+
+    def fair(p):
+        return (np.sqrt(z ** 2 + 4 * (1 - z) * p ** 2 / total) - z) / (2 * (1 - z))
+
+    fair_over = fair(p_over)
+    return fair_over, 1 - fair_over
+
+
+_SOLVERS = {
+    "multiplicative": _multiplicative,
+    "additive": _additive,
+    "power": _power,
+    "shin": _shin,
+}
+
+
+def devig_probs(p_over, p_under, method=DEVIG_METHOD):
+    """
+    Fair (no-vig) over/under probabilities from implied probabilities, one
+    entry per (player, stat, line, book). Returns (fair_over, fair_under, hold)
+    where hold is the book's overround (p_over + p_under - 1).
+
+    Rows missing one side have no measurable hold: they are priced off the
+    quoted side against its complement and get hold = NaN.
+    """
+    solver = _SOLVERS.get(method)
+    if solver is None:
+        raise ValueError(f"Unknown devig method {method!r}; expected one of {DEVIG_METHODS}")
+    p_over = np.asarray(p_over, dtype=float)
+    p_under = np.asarray(p_under, dtype=float)
+    two_sided = ~(np.isnan(p_over) | np.isnan(p_under))
+    fair_over = np.where(np.isnan(p_over), 1 - p_under, p_over)
+    fair_under = 1 - fair_over
+    hold = np.full(p_over.shape, np.nan)
+    if two_sided.any():
+        po, pu = p_over[two_sided], p_under[two_sided]
+        total = po + pu
+        fair_over[two_sided], fair_under[two_sided] = solver(po, pu, total)
+        hold[two_sided] = total - 1
+    return fair_over, fair_under, hold
+
+
+def devig(over_prices, under_prices, method=DEVIG_METHOD):
+    """
+    Vectorized two-sided devig from American prices (None/NaN = side not quoted).
+    Returns a dict of arrays: implied_over, implied_under, p_over, p_under
+    (fair), hold and two_sided.
+    """
+    implied_over = american_to_implied_prob_array(over_prices)
+    implied_under = american_to_implied_prob_array(under_prices)
+    p_over, p_under, hold = devig_probs(implied_over, implied_under, method=method)
+    return {
+        "implied_over": implied_over,
+        "implied_under": implied_under,
+        "p_over": p_over,
+        "p_under": p_under,
+        "hold": hold,
+        "two_sided": ~np.isnan(hold),
+    }
+
+
+def book_holds(sources, hold):
+    """Average measured hold per book over its two-sided rows: {source: hold}."""
+    sources = np.asarray(sources, dtype=str)
+    hold = np.asarray(hold, dtype=float)
+    ok = ~np.isnan(hold)
+    books, inverse = np.unique(sources[ok], return_inverse=True)
+    sums = np.bincount(inverse, weights=hold[ok], minlength=len(books))
+    counts = np.bincount(inverse, minlength=len(books))
+    return {book: float(s / c) for book, s, c in zip(books.tolist(), sums, counts)}
@@ -1,11 +1,24 @@
 import math
+import numpy as np
 
-def american_to_implied_prob(odds):
-    if odds > 0:
-        return 100 / (odds + 100)
-    else:
-        return -odds / (-odds + 100)
+# Batch API: arrays in, arrays out. Missing prices (None/NaN) propagate as NaN.
+# The scalar functions below are thin wrappers kept for existing callers.
 
-def remove_vig(p_over, p_under):
+def american_to_implied_prob_array(odds):
+    odds = np.asarray(odds, dtype=float)
+    a = np.abs(odds)
+    # Favourite: |o| / (|o| + 100); underdog: 100 / (o + 100)
+    return np.where(odds > 0, 100.0, a) / (a + 100.0)
+
+def remove_vig_array(p_over, p_under):
+    p_over = np.asarray(p_over, dtype=float)
+    p_under = np.asarray(p_under, dtype=float)
     total = p_over + p_under
     return p_over / total, p_under / total
+
+def american_to_implied_prob(odds):
+    return float(american_to_implied_prob_array(odds))
+
+def remove_vig(p_over, p_under):
+    fair_over, fair_under = remove_vig_array(p_over, p_under)
+    return float(fair_over), float(fair_under)
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import threading
+import zlib
+from app.core.normalization.nba_props import iter_normalized
+from app.core.utils.time import utc_now
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+RAW_ARCHIVE_DIR = os.getenv("RAW_ARCHIVE_DIR", "output/raw")
+SEGMENT_MAX_BYTES = int(os.getenv("RAW_ARCHIVE_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+ZSTD_LEVEL = 3
+INDEX_FILE = "index.jsonl"
+
+
+class _Codec:
+    # zstd when installed, zlib otherwise; the index records which one wrote each record
+    def __init__(self):
+        if zstandard is not None:
+            self.name = "zstd"
+            self._c = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+            self._d = zstandard.ZstdDecompressor()
+        else:
+            self.name = "zlib"
+
+    def compress(self, data):
+        return self._c.compress(data) if self.name == "zstd" else zlib.compress(data, 6)
+
+    @staticmethod
+    def decompress(data, name):
+        if name == "zstd":
+            if zstandard is None:
+                raise RuntimeError("Archive record is zstd-compressed; install zstandard to read it")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+
+class RawArchive:
+    """
+    Append-only archive of raw TheOdds event payloads.
+
+    Each day is a directory of segment files holding independently compressed
+    records, plus an index.jsonl with one line per record (event_id, fetched_at,
+    segment, offset, length, codec, hash) so any record is one seek + one read.
+    A payload identical to the event's latest record that day (a cached
+    response, or a poll where nothing moved) is not archived again.
+    """
+
+    def __init__(self, root=RAW_ARCHIVE_DIR, segment_max_bytes=SEGMENT_MAX_BYTES):
+        self.root = root
+        self.segment_max_bytes = segment_max_bytes
+        self.codec = _Codec()
+        self._lock = threading.Lock()
+        # {date: {event_id: content hash of its latest record}}, loaded from the index
+        self._latest = {}
+
+    def _day_dir(self, date):
+        return os.path.join(self.root, str(date))
+
+    def _current_segment(self, day_dir):
+        segments = sorted(f for f in os.listdir(day_dir) if f.startswith("segment-"))
+        if segments:
+            last = segments[-1]
+            if os.path.getsize(os.path.join(day_dir, last)) < self.segment_max_bytes:
+                return last
+            n = int(last.split("-")[1].split(".")[0]) + 1
+        else:
+            n = 0
+        return f"segment-{n:05d}.bin"
+
+    def _latest_hashes(self, date):
+        # Caller holds the lock; entries written before hashes were recorded are ignored
+        latest = self._latest.get(str(date))
+        if latest is None:
+            latest = self._latest[str(date)] = {e["event_id"]: e.get("hash") for e in self.entries(date)}
+        return latest
+
+    def append(self, payload, date, fetched_at=None):
+        """Archive one payload; returns its index entry, or None when unchanged."""
+        data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        event_id = payload.get("id") if isinstance(payload, dict) else None
+        with self._lock:
+            if event_id is not None and self._latest_hashes(date).get(event_id) == digest:
+                return None
+        record = self.codec.compress(data)
+        entry = {
+            "event_id": event_id,
+            "fetched_at": (fetched_at or utc_now()).isoformat(),
+            "codec": self.codec.name,
+            "hash": digest,
+        }
+        with self._lock:
+            latest = self._latest_hashes(date)
+            if event_id is not None and latest.get(event_id) == digest:
+                return None
+            day_dir = self._day_dir(date)
+            os.makedirs(day_dir, exist_ok=True)
+            segment = self._current_segment(day_dir)
+            with open(os.path.join(day_dir, segment), "ab") as f:
+                entry.update(segment=segment, offset=f.tell(), length=len(record))
+                f.write(record)
+            with open(os.path.join(day_dir, INDEX_FILE), "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            latest[event_id] = digest
+        return entry
+
+    def entries(self, date, event_id=None, latest_only=False):
+        path = os.path.join(self._day_dir(date), INDEX_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path, "r") as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        if event_id is not None:
+            entries = [e for e in entries if e["event_id"] == event_id]
+        if latest_only:
+            latest = {}
+            for e in entries:
+                latest[e["event_id"]] = e
+            entries = list(latest.values())
+        return entries
+
+    def iter_payloads(self, date, event_id=None, latest_only=False):
+        day_dir = self._day_dir(date)
+        handles = {}
+        try:
+            for e in self.entries(date, event_id=event_id, latest_only=latest_only):
+                f = handles.get(e["segment"])
+                if f is None:
+                    f = handles[e["segment"]] = open(os.path.join(day_dir, e["segment"]), "rb")
+                f.seek(e["offset"])
+                yield json.loads(_Codec.decompress(f.read(e["length"]), e["codec"]))
+        finally:
+            for f in handles.values():
+                f.close()
+
+    def replay(self, date, latest_only=False):
+        """Re-normalize a day's archived payloads without network access."""
+        return iter_normalized(self.iter_payloads(date, latest_only=latest_only))
@@ -0,0 +1,90 @@
+import os
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.core.storage.engine import apply_sqlite_pragmas
+from app.core.storage.repository import DATABASE_URL, Edge, Market, Pick, _day_bounds
+from app.core.utils.ids import generate_id
+
+# Async driver equivalents of the sync DATABASE_URL drivers
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+
+def to_async_url(url):
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+
+_engine = None
+_sessionmaker = None
+
+
+def get_async_engine():
+    # Created lazily so importing the API does not require the async driver
+    global _engine, _sessionmaker
+    if _engine is None:
+        kwargs = {"pool_pre_ping": True}
+        if not ASYNC_DATABASE_URL.startswith("sqlite"):
+            kwargs.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW,
+                          pool_timeout=DB_POOL_TIMEOUT, pool_recycle=DB_POOL_RECYCLE)
+        _engine = create_async_engine(ASYNC_DATABASE_URL, **kwargs)
+        if _engine.dialect.name == "sqlite":
+            apply_sqlite_pragmas(_engine.sync_engine)
+        _sessionmaker = async_sessionmaker(_engine, expire_on_commit=False)
+    return _engine
+
+
+async def get_session():
+    """FastAPI dependency: one AsyncSession per request, always closed."""
+    get_async_engine()
+    async with _sessionmaker() as session:
+        yield session
+
+
+async def dispose_engine():
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = _sessionmaker = None
+
+
+class AsyncNBARepository:
+    """Request-scoped async counterpart of NBARepository for the API."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def store_pick(self, pick):
+        row = dict(pick)
+        row.setdefault("id", generate_id())
+        row.setdefault("picked_at", datetime.utcnow())
+        self.session.add(Pick(**row))
+        await self.session.commit()
+        return row
+
+    async def get_edges(self, date, stat_type=None, limit=50):
+        start, end = _day_bounds(date)
+        stmt = (
+            select(Edge.market_id, Market.player_id, Market.stat_type, Edge.model_version, Edge.p_over,
+                   Edge.p_under, Edge.p_push, Edge.fair_odds_over, Edge.fair_odds_under, Edge.edge_over,
+                   Edge.edge_under, Edge.freshness_score, Edge.timestamp)
+            .join(Market, Market.id == Edge.market_id)
+            .where(Edge.timestamp >= start, Edge.timestamp < end)
+        )
+        if stat_type:
+            stmt = stmt.where(Market.stat_type == stat_type)
+        stmt = stmt.order_by(Edge.timestamp.desc()).limit(limit)
+        result = await self.session.execute(stmt)
+        return [dict(r._mapping) for r in result]
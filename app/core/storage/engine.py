@@ -0,0 +1,60 @@
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import StaticPool
+
+# Applied on every new SQLite connection. WAL lets the API read while ingest
+# writes; synchronous=NORMAL is durable across app crashes in WAL mode and
+# avoids an fsync per commit on bulk loads.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    # Negative = KiB, so 64 MiB of page cache
+    "cache_size": -int(os.getenv("SQLITE_CACHE_KB", "65536")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_BYTES", str(256 * 1024 * 1024))),
+    "temp_store": "MEMORY",
+}
+
+
+def is_sqlite(url):
+    return make_url(str(url)).get_backend_name() == "sqlite"
+
+
+def is_memory_sqlite(url):
+    url = make_url(str(url))
+    return is_sqlite(url) and url.database in (None, "", ":memory:")
+
+
+def apply_sqlite_pragmas(engine, pragmas=None):
+    """Set `pragmas` (default SQLITE_PRAGMAS) on each connection `engine` opens.
+    Works for async engines too via engine.sync_engine."""
+    pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return engine
+
+
+def create_db_engine(url, **kwargs):
+    """Engine for `url`: PostgreSQL as-is, SQLite with the embedded-mode pragmas.
+
+    In-memory SQLite shares one connection across threads so every session
+    sees the same database.
+    """
+    if not is_sqlite(url):
+        return create_engine(url, **kwargs)
+    if is_memory_sqlite(url):
+        kwargs.setdefault("poolclass", StaticPool)
+        kwargs.setdefault("connect_args", {"check_same_thread": False})
+    else:
+        database = make_url(str(url)).database
+        folder = os.path.dirname(database)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+    return apply_sqlite_pragmas(create_engine(url, **kwargs))
@@ -0,0 +1,342 @@
+import os
+from datetime import date as date_type, datetime, timedelta
+import pandas as pd
+from sqlalchemy import (Column, Date, DateTime, Float, Index, Integer, MetaData, String, Table, bindparam, func,
+                        select, text)
+from sqlalchemy.dialects import postgresql, sqlite
+from app.core.modeling.config import RATE_LIMITS
+from app.core.storage.engine import create_db_engine
+from app.core.utils import http_client
+from app.core.utils.logging import logger
+from app.core.utils.ratelimit import TokenBucket
+
+BALLDONTLIE_BASE_URL = os.getenv("BALLDONTLIE_BASE_URL", "https://www.balldontlie.io/api/v1/")
+# Separate file from the props DB: it is a cache of public box scores and can be rebuilt
+GAMELOG_DB_URL = os.getenv("GAMELOG_DB_URL", "sqlite:///output/gamelogs.db")
+# Trailing days of the last refresh window fetched again (late stat corrections)
+GAMELOG_REFRESH_OVERLAP_DAYS = int(os.getenv("GAMELOG_REFRESH_OVERLAP_DAYS", "1"))
+STATS_PAGE_SIZE = 100
+# Box score columns kept per player-game (balldontlie field names)
+STATS = ("pts", "reb", "ast", "fg3m", "stl", "blk", "turnover")
+# Rolling windows precomputed next to the season averages (pts_l5, pts_l10, ...)
+ROLLING_WINDOWS = (5, 10)
+# Max bind parameters per IN (...) list
+IN_CHUNK = 1000
+
+metadata = MetaData()
+
+game_logs = Table(
+    "game_logs", metadata,
+    Column("player_id", Integer, primary_key=True),
+    Column("game_id", Integer, primary_key=True),
+    Column("game_date", Date),
+    Column("season", Integer),
+    Column("team_id", Integer),
+    Column("minutes", Float),
+    *[Column(s, Float) for s in STATS],
+    Index("ix_game_logs_player_season_date", "player_id", "season", "game_date"),
+    Index("ix_game_logs_game_date", "game_date"),
+)
+
+players = Table(
+    "players", metadata,
+    Column("player_id", Integer, primary_key=True),
+    Column("first_name", String),
+    Column("last_name", String),
+    Column("position", String),
+    Column("team_id", Integer),
+)
+
+player_averages = Table(
+    "player_averages", metadata,
+    Column("player_id", Integer, primary_key=True),
+    Column("season", Integer, primary_key=True),
+    Column("games", Integer),
+    Column("last_game_date", Date),
+    Column("minutes", Float),
+    *[Column(s, Float) for s in STATS],
+    *[Column(f"{s}_l{n}", Float) for n in ROLLING_WINDOWS for s in STATS],
+    Column("updated_at", DateTime),
+)
+
+refresh_state = Table(
+    "gamelog_refresh", metadata,
+    Column("name", String, primary_key=True),
+    Column("last_date", Date),
+    Column("updated_at", DateTime),
+)
+
+_UPSERT = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+_rate_limiter = TokenBucket(RATE_LIMITS["balldontlie"])
+
+
+def season_for(day):
+    # balldontlie seasons are named by the year they start (October)
+    return day.year if day.month >= 10 else day.year - 1
+
+
+def parse_minutes(value):
+    # "34:12", "34", "" or None (DNP)
+    if not value:
+        return 0.0
+    mins, _, secs = str(value).partition(":")
+    try:
+        return float(mins) + (float(secs) / 60 if secs else 0.0)
+    except ValueError:
+        return 0.0
+
+
+def _to_date(value):
+    if isinstance(value, date_type):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def stat_rows(data):
+    """Flatten /stats payload entries into (game_logs rows, players rows)."""
+    logs, people = [], {}
+    for s in data:
+        player, game, team = s.get("player") or {}, s.get("game") or {}, s.get("team") or {}
+        if not player.get("id") or not game.get("id"):
+            continue
+        row = {
+            "player_id": player["id"],
+            "game_id": game["id"],
+            "game_date": _to_date(game["date"]),
+            "season": game.get("season"),
+            "team_id": team.get("id") or player.get("team_id"),
+            "minutes": parse_minutes(s.get("min")),
+        }
+        for stat in STATS:
+            row[stat] = float(s.get(stat) or 0)
+        logs.append(row)
+        people[player["id"]] = {
+            "player_id": player["id"],
+            "first_name": player.get("first_name"),
+            "last_name": player.get("last_name"),
+            "position": player.get("position"),
+            "team_id": row["team_id"],
+        }
+    return logs, list(people.values())
+
+
+def _chunks(items, size=IN_CHUNK):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class GameLogStore:
+    """
+    Local copy of balldontlie box scores: one row per player-game plus
+    precomputed season and rolling (last N games) averages per player-season.
+
+    `refresh()` pulls only the dates since the last refresh, league-wide, so a
+    nightly run costs a few pages instead of a search + logs + averages round
+    trip per player. Feature reads for a whole slate are one indexed query.
+    """
+
+    def __init__(self, url=GAMELOG_DB_URL, base_url=BALLDONTLIE_BASE_URL, rate_limiter=None):
+        self.engine = create_db_engine(url)
+        self.base_url = base_url
+        self.rate_limiter = rate_limiter or _rate_limiter
+        metadata.create_all(self.engine)
+
+    def close(self):
+        self.engine.dispose()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Fetching
+
+    def _fetch_stats(self, params):
+        """Page through /stats for `params`; returns the concatenated data."""
+        data, page = [], 1
+        while page:
+            self.rate_limiter.acquire()
+            resp = http_client.get(f"{self.base_url}stats",
+                                   params={**params, "per_page": STATS_PAGE_SIZE, "page": page})
+            resp.raise_for_status()
+            body = resp.json()
+            batch = body.get("data") or []
+            data.extend(batch)
+            meta = body.get("meta") or {}
+            if "next_page" in meta:
+                page = meta["next_page"]
+            else:
+                page = page + 1 if len(batch) == STATS_PAGE_SIZE else None
+        return data
+
+    # Writing
+
+    def _upsert(self, conn, table, rows, keys):
+        if not rows:
+            return
+        insert = _UPSERT[conn.dialect.name]
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={c.name: stmt.excluded[c.name] for c in table.columns if c.name not in keys},
+        )
+        conn.execute(stmt, rows)
+
+    def store_stats(self, data):
+        """Upsert a /stats payload and recompute averages for the player-seasons it touched."""
+        logs, people = stat_rows(data)
+        with self.engine.begin() as conn:
+            self._upsert(conn, game_logs, logs, ["player_id", "game_id"])
+            self._upsert(conn, players, people, ["player_id"])
+            touched = {(r["player_id"], r["season"]) for r in logs}
+            self._recompute_averages(conn, touched)
+        return len(logs)
+
+    def _recompute_averages(self, conn, touched):
+        """
+        Season and last-N averages for the touched (player, season) pairs in
+        one windowed aggregate per season. DNPs (0 minutes) are stored but not
+        averaged.
+        """
+        by_season = {}
+        for player_id, season in touched:
+            by_season.setdefault(season, set()).add(player_id)
+        now = datetime.utcnow()
+        cols = ["minutes", *STATS]
+        rolling = ", ".join(f"AVG(CASE WHEN rn <= {n} THEN {s} END) AS {s}_l{n}"
+                            for n in ROLLING_WINDOWS for s in STATS)
+        sql = text(f"""
+            WITH ranked AS (
+                SELECT player_id, season, game_date, {", ".join(cols)},
+                       ROW_NUMBER() OVER (PARTITION BY player_id, season
+                                          ORDER BY game_date DESC, game_id DESC) AS rn
+                FROM game_logs
+                WHERE season = :season AND player_id IN :player_ids AND minutes > 0
+            )
+            SELECT player_id, season, COUNT(*) AS games, MAX(game_date) AS last_game_date,
+                   {", ".join(f"AVG({c}) AS {c}" for c in cols)}, {rolling}
+            FROM ranked
+            GROUP BY player_id, season
+        """).bindparams(bindparam("player_ids", expanding=True))
+        for season, player_ids in by_season.items():
+            for chunk in _chunks(sorted(player_ids)):
+                rows = [dict(r._mapping) for r in conn.execute(sql, {"season": season, "player_ids": chunk})]
+                for r in rows:
+                    r["last_game_date"] = _to_date(r["last_game_date"])
+                    r["updated_at"] = now
+                self._upsert(conn, player_averages, rows, ["player_id", "season"])
+
+    def last_refreshed(self):
+        with self.engine.connect() as conn:
+            return conn.execute(select(refresh_state.c.last_date).where(refresh_state.c.name == "stats")).scalar()
+
+    def _mark_refreshed(self, day):
+        with self.engine.begin() as conn:
+            self._upsert(conn, refresh_state, [{"name": "stats", "last_date": day, "updated_at": datetime.utcnow()}],
+                         ["name"])
+
+    def refresh(self, through=None, since=None):
+        """
+        Pull every player's box scores from the day after the last refresh
+        (minus GAMELOG_REFRESH_OVERLAP_DAYS for late corrections) through
+        `through` (default yesterday), one league-wide date range at a time.
+        `since` forces the start date (first backfill defaults to the start of
+        `through`'s season). Returns the number of player-games stored.
+        """
+        through = _to_date(through) if through else date_type.today() - timedelta(days=1)
+        if since is not None:
+            start = _to_date(since)
+        else:
+            last = self.last_refreshed()
+            if last is None:
+                start = date_type(season_for(through), 10, 1)
+            else:
+                start = last + timedelta(days=1 - GAMELOG_REFRESH_OVERLAP_DAYS)
+        if start > through:
+            return 0
+        data = self._fetch_stats({"start_date": start.isoformat(), "end_date": through.isoformat()})
+        stored = self.store_stats(data)
+        last = self.last_refreshed()
+        self._mark_refreshed(max(through, last) if last else through)
+        logger.info(f"Game logs refreshed {start}..{through}: {stored} player-games")
+        return stored
+
+    def backfill_players(self, player_ids, season):
+        """Pull one season of logs for specific players (ad hoc lookups outside the refresh window)."""
+        stored = 0
+        for chunk in _chunks(player_ids, 25):
+            data = self._fetch_stats({"player_ids[]": list(chunk), "seasons[]": season})
+            stored += self.store_stats(data)
+        return stored
+
+    def ensure_dates(self, dates):
+        """
+        Make sure box scores for `dates` are local: dates the refresh window
+        already covers (or that have rows) are skipped, the rest are pulled
+        league-wide, a handful of dates per paginated request.
+        Returns the dates that were fetched.
+        """
+        dates = sorted({_to_date(d) for d in dates})
+        if not dates:
+            return []
+        last = self.last_refreshed()
+        with self.engine.connect() as conn:
+            have = {_to_date(d) for (d,) in conn.execute(
+                select(game_logs.c.game_date).where(game_logs.c.game_date.in_(dates)).distinct())}
+        missing = [d for d in dates if d not in have and (last is None or d > last)]
+        for chunk in _chunks(missing, 10):
+            self.store_stats(self._fetch_stats({"dates[]": [d.isoformat() for d in chunk]}))
+        return missing
+
+    # Reading
+
+    def box_scores(self, dates):
+        """Every player-game on `dates` (DNPs included, minutes 0) as a DataFrame."""
+        dates = sorted({_to_date(d) for d in dates})
+        columns = [c.name for c in game_logs.columns]
+        rows = []
+        with self.engine.connect() as conn:
+            for chunk in _chunks(dates):
+                rows.extend(dict(r._mapping) for r in conn.execute(
+                    select(game_logs).where(game_logs.c.game_date.in_(chunk))))
+        return pd.DataFrame(rows, columns=columns)
+
+    def latest_season(self):
+        with self.engine.connect() as conn:
+            return conn.execute(select(func.max(game_logs.c.season))).scalar()
+
+    def features(self, player_ids, season=None):
+        """Precomputed averages for many players: {player_id: {games, pts, pts_l5, ...}}."""
+        season = season or self.latest_season()
+        out = {}
+        with self.engine.connect() as conn:
+            for chunk in _chunks(set(player_ids)):
+                stmt = select(player_averages).where(player_averages.c.season == season,
+                                                     player_averages.c.player_id.in_(chunk))
+                for r in conn.execute(stmt):
+                    out[r.player_id] = dict(r._mapping)
+        return out
+
+    def game_logs(self, player_ids=None, season=None, last_n=None):
+        """Player-game rows (newest first per player) as a DataFrame; DNPs excluded."""
+        stmt = select(game_logs).where(game_logs.c.minutes > 0)
+        if season is not None:
+            stmt = stmt.where(game_logs.c.season == season)
+        frames = []
+        with self.engine.connect() as conn:
+            chunks = _chunks(set(player_ids)) if player_ids is not None else [None]
+            for chunk in chunks:
+                chunk_stmt = stmt if chunk is None else stmt.where(game_logs.c.player_id.in_(chunk))
+                chunk_stmt = chunk_stmt.order_by(game_logs.c.player_id, game_logs.c.game_date.desc())
+                frames.append(pd.DataFrame([dict(r._mapping) for r in conn.execute(chunk_stmt)],
+                                           columns=[c.name for c in game_logs.columns]))
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=[c.name for c in game_logs.columns])
+        if last_n is not None and not df.empty:
+            df = df.groupby("player_id", sort=False).head(last_n).reset_index(drop=True)
+        return df
@@ -0,0 +1,150 @@
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import delete, select, text
+from app.core.storage.repository import Line, LineRollup
+from app.core.utils.ids import generate_id
+from app.core.utils.logging import logger
+
+# Raw lines older than this are rolled up hourly and then dropped
+LINES_RETENTION_DAYS = int(os.getenv("LINES_RETENTION_DAYS", "14"))
+# Daily partitions created ahead of time
+LINES_PARTITION_DAYS_AHEAD = int(os.getenv("LINES_PARTITION_DAYS_AHEAD", "3"))
+ROLLUP_BATCH_SIZE = 5000
+
+
+def partition_name(day):
+    return f"lines_p{day:%Y%m%d}"
+
+
+def is_partitioned(session):
+    if session.get_bind().dialect.name != "postgresql":
+        return False
+    kind = session.execute(text("SELECT relkind FROM pg_class WHERE relname = 'lines'")).scalar()
+    return kind == "p"
+
+
+def list_line_partitions(session):
+    rows = session.execute(text("""
+        SELECT child.relname FROM pg_inherits
+        JOIN pg_class parent ON pg_inherits.inhparent = parent.oid
+        JOIN pg_class child ON pg_inherits.inhrelid = child.oid
+        WHERE parent.relname = 'lines'
+    """)).scalars()
+    days = {}
+    for name in rows:
+        if name.startswith("lines_p"):
+            days[datetime.strptime(name[len("lines_p"):], "%Y%m%d").date()] = name
+    return days
+
+
+def ensure_line_partitions(session, start=None, days_ahead=LINES_PARTITION_DAYS_AHEAD):
+    """Create daily partitions from `start` through `days_ahead` days later.
+
+    Rows that already landed in lines_default for a day are moved into the new
+    partition before it is attached. No-op unless lines is partitioned.
+    """
+    if not is_partitioned(session):
+        return []
+    start = start or datetime.utcnow().date()
+    existing = list_line_partitions(session)
+    created = []
+    for i in range(days_ahead + 1):
+        day = start + timedelta(days=i)
+        if day in existing:
+            continue
+        name, lo, hi = partition_name(day), day.isoformat(), (day + timedelta(days=1)).isoformat()
+        params = {"lo": lo, "hi": hi}
+        stray = session.execute(text(
+            'SELECT 1 FROM lines_default WHERE "timestamp" >= :lo AND "timestamp" < :hi LIMIT 1'), params).first()
+        if stray:
+            session.execute(text(f"CREATE TABLE {name} (LIKE lines INCLUDING DEFAULTS)"))
+            session.execute(text(
+                f'INSERT INTO {name} SELECT * FROM lines_default WHERE "timestamp" >= :lo AND "timestamp" < :hi'), params)
+            session.execute(text('DELETE FROM lines_default WHERE "timestamp" >= :lo AND "timestamp" < :hi'), params)
+            session.execute(text(f"ALTER TABLE lines ATTACH PARTITION {name} FOR VALUES FROM ('{lo}') TO ('{hi}')"))
+        else:
+            session.execute(text(f"CREATE TABLE {name} PARTITION OF lines FOR VALUES FROM ('{lo}') TO ('{hi}')"))
+        created.append(name)
+    session.commit()
+    return created
+
+
+def rollup_lines_hourly(repo, before):
+    """Upsert per-market/source/side hourly open/high/low/close price and point
+    for raw lines older than `before`. Streams rows in key order, so memory
+    stays flat regardless of table size. Returns the number of roll-up rows."""
+    stmt = (
+        select(Line.market_id, Line.source, Line.side, Line.timestamp, Line.price_american, Line.line_value)
+        .where(Line.timestamp < before)
+        .order_by(Line.market_id, Line.source, Line.side, Line.timestamp)
+        .execution_options(yield_per=ROLLUP_BATCH_SIZE)
+    )
+    batch = []
+    total = 0
+    current = None
+    # One transaction: a commit mid-stream would close the server-side cursor
+    with repo.transaction():
+        for market_id, source, side, ts, price, point in repo.session.execute(stmt):
+            bucket = ts.replace(minute=0, second=0, microsecond=0)
+            key = (market_id, source, side, bucket)
+            if current is None or current["key"] != key:
+                if current is not None:
+                    batch.append(_rollup_row(current))
+                current = {"key": key, "prices": [], "points": []}
+            current["prices"].append(price)
+            current["points"].append(point)
+            if len(batch) >= ROLLUP_BATCH_SIZE:
+                repo.store_line_rollups(batch)
+                total += len(batch)
+                batch = []
+        if current is not None:
+            batch.append(_rollup_row(current))
+        if batch:
+            repo.store_line_rollups(batch)
+            total += len(batch)
+    return total
+
+
+def _rollup_row(acc):
+    market_id, source, side, bucket = acc["key"]
+    prices, points = acc["prices"], acc["points"]
+    return {
+        "id": generate_id("rollup", market_id, source, side, bucket.isoformat()),
+        "market_id": market_id,
+        "source": source,
+        "side": side,
+        "bucket_start": bucket,
+        "open_price": prices[0],
+        "high_price": max(prices),
+        "low_price": min(prices),
+        "close_price": prices[-1],
+        "open_point": points[0],
+        "high_point": max(points),
+        "low_point": min(points),
+        "close_point": points[-1],
+        "n_obs": len(prices),
+    }
+
+
+def compact_lines(repo, retention_days=LINES_RETENTION_DAYS, now=None):
+    """Roll up raw lines older than the retention window, then drop them:
+    whole daily partitions on PostgreSQL, a range DELETE elsewhere."""
+    now = now or datetime.utcnow()
+    # Day-aligned cutoff so every hourly bucket is rolled up from complete data
+    cutoff = datetime.combine((now - timedelta(days=retention_days)).date(), datetime.min.time())
+    dropped = []
+    deleted = None
+    session = repo.session
+    with repo.transaction():
+        rollups = rollup_lines_hourly(repo, cutoff)
+        if is_partitioned(session):
+            for day, name in sorted(list_line_partitions(session).items()):
+                if day < cutoff.date():
+                    session.execute(text(f"DROP TABLE {name}"))
+                    dropped.append(name)
+            session.execute(text('DELETE FROM lines_default WHERE "timestamp" < :cutoff'), {"cutoff": cutoff})
+        else:
+            deleted = session.execute(delete(Line).where(Line.timestamp < cutoff)).rowcount
+    logger.info(f"Compacted lines before {cutoff}: {rollups} hourly roll-ups, "
+                f"dropped partitions={dropped}, deleted rows={deleted}")
+    return {"cutoff": cutoff, "rollups": rollups, "dropped_partitions": dropped, "deleted_rows": deleted}
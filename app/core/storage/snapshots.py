@@ -0,0 +1,90 @@
+import json
+import os
+from datetime import timedelta
+from app.core.normalization.nba_props import CANONICAL_MARKET_KEY
+from app.core.utils.logging import logger
+from app.core.utils.time import utc_now
+
+SNAPSHOT_PATH = os.getenv("LINE_SNAPSHOT_PATH", "output/line_snapshots.json")
+# Drop snapshots for games that tipped more than this many days ago
+SNAPSHOT_RETENTION_DAYS = int(os.getenv("LINE_SNAPSHOT_RETENTION_DAYS", "3"))
+
+# Columns identifying a Market row
+MARKET_KEY = ["game_id", "player_id", "stat_type"]
+# Canonical key plus source, minus line_value: a point move must compare
+# against the previous observation rather than open a fresh key
+LINE_KEY = ["source"] + [k for k in CANONICAL_MARKET_KEY if k != "line_value"]
+
+
+def _key(m, fields):
+    return "|".join(str(m[f]) for f in fields)
+
+
+class LineSnapshotStore:
+    """Last observed (line_value, price_american) per book/prop/side, plus the
+    market id each (game, player, stat) was first stored under and the
+    database the lines were written to."""
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        self.path = path
+        self.markets = {}
+        self.lines = {}
+        self.database_url = None
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+                self.markets = data.get("markets", {})
+                self.lines = data.get("lines", {})
+                self.database_url = data.get("database_url")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable line snapshot {path}: {e}")
+
+    def validate(self, database_url, existing_market_ids):
+        """
+        Start over when the snapshot was taken against another database, or
+        its markets are missing from this one (new or recreated DB);
+        otherwise unchanged lines would never reach it. `existing_market_ids`
+        maps market ids to the subset the DB has. Returns True on a reset.
+        """
+        ids = {v["id"] for v in self.markets.values()}
+        if self.database_url == database_url and (not ids or existing_market_ids(ids) >= ids):
+            return False
+        if self.markets or self.lines:
+            logger.info(f"Line snapshot {self.path} does not match {database_url}; writing every line once")
+        self.markets, self.lines = {}, {}
+        self.database_url = database_url
+        return True
+
+    def market_id(self, m):
+        entry = self.markets.get(_key(m, MARKET_KEY))
+        return entry["id"] if entry else None
+
+    def set_market_id(self, m, market_id, commence_time=None):
+        self.markets[_key(m, MARKET_KEY)] = {"id": market_id, "commence_time": commence_time}
+
+    def changed(self, m):
+        prev = self.lines.get(_key(m, LINE_KEY))
+        return prev is None or prev[0] != m["line_value"] or prev[1] != m["price_american"]
+
+    def update(self, m):
+        self.lines[_key(m, LINE_KEY)] = [m["line_value"], m["price_american"]]
+
+    def prune(self, now=None):
+        cutoff = ((now or utc_now()) - timedelta(days=SNAPSHOT_RETENTION_DAYS)).isoformat()
+        stale = {k for k, v in self.markets.items() if v.get("commence_time") and v["commence_time"] < cutoff}
+        if not stale:
+            return
+        self.markets = {k: v for k, v in self.markets.items() if k not in stale}
+        # LINE_KEY is source + MARKET_KEY + side
+        self.lines = {k: v for k, v in self.lines.items() if "|".join(k.split("|")[1:4]) not in stale}
+
+    def save(self):
+        self.prune()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"database_url": self.database_url, "markets": self.markets, "lines": self.lines}, f)
+        os.replace(tmp, self.path)
@@ -0,0 +1,218 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from app.core.utils.logging import logger
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", ".cache/http")
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Query params never included in cache keys (credentials)
+SECRET_PARAMS = {"apiKey", "api_key", "apikey", "key"}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Process-wide keep-alive session shared by all upstream adapters."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def get(url, params=None, timeout=None, **kwargs):
+    return get_session().get(url, params=params, timeout=timeout or HTTP_TIMEOUT, **kwargs)
+
+
+class CachedResponse:
+    """Subset of requests.Response served from the on-disk cache."""
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.from_cache = True
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} (cached)", response=self)
+
+
+def _body_hash(body):
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    """On-disk TTL cache of GET responses with LRU eviction by total size.
+
+    Each entry is a `<key>.body` file plus a `<key>.meta` JSON sidecar; file
+    mtimes double as the LRU clock. Both are replaced atomically, body first;
+    the meta records the body's hash, so a reader that catches a new body
+    with the old meta (or the reverse) sees a miss, never a mismatched pair.
+    """
+
+    def __init__(self, directory=HTTP_CACHE_DIR, max_bytes=HTTP_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(url, params=None):
+        items = sorted((k, str(v)) for k, v in (params or {}).items() if k not in SECRET_PARAMS)
+        raw = url + "?" + "&".join(f"{k}={v}" for k, v in items)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + ".meta", base + ".body"
+
+    def get(self, key):
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get("body_hash") != _body_hash(body):
+            return None
+        now = time.time()
+        os.utime(body_path, (now, now))
+        return meta, body
+
+    def put(self, key, status_code, headers, body, ttl):
+        meta_path, body_path = self._paths(key)
+        headers = CaseInsensitiveDict(headers)
+        meta = {
+            "status_code": status_code,
+            "headers": dict(headers),
+            "expires_at": time.time() + ttl,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "body_hash": _body_hash(body),
+        }
+        with self._lock:
+            self._write(body_path, body)
+            self._write(meta_path, json.dumps(meta).encode("utf-8"))
+            self._evict()
+
+    def _write(self, path, data):
+        # Temp file + rename: readers (and other processes) never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    def touch(self, key, ttl):
+        # Extend an entry after a 304 revalidation
+        entry = self.get(key)
+        if entry is None:
+            return
+        meta, body = entry
+        self.put(key, meta["status_code"], meta["headers"], body, ttl)
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for e in os.scandir(self.directory):
+            if e.name.endswith(".body"):
+                st = e.stat()
+                entries.append((st.st_mtime, st.st_size, e.name[:-5]))
+                total += st.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, key in sorted(entries):
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock:
+            for e in os.scandir(self.directory):
+                os.remove(e.path)
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
+
+
+def get_fresh(url, params=None, cache=None):
+    """Return an unexpired cached response, or None without touching the network."""
+    cache = cache or get_cache()
+    entry = cache.get(cache.key(url, params))
+    if entry is not None and entry[0]["expires_at"] > time.time():
+        meta, body = entry
+        return CachedResponse(meta["status_code"], meta["headers"], body)
+    return None
+
+
+def cached_get(url, params=None, ttl=60, cache=None, timeout=None):
+    """GET through the response cache.
+
+    Fresh entries are served from disk; stale entries carrying an ETag or
+    Last-Modified are revalidated with a conditional request so a 304 costs
+    no body transfer. Only 200 responses are stored.
+    """
+    cache = cache or get_cache()
+    key = cache.key(url, params)
+    entry = cache.get(key)
+    headers = {}
+    if entry is not None:
+        meta, body = entry
+        if meta["expires_at"] > time.time():
+            return CachedResponse(meta["status_code"], meta["headers"], body)
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    resp = get(url, params=params, timeout=timeout, headers=headers)
+    if resp.status_code == 304 and entry is not None:
+        logger.debug(f"Revalidated cached response for {url}")
+        cache.touch(key, ttl)
+        meta, body = entry
+        return CachedResponse(meta["status_code"], meta["headers"], body)
+    if resp.status_code == 200 and ttl > 0:
+        cache.put(key, resp.status_code, resp.headers, resp.content, ttl)
+    return resp
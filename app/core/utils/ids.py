@@ -1,4 +1,31 @@
+import hashlib
 import uuid
 
-def generate_id():
+# Fixed namespace so deterministic ids are identical across processes and deploys
+ID_NAMESPACE = uuid.UUID("177f767d-f44c-43d6-9812-d32d02f59b16")
+_NAMESPACE_BYTES = ID_NAMESPACE.bytes
+
+
+def _uuid5(name):
+    # Same string as str(uuid.uuid5(ID_NAMESPACE, name)) without building UUID
+    # objects; ids are minted per line/edge on hot paths
+    b = bytearray(hashlib.sha1(_NAMESPACE_BYTES + name.encode("utf-8")).digest()[:16])
+    b[6] = (b[6] & 0x0F) | 0x50
+    b[8] = (b[8] & 0x3F) | 0x80
+    h = b.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def generate_id(*parts):
+    # Random UUID, or a stable UUIDv5 when key parts are given
+    if parts:
+        return _uuid5("|".join(map(str, parts)))
     return str(uuid.uuid4())
+
+
+def market_id(game_id, player_id, stat_type):
+    return generate_id("market", game_id, player_id, stat_type)
+
+
+def line_id(market_id, source, side, line_value, price_american, timestamp):
+    return generate_id("line", market_id, source, side, line_value, price_american, timestamp)
@@ -1,12 +1,22 @@
-import requests
 import pandas as pd
+from contextlib import nullcontext
+from datetime import date
 from typing import List, Dict, Any
+from app.core.normalization.players import get_index
+from app.core.storage.gamelogs import BALLDONTLIE_BASE_URL, GameLogStore, season_for
+from app.core.utils import http_client
 
-BALLDONTLIE_BASE_URL = "https://www.balldontlie.io/api/v1/"
+# Cache TTLs (seconds): player ids never change, logs/averages move once a night
+PLAYER_SEARCH_TTL = 86400
+STATS_TTL = 600
+SEASON_AVG_TTL = 3600
 
 def get_player_id(player_name: str) -> int:
     """Search for a player by name and return their balldontlie.io player ID."""
-    resp = requests.get(f"{BALLDONTLIE_BASE_URL}players", params={"search": player_name})
+    player_id = get_index().resolve(player_name)
+    if player_id is not None:
+        return player_id
+    resp = http_client.cached_get(f"{BALLDONTLIE_BASE_URL}players", params={"search": player_name}, ttl=PLAYER_SEARCH_TTL)
     resp.raise_for_status()
     data = resp.json()["data"]
     if not data:
@@ -18,7 +28,7 @@ def get_recent_game_logs(player_id: int, num_games: int = 10) -> List[Dict[str,
     stats = []
     page = 1
     while len(stats) < num_games:
-        resp = requests.get(f"{BALLDONTLIE_BASE_URL}stats", params={"player_ids[]": player_id, "per_page": 100, "page": page})
+        resp = http_client.cached_get(f"{BALLDONTLIE_BASE_URL}stats", params={"player_ids[]": player_id, "per_page": 100, "page": page}, ttl=STATS_TTL)
         resp.raise_for_status()
         data = resp.json()["data"]
         if not data:
@@ -29,25 +39,30 @@ def get_recent_game_logs(player_id: int, num_games: int = 10) -> List[Dict[str,
 
 def get_season_averages(player_id: int, season: int) -> Dict[str, Any]:
     """Fetch season averages for a player."""
-    resp = requests.get(f"{BALLDONTLIE_BASE_URL}season_averages", params={"player_ids[]": player_id, "season": season})
+    resp = http_client.cached_get(f"{BALLDONTLIE_BASE_URL}season_averages", params={"player_ids[]": player_id, "season": season}, ttl=SEASON_AVG_TTL)
     resp.raise_for_status()
     data = resp.json()["data"]
     if not data:
         raise ValueError(f"No season averages found for player_id {player_id} in season {season}.")
     return data[0]
 
-def player_stats_dataframe(player_name: str, num_games: int = 10, season: int = None) -> pd.DataFrame:
-    """Return a DataFrame of recent game logs and season averages for a player."""
-    player_id = get_player_id(player_name)
-    logs = get_recent_game_logs(player_id, num_games)
-    df = pd.DataFrame(logs)
-    if season is None:
-        # Use the season from the most recent game
-        if not df.empty:
-            season = df.iloc[0]["game"]["season"]
-        else:
+def player_stats_dataframe(player_name: str, num_games: int = 10, season: int = None,
+                           store: GameLogStore = None) -> pd.DataFrame:
+    """Return a DataFrame of recent game logs and season averages for a player.
+
+    Reads the local game-log store (kept current by `gamelogs-refresh`); a
+    player the store has not seen is backfilled for the season once.
+    """
+    # A store passed in stays open for the caller; one opened here is closed
+    with nullcontext(store) if store is not None else GameLogStore() as store:
+        player_id = get_player_id(player_name)
+        season = season or store.latest_season() or season_for(date.today())
+        if player_id not in store.features([player_id], season):
+            store.backfill_players([player_id], season)
+        df = store.game_logs([player_id], season=season, last_n=num_games)
+        if df.empty:
             raise ValueError("No games found for player.")
-    season_avg = get_season_averages(player_id, season)
+        season_avg = store.features([player_id], season)[player_id]
     # Add season averages as a separate row
     avg_row = {**season_avg, "is_season_avg": True}
     df["is_season_avg"] = False
@@ -58,4 +73,4 @@ if __name__ == "__main__":
     # Example usage
     player = "LeBron James"
     df = player_stats_dataframe(player, num_games=10)
-    print(df[["game", "pts", "reb", "ast", "is_season_avg"]])
+    print(df[["game_date", "pts", "reb", "ast", "is_season_avg"]])
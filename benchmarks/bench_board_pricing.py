@@ -0,0 +1,51 @@
+"""
+Scalar per-prop pricing loop vs the vectorized price_props kernel.
+
+    python -m benchmarks.bench_board_pricing --rows 20000
+"""
+import argparse
+import random
+import time
+
+from app.core.modeling.projection import consensus_mean, price_props
+from app.core.pricing.odds_math import american_to_implied_prob, remove_vig
+
+STATS = ["PTS", "REB", "AST", "PRA"]
+
+
+def synthetic_props(n):
+    rng = random.Random(7)
+    props = []
+    for _ in range(n):
+        over = rng.choice([-140, -125, -115, -110, -105, 100, 110, 120])
+        under = None if rng.random() < 0.1 else rng.choice([-130, -115, -110, -105, 105])
+        props.append((over, under, rng.choice([5.5, 8.5, 21.5, 30.5]), rng.choice(STATS)))
+    return props
+
+
+def scalar(props):
+    out = []
+    for over, under, line, stat in props:
+        p_implied = american_to_implied_prob(over if over is not None else under)
+        p_over, _ = remove_vig(p_implied, 1 - p_implied)
+        out.append(consensus_mean(line, p_over, stat))
+    return out
+
+
+def vectorized(props):
+    over, under, lines, stats = zip(*props)
+    return price_props(over, under, lines, stats)["mean"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000)
+    args = parser.parse_args()
+    props = synthetic_props(args.rows)
+    results = {}
+    for name, fn in (("scalar", scalar), ("vectorized", vectorized)):
+        t0 = time.perf_counter()
+        fn(props)
+        results[name] = time.perf_counter() - t0
+        print(f"{name:<11} {args.rows} props in {results[name] * 1000:.1f} ms")
+    print(f"speedup: {results['scalar'] / results['vectorized']:.1f}x")
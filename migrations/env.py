@@ -1,7 +1,11 @@
 from logging.config import fileConfig
-from sqlalchemy import engine_from_config, pool
-from alembic import context
 import os
+from dotenv import load_dotenv
+from sqlalchemy import pool
+from alembic import context
+from app.core.storage.engine import create_db_engine
+
+load_dotenv()
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -11,10 +15,15 @@ config = context.config
 fileConfig(config.config_file_name)
 
 
-# Use the sqlalchemy.url from alembic.ini (do not override with env var)
-
 target_metadata = None
 
+def get_url():
+    # Same database as the app: the URL `prop-ai init-db` passes in, else
+    # DATABASE_URL (so a bare `alembic upgrade head` migrates the app's DB),
+    # else alembic.ini's sqlalchemy.url (the app's default)
+    return (config.attributes.get("database_url") or os.getenv("DATABASE_URL")
+            or config.get_main_option("sqlalchemy.url"))
+
 def run_migrations_offline():
     context.configure(
         url=get_url(),
@@ -26,15 +35,14 @@ def run_migrations_offline():
         context.run_migrations()
 
 def run_migrations_online():
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
+    # Same engine setup as the app (SQLite pragmas included)
+    connectable = create_db_engine(get_url(), poolclass=pool.NullPool)
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
+            # SQLite cannot ALTER most constraints in place; batch mode recreates the table
+            render_as_batch=connection.dialect.name == "sqlite",
         )
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,29 @@
+"""Add indexes for hot lookup columns (line history, market keys, pick/result joins)"""
+from alembic import op
+
+revision = '002_query_indexes'
+down_revision = '001_initial'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns) -- kept in sync with __table_args__ in app/core/storage/repository.py
+INDEXES = [
+    ('ix_lines_market_id_timestamp', 'lines', ['market_id', 'timestamp']),
+    ('ix_markets_game_player_stat', 'markets', ['game_id', 'player_id', 'stat_type']),
+    ('ix_markets_created_at', 'markets', ['created_at']),
+    ('ix_projections_market_id', 'projections', ['market_id']),
+    ('ix_edges_market_id_timestamp', 'edges', ['market_id', 'timestamp']),
+    ('ix_picks_picked_at', 'picks', ['picked_at']),
+    ('ix_picks_market_id', 'picks', ['market_id']),
+    ('ix_results_market_id', 'results', ['market_id']),
+    ('ix_results_settled_at', 'results', ['settled_at']),
+    ('ix_grades_pick_id', 'grades', ['pick_id']),
+]
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
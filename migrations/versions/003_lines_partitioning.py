@@ -0,0 +1,90 @@
+"""Partition lines by day (PostgreSQL) and add hourly line roll-ups"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '003_lines_partitioning'
+down_revision = '002_query_indexes'
+branch_labels = None
+depends_on = None
+
+LINE_COLUMNS = 'id, market_id, source, side, line_value, price_american, "timestamp", latency_ms'
+
+def upgrade():
+    op.create_table('line_rollups_hourly',
+        sa.Column('id', sa.String, primary_key=True),
+        sa.Column('market_id', sa.String, nullable=False),
+        sa.Column('source', sa.String, nullable=False),
+        sa.Column('side', sa.String, nullable=False),
+        sa.Column('bucket_start', sa.DateTime, nullable=False),
+        sa.Column('open_price', sa.Integer, nullable=False),
+        sa.Column('high_price', sa.Integer, nullable=False),
+        sa.Column('low_price', sa.Integer, nullable=False),
+        sa.Column('close_price', sa.Integer, nullable=False),
+        sa.Column('open_point', sa.Float, nullable=False),
+        sa.Column('high_point', sa.Float, nullable=False),
+        sa.Column('low_point', sa.Float, nullable=False),
+        sa.Column('close_point', sa.Float, nullable=False),
+        sa.Column('n_obs', sa.Integer, nullable=False)
+    )
+    op.create_index('ix_line_rollups_market_bucket', 'line_rollups_hourly', ['market_id', 'bucket_start'])
+
+    if op.get_bind().dialect.name != 'postgresql':
+        # No native partitioning: keep the heap table, but give upserts the
+        # same (id, timestamp) conflict target the partitioned table has
+        op.create_index('ux_lines_id_timestamp', 'lines', ['id', 'timestamp'], unique=True)
+        return
+
+    # Partitioned tables need the partition key in every unique constraint
+    op.drop_index('ix_lines_market_id_timestamp', table_name='lines')
+    op.rename_table('lines', 'lines_legacy')
+    op.execute('ALTER TABLE lines_legacy RENAME CONSTRAINT lines_pkey TO lines_legacy_pkey')
+    op.execute("""
+        CREATE TABLE lines (
+            id VARCHAR NOT NULL,
+            market_id VARCHAR NOT NULL,
+            source VARCHAR NOT NULL,
+            side VARCHAR NOT NULL,
+            line_value FLOAT NOT NULL,
+            price_american INTEGER NOT NULL,
+            "timestamp" TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            latency_ms INTEGER,
+            PRIMARY KEY (id, "timestamp")
+        ) PARTITION BY RANGE ("timestamp")
+    """)
+    op.execute('CREATE TABLE lines_default PARTITION OF lines DEFAULT')
+    op.create_index('ix_lines_market_id_timestamp', 'lines', ['market_id', 'timestamp'])
+    # One partition per day already present in the legacy table
+    op.execute("""
+        DO $$
+        DECLARE d date;
+        BEGIN
+            FOR d IN SELECT DISTINCT "timestamp"::date FROM lines_legacy LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF lines FOR VALUES FROM (%L) TO (%L)',
+                    'lines_p' || to_char(d, 'YYYYMMDD'), d, d + 1);
+            END LOOP;
+        END $$
+    """)
+    op.execute(f'INSERT INTO lines ({LINE_COLUMNS}) SELECT {LINE_COLUMNS} FROM lines_legacy')
+    op.drop_table('lines_legacy')
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.rename_table('lines', 'lines_partitioned')
+        op.create_table('lines',
+            sa.Column('id', sa.String, primary_key=True),
+            sa.Column('market_id', sa.String, nullable=False),
+            sa.Column('source', sa.String, nullable=False),
+            sa.Column('side', sa.String, nullable=False),
+            sa.Column('line_value', sa.Float, nullable=False),
+            sa.Column('price_american', sa.Integer, nullable=False),
+            sa.Column('timestamp', sa.DateTime, nullable=False),
+            sa.Column('latency_ms', sa.Integer, nullable=True)
+        )
+        op.execute(f'INSERT INTO lines ({LINE_COLUMNS}) SELECT {LINE_COLUMNS} FROM lines_partitioned')
+        op.drop_table('lines_partitioned')
+        op.create_index('ix_lines_market_id_timestamp', 'lines', ['market_id', 'timestamp'])
+    else:
+        op.drop_index('ux_lines_id_timestamp', table_name='lines')
+    op.drop_index('ix_line_rollups_market_bucket', table_name='line_rollups_hourly')
+    op.drop_table('line_rollups_hourly')
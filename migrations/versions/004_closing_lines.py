@@ -0,0 +1,34 @@
+"""Closing lines captured per market/book/side at tip; grades.clv nullable until the close is known"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '004_closing_lines'
+down_revision = '003_lines_partitioning'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('closing_lines',
+        sa.Column('market_id', sa.String, primary_key=True),
+        sa.Column('source', sa.String, primary_key=True),
+        sa.Column('side', sa.String, primary_key=True),
+        sa.Column('game_id', sa.String),
+        sa.Column('player_id', sa.String),
+        sa.Column('stat_type', sa.String),
+        sa.Column('line_value', sa.Float),
+        sa.Column('price_american', sa.Integer),
+        sa.Column('observed_at', sa.DateTime),
+        sa.Column('commence_time', sa.DateTime),
+        sa.Column('captured_at', sa.DateTime)
+    )
+    op.create_index('ix_closing_lines_commence_time', 'closing_lines', ['commence_time'])
+    op.create_index('ix_closing_lines_player_stat', 'closing_lines', ['player_id', 'stat_type'])
+    with op.batch_alter_table('grades') as batch:
+        batch.alter_column('clv', existing_type=sa.Float, nullable=True)
+
+def downgrade():
+    with op.batch_alter_table('grades') as batch:
+        batch.alter_column('clv', existing_type=sa.Float, nullable=False)
+    op.drop_index('ix_closing_lines_player_stat', table_name='closing_lines')
+    op.drop_index('ix_closing_lines_commence_time', table_name='closing_lines')
+    op.drop_table('closing_lines')
@@ -0,0 +1,21 @@
+"""Edges: fair odds and edge nullable for sides without a price or probability"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '005_edges_nullable_sides'
+down_revision = '004_closing_lines'
+branch_labels = None
+depends_on = None
+
+# One-sided props have no edge on the missing side; p = 0 has no fair odds
+COLUMNS = ['fair_odds_over', 'fair_odds_under', 'edge_over', 'edge_under']
+
+def upgrade():
+    with op.batch_alter_table('edges') as batch:
+        for name in COLUMNS:
+            batch.alter_column(name, existing_type=sa.Float, nullable=True)
+
+def downgrade():
+    with op.batch_alter_table('edges') as batch:
+        for name in COLUMNS:
+            batch.alter_column(name, existing_type=sa.Float, nullable=False)
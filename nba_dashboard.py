@@ -1,7 +1,7 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import requests
 import pandas as pd
+from app.core.utils import http_client
 from datetime import date
 
 
@@ -22,7 +22,8 @@ st.set_page_config(
 selected_date = date.today()
 def fetch_board(selected_date):
     try:
-        resp = requests.get(API_URL, params={"date": selected_date})
+        # Revalidates with the board's ETag: an unchanged board is a 304 served from the local cache
+        resp = http_client.cached_get(API_URL, params={"date": str(selected_date)}, ttl=1)
         if resp.status_code == 200:
             return resp.json()
         else:
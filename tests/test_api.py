@@ -0,0 +1,98 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.api.main import app
+from app.core.storage.async_db import get_session, to_async_url
+from app.core.storage.repository import Base, Edge, Market
+
+
+@pytest.fixture
+def client():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool,
+                                 connect_args={"check_same_thread": False})
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with maker() as session:
+            session.add(Market(id="m1", game_id="g1", player_id="LeBron James", stat_type="PTS",
+                               created_at=datetime(2026, 2, 26, 19)))
+            session.add(Edge(id="e1", market_id="m1", model_version="v0", p_over=0.55, p_under=0.45,
+                             edge_over=0.03, edge_under=-0.03, timestamp=datetime(2026, 2, 26, 12)))
+            await session.commit()
+
+    asyncio.run(setup())
+
+    async def override():
+        async with maker() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_to_async_url():
+    assert to_async_url("postgresql://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+    assert to_async_url("sqlite:///nba.db") == "sqlite+aiosqlite:///nba.db"
+
+
+def test_edges_reads_from_db(client):
+    body = client.get("/edges", params={"date": "2026-02-26", "stat_type": "PTS"}).json()
+    assert [e["market_id"] for e in body["edges"]] == ["m1"]
+    assert body["edges"][0]["player_id"] == "LeBron James"
+    assert client.get("/edges", params={"date": "2026-02-27"}).json()["edges"] == []
+
+
+def test_log_pick_persists(client):
+    pick = {"user_tag": "t", "market_id": "m1", "side": "over", "stake": 1.0, "line_at_pick": 24.5,
+            "price_at_pick": -110, "model_version": "v0", "projected_mean": 26.0, "p_hit": 0.56}
+    body = client.post("/picks", json=pick).json()
+    assert body["status"] == "logged"
+    assert body["pick"]["id"]
+
+
+def test_board_is_memoized_with_etag_and_compression(client, tmp_path, monkeypatch):
+    import json
+    import os
+
+    from app.api.board_cache import board_cache
+
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("output")
+    path = "output/daily_board_2026-02-26.json"
+    with open(path, "w") as f:
+        json.dump({"date": "2026-02-26", "markets": [{"player_id": "LeBron James", "line": 24.5}]}, f, indent=2)
+    board_cache.clear()
+
+    first = client.get("/board", params={"date": "2026-02-26"}, headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.json()["markets"][0]["line"] == 24.5
+    etag = first.headers["etag"]
+
+    # Served from memory: the file is not re-read while its mtime/size are unchanged
+    loads = []
+    monkeypatch.setattr(board_cache, "load", lambda p: loads.append(p))
+    again = client.get("/board", params={"date": "2026-02-26"}, headers={"If-None-Match": etag})
+    assert again.status_code == 304 and not loads
+    plain = client.get("/board", params={"date": "2026-02-26"}, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers and plain.headers["etag"] != etag
+    assert json.loads(plain.content) == {"date": "2026-02-26", "markets": [{"player_id": "LeBron James", "line": 24.5}]}
+    monkeypatch.undo()
+
+    # A rewritten board gets a new ETag
+    monkeypatch.chdir(tmp_path)
+    with open(path, "w") as f:
+        json.dump({"date": "2026-02-26", "markets": []}, f)
+    changed = client.get("/board", params={"date": "2026-02-26"}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.json()["markets"] == []
@@ -0,0 +1,56 @@
+from app.core.storage.archive import RawArchive
+
+EVENT = {
+    "id": "g1",
+    "commence_time": "2026-02-27T00:10:00Z",
+    "bookmakers": [
+        {
+            "title": "FanDuel",
+            "markets": [
+                {
+                    "key": "player_assists",
+                    "outcomes": [
+                        {"name": "Over", "description": "LaMelo Ball", "point": 6.5, "price": -144},
+                        {"name": "Under", "description": "LaMelo Ball", "point": 6.5, "price": 108},
+                    ],
+                }
+            ],
+        }
+    ],
+}
+
+
+def test_archive_roundtrip_and_segment_rollover(tmp_path):
+    archive = RawArchive(str(tmp_path), segment_max_bytes=1)
+    moved = {**EVENT, "commence_time": "2026-02-27T00:40:00Z"}
+    archive.append(EVENT, "2026-02-26")
+    archive.append({**EVENT, "id": "g2"}, "2026-02-26")
+    archive.append(moved, "2026-02-26")
+    entries = archive.entries("2026-02-26")
+    assert [e["event_id"] for e in entries] == ["g1", "g2", "g1"]
+    assert len({e["segment"] for e in entries}) == 3
+    assert list(archive.iter_payloads("2026-02-26", event_id="g2")) == [{**EVENT, "id": "g2"}]
+    assert list(archive.iter_payloads("2026-02-26", latest_only=True)) == [moved, {**EVENT, "id": "g2"}]
+
+
+def test_unchanged_payloads_are_not_archived_again(tmp_path):
+    archive = RawArchive(str(tmp_path))
+    assert archive.append(EVENT, "2026-02-26") is not None
+    # Same body again (HTTP cache hit, or nothing moved): skipped, also by a new process
+    assert archive.append(EVENT, "2026-02-26") is None
+    assert RawArchive(str(tmp_path)).append(EVENT, "2026-02-26") is None
+    # Another day, or a changed payload, is archived
+    assert archive.append(EVENT, "2026-02-27") is not None
+    assert archive.append({**EVENT, "bookmakers": []}, "2026-02-26") is not None
+    assert archive.append(EVENT, "2026-02-26") is not None
+    assert len(archive.entries("2026-02-26")) == 3
+
+
+def test_replay_renormalizes_without_network(tmp_path):
+    archive = RawArchive(str(tmp_path))
+    archive.append(EVENT, "2026-02-26")
+    outcomes = list(archive.replay("2026-02-26"))
+    assert [(o["player_id"], o["stat_type"], o["side"]) for o in outcomes] == [
+        ("LaMelo Ball", "AST", "over"),
+        ("LaMelo Ball", "AST", "under"),
+    ]
@@ -0,0 +1,62 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+
+from app.core.metrics.clv import closing_consensus, compute_clv, game_date_bounds
+from app.core.storage.repository import ClosingLine
+from tests.test_repository import make_repo
+
+TIP = datetime(2026, 2, 27, 0, 30)  # 7:30pm ET on Feb 26
+
+
+def seed(repo):
+    repo.store_markets([{"id": "m1", "game_id": "g1", "player_id": "LaMelo Ball", "stat_type": "PTS",
+                         "created_at": TIP}])
+    lines = []
+    for book, close_point in (("FanDuel", 22.5), ("DraftKings", 22.5)):
+        for side in ("over", "under"):
+            # Opens at 21.5, moves to the close, then a post-tip live line that must be ignored
+            for i, (point, at) in enumerate(((21.5, TIP - timedelta(hours=6)), (close_point, TIP - timedelta(minutes=5)),
+                                             (30.5, TIP + timedelta(minutes=20)))):
+                lines.append({"id": f"{book}{side}{i}", "market_id": "m1", "source": book, "side": side,
+                              "line_value": point, "price_american": -110, "timestamp": at})
+    repo.store_lines(lines)
+
+
+def test_capture_freezes_last_pre_tip_line_once():
+    repo = make_repo()
+    seed(repo)
+    assert repo.capture_closing_lines(now=TIP - timedelta(minutes=1)) == 0
+    assert repo.capture_closing_lines(now=TIP + timedelta(hours=1)) == 4
+    rows = repo.get_closing_lines(TIP - timedelta(days=1), TIP + timedelta(days=1))
+    assert {r.line_value for r in rows} == {22.5}
+    assert {r.observed_at for r in rows} == {TIP - timedelta(minutes=5)}
+    # Already captured markets are not touched again
+    assert repo.capture_closing_lines(now=TIP + timedelta(hours=2)) == 0
+    assert repo.session.scalar(select(func.count()).select_from(ClosingLine)) == 4
+
+
+def test_clv_joins_picks_against_close():
+    repo = make_repo()
+    seed(repo)
+    repo.capture_closing_lines(now=TIP + timedelta(hours=1))
+    start, end = game_date_bounds([date(2026, 2, 26)])
+    assert start <= TIP < end
+    close = closing_consensus(repo.get_closing_lines(start, end))
+    assert close["date"].tolist() == [date(2026, 2, 26)] and close["close_line"].tolist() == [22.5]
+    picks = pd.DataFrame({
+        "date": [date(2026, 2, 26)] * 3 + [date(2026, 2, 25)],
+        "player_id": ["LaMelo Ball"] * 4,
+        "stat_type": ["PTS"] * 4,
+        "prop_line": [21.5, 21.5, 23.5, 21.5],
+        "recommended_side": ["Over", "Under", "Under", "Over"],
+        "price": [-110, -110, np.nan, -110],
+    })
+    out = compute_clv(picks, close)
+    assert out["clv"].tolist()[:3] == [1.0, -1.0, 1.0]
+    # Over 21.5 when the close is 22.5 -110/-110 beat the no-vig close; the under lost it
+    assert out["clv_price"][0] > 0 > out["clv_price"][1]
+    assert np.isnan(out["clv_price"][2])
+    assert np.isnan(out["clv"][3])
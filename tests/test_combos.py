@@ -0,0 +1,92 @@
+import numpy as np
+
+from app.core.modeling.combos import PAIRS, combo_moments, estimate_correlations, player_correlations, price_combos
+from app.core.modeling.config import STAT_DISPERSION
+from app.core.normalization.nba_props import normalize_props
+from app.core.normalization.players import PlayerIndex
+from app.core.storage.gamelogs import GameLogStore
+
+
+def row(player, stat, line, projection, over=-110, under=-110):
+    return {"player_id": player, "stat_type": stat, "line": line, "projection": projection,
+            "over_price": over, "under_price": under}
+
+
+def test_combo_moments_closed_form():
+    means = np.array([[20.0, 8.0, 5.0]])
+    rho = np.array([[0.2, 0.3, 0.0]])
+    mean, var = combo_moments(means, "PRA", rho)
+    v = np.array([20.0 * STAT_DISPERSION["PTS"], 8.0 * STAT_DISPERSION["REB"], 5.0 * STAT_DISPERSION["AST"]])
+    sd = np.sqrt(v)
+    assert mean[0] == 33.0
+    assert np.isclose(var[0], v.sum() + 2 * (0.2 * sd[0] * sd[1] + 0.3 * sd[0] * sd[2]))
+    mean, var = combo_moments(means, "RA", rho)
+    assert mean[0] == 13.0 and np.isclose(var[0], v[1] + v[2])
+
+
+def test_price_combos_flags_mispriced_market():
+    board = [row("A", "PTS", 19.5, 20.0), row("A", "REB", 7.5, 8.0), row("A", "AST", 4.5, 5.0),
+             # Market hangs PRA well under the components' sum
+             row("A", "PRA", 28.5, 29.0, over=-105, under=-115),
+             row("A", "PR", 27.5, 28.0),
+             row("B", "PRA", 30.5, 30.0)]
+    price_combos(board)
+    pra, pr, other = board[3], board[4], board[5]
+    assert pra["model_projection"] == 33.0 and pra["model_edge_over"] > 3 and pra["mispriced"]
+    assert np.isclose(pra["model_p_over"] + pra["model_p_under"] + pra["model_p_push"], 1.0)
+    assert pr["model_projection"] == 28.0 and not pr["mispriced"]
+    # No component rows for B: left untouched
+    assert "model_projection" not in other
+
+
+def test_estimate_correlations_shrinks_to_prior():
+    rng = np.random.default_rng(1)
+    pts = rng.poisson(20, 200).astype(float)
+    reb = pts * 0.4 + rng.normal(0, 1, 200)
+    ast = rng.poisson(5, 200).astype(float)
+    est = estimate_correlations(["A"] * 200 + ["B"] * 2, np.r_[pts, 10, 12], np.r_[reb, 3, 4], np.r_[ast, 1, 2])
+    assert est["A"][PAIRS.index(("PTS", "REB"))] > 0.7
+    # Two games: pure prior
+    assert np.allclose(est["B"], [0.20, 0.25, 0.10])
+
+
+def test_player_correlations_change_combo_prices(tmp_path):
+    # Player 1's rebounds track his points; player 2 has only two games (prior)
+    rng = np.random.default_rng(2)
+    pts = rng.poisson(20, 40)
+    games = [{"min": "30", "pts": int(p), "reb": int(p // 2), "ast": int(a), "fg3m": 1,
+              "player": {"id": 1, "first_name": "Alpha", "last_name": "One"}, "team": {"id": 1},
+              "game": {"id": i, "date": f"2024-11-{i % 28 + 1:02d}", "season": 2024}}
+             for i, (p, a) in enumerate(zip(pts, rng.poisson(5, 40)))]
+    games += [{"min": "30", "pts": 10, "reb": 3, "ast": 2, "fg3m": 0,
+               "player": {"id": 2, "first_name": "Beta", "last_name": "Two"}, "team": {"id": 1},
+               "game": {"id": 100 + i, "date": f"2024-11-0{i + 1}", "season": 2024}} for i in range(2)]
+    store = GameLogStore(url=f"sqlite:///{tmp_path / 'g.db'}")
+    try:
+        store.store_stats(games)
+        index = PlayerIndex({1: {"name": "Alpha One", "team_id": 1}, 2: {"name": "Beta Two", "team_id": 1}})
+        rho = player_correlations(["Alpha One", "Beta Two", "Nobody Here"], store, players=index)
+    finally:
+        store.close()
+    assert set(rho) == {"Alpha One", "Beta Two"}
+    assert rho["Alpha One"][PAIRS.index(("PTS", "REB"))] > 0.5
+    assert np.allclose(rho["Beta Two"], [0.20, 0.25, 0.10])
+
+    def board():
+        return [row("Alpha One", "PTS", 19.5, 20.0), row("Alpha One", "REB", 9.5, 10.0),
+                row("Alpha One", "AST", 4.5, 5.0), row("Alpha One", "PR", 30.5, 30.0)]
+
+    prior, fitted = board(), board()
+    price_combos(prior)
+    price_combos(fitted, correlations=rho)
+    # Same mean, wider spread from the fitted PTS/REB correlation: the combo reprices
+    assert fitted[3]["model_projection"] == prior[3]["model_projection"]
+    assert fitted[3]["model_p_over"] != prior[3]["model_p_over"]
+    assert fitted[3]["model_p_under"] != prior[3]["model_p_under"]
+
+
+def test_combo_markets_normalize():
+    event = {"id": "g1", "commence_time": "2026-02-26T19:00:00Z", "bookmakers": [{
+        "title": "FanDuel", "markets": [{"key": "player_points_rebounds_assists", "outcomes": [
+            {"name": "Over", "description": "A", "point": 30.5, "price": -110}]}]}]}
+    assert normalize_props([event])[0]["stat_type"] == "PRA"
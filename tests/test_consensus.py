@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.core.modeling.board import build_board, group_quotes
+from app.core.modeling.consensus import freshness_array, weighted_consensus
+from app.core.modeling.config import STAT_STDEV_PRIORS
+from app.core.modeling.distribution import count_probs
+from app.core.modeling.projection import norm_cdf_array
+
+NOW = datetime(2026, 2, 26, 18)
+
+
+def test_sharp_book_pulls_consensus_harder():
+    # Pinnacle says 60% over, Retail says 40%: consensus leans over
+    res = weighted_consensus(["A", "A"], ["PTS", "PTS"], [21.5, 21.5], [0.6, 0.4], ["Pinnacle", "SomeRetailBook"])
+    assert res["mean"][0] > 21.5 and res["p_over"][0] > 0.5
+    assert res["n_books"][0] == 2 and res["n_quotes"][0] == 2
+
+
+def test_alt_lines_agree_on_one_mean():
+    mu = 23.0
+    lines = np.array([19.5, 21.5, 23.5, 25.5])
+    books = ["FanDuel", "DraftKings", "Pinnacle", "FanDuel"]
+    p, _, _ = count_probs(np.full(4, mu), lines, ["PTS"] * 4)
+    res = weighted_consensus(["A"] * 4, ["PTS"] * 4, lines, p, books)
+    assert np.isclose(res["mean"][0], mu, atol=1e-3)
+    # Same on the normal prior when the quotes come from it
+    p = norm_cdf_array((mu - lines) / STAT_STDEV_PRIORS["PTS"])
+    res = weighted_consensus(["A"] * 4, ["PTS"] * 4, lines, p, books, model="normal")
+    assert np.isclose(res["mean"][0], mu)
+
+
+def test_board_reproduces_market_at_main_line():
+    # Consensus is solved on the count model the board prices on: no phantom edge
+    markets = []
+    for player, stat, line, over, under in (("A", "REB", 7.5, -150, 150), ("B", "AST", 5.5, -163, 163),
+                                            ("C", "REB", 7.5, -110, -110), ("D", "REB", 8.0, -150, 150)):
+        for side, price in (("over", over), ("under", under)):
+            markets.append({"player_id": player, "stat_type": stat, "line_value": line, "source": "Pinnacle",
+                            "side": side, "price_american": price, "last_update": NOW})
+    rows, _ = build_board(group_quotes(markets), now=NOW)
+    by_player = {r["player_id"]: r for r in rows}
+    for player, p_market in (("A", 0.6), ("B", 163 / 263), ("C", 0.5), ("D", 0.6)):
+        r = by_player[player]
+        assert np.isclose(r["p_over"] / (r["p_over"] + r["p_under"]), p_market, atol=1e-3)
+    assert by_player["D"]["p_push"] > 0
+
+
+def test_stale_quotes_count_less():
+    fresh = freshness_array([NOW, NOW - timedelta(hours=3), None], now=NOW)
+    assert fresh[0] == 1.0 and fresh[1] < 0.5 and fresh[2] == 1.0
+    res = weighted_consensus(["A", "A"], ["PTS", "PTS"], [21.5, 21.5], [0.6, 0.4], ["FanDuel", "FanDuel"],
+                             timestamps=[NOW - timedelta(hours=5), NOW], now=NOW)
+    assert res["mean"][0] < 21.5
+
+
+def test_build_board_one_row_per_prop_with_best_prices():
+    markets = []
+    for book, over, under in (("FanDuel", -120, 100), ("DraftKings", -110, -110), ("Pinnacle", -115, -105)):
+        markets.append({"player_id": "A", "stat_type": "PTS", "line_value": 21.5, "source": book,
+                        "side": "over", "price_american": over, "last_update": NOW})
+        markets.append({"player_id": "A", "stat_type": "PTS", "line_value": 21.5, "source": book,
+                        "side": "under", "price_american": under, "last_update": NOW})
+    markets.append({"player_id": "B", "stat_type": "REB", "line_value": 8.5, "source": "FanDuel",
+                    "side": "under", "price_american": -150, "last_update": None})
+    rows, holds = build_board(group_quotes(markets), now=NOW)
+    by_player = {r["player_id"]: r for r in rows}
+    assert len(rows) == 2
+    a = by_player["A"]
+    assert a["line"] == 21.5 and a["over_price"] == -110 and a["under_price"] == 100
+    assert a["projection"] > 21.5 and a["n_books"] == 3
+    assert by_player["B"]["projection"] < 8.5 and by_player["B"]["over_price"] is None
+    assert set(holds) == {"FanDuel", "DraftKings", "Pinnacle"}
+    assert build_board([]) == ([], {})
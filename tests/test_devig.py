@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from app.core.pricing.devig import DEVIG_METHODS, book_holds, devig, devig_probs
+
+OVER = [-130, 150, -110, -400]
+UNDER = [110, -180, -110, 300]
+
+
+@pytest.mark.parametrize("method", DEVIG_METHODS)
+def test_fair_probabilities_sum_to_one_and_keep_order(method):
+    res = devig(OVER, UNDER, method=method)
+    assert np.allclose(res["p_over"] + res["p_under"], 1.0)
+    assert np.allclose(res["hold"], res["implied_over"] + res["implied_under"] - 1)
+    # Symmetric -110/-110 is a coin flip under every method
+    assert np.isclose(res["p_over"][2], 0.5)
+    assert (res["p_over"][[0, 3]] > 0.5).all() and res["p_over"][1] < 0.5
+
+
+def test_methods_differ_on_favourite_longshot():
+    fav = {m: devig([-400], [300], method=m)["p_over"][0] for m in DEVIG_METHODS}
+    # Power and additive/Shin shift more margin onto the longshot than multiplicative
+    assert fav["multiplicative"] < fav["power"]
+    assert fav["multiplicative"] < fav["additive"]
+    assert np.isclose(fav["shin"], fav["additive"])
+
+
+def test_power_solves_exponent():
+    fair_over, fair_under, _ = devig_probs([0.6], [0.47], method="power")
+    k = np.log(fair_over[0]) / np.log(0.6)
+    assert np.isclose(0.6 ** k + 0.47 ** k, 1.0)
+
+
+def test_one_sided_rows_and_book_holds():
+    res = devig([-110, None], [-110, -150], method="shin")
+    assert list(res["two_sided"]) == [True, False]
+    assert np.isclose(res["p_over"][1], 1 - 0.6)
+    holds = book_holds(["FanDuel", "DraftKings"], res["hold"])
+    assert list(holds) == ["FanDuel"] and np.isclose(holds["FanDuel"], 2 * 110 / 210 - 1)
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        devig([-110], [-110], method="worst-case")
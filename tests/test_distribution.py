@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from app.core.modeling import distribution
+from app.core.modeling.distribution import count_pmf_table, count_prob, count_probs
+
+
+def poisson_pmf(k, mu):
+    return np.exp(-mu) * mu ** k / np.prod(np.arange(1, k + 1, dtype=float))
+
+
+def test_half_point_lines_never_push_and_sum_to_one():
+    p_over, p_under, p_push = count_probs([4.0, 22.3, 31.7], [4.5, 21.5, 30.5], ["AST", "PTS", "PRA"])
+    assert np.allclose(p_push, 0.0)
+    assert np.allclose(p_over + p_under + p_push, 1.0)
+
+
+def test_integer_line_push_is_exact_poisson_mass():
+    # 5.0 sits on a table bucket, so the lookup is exact
+    p_over, p_under, p_push = count_probs([5.0], [5.0], ["REB"])
+    assert np.isclose(p_push[0], poisson_pmf(5, 5.0))
+    assert np.isclose(p_under[0], sum(poisson_pmf(k, 5.0) for k in range(5)))
+    assert np.isclose(count_prob(5.0, 5.0, "REB", "push"), p_push[0])
+
+
+def test_negative_binomial_matches_dispersion():
+    pmf = count_pmf_table([20.0], 1.5)[0]
+    k = np.arange(len(pmf))
+    mean = (k * pmf).sum()
+    assert np.isclose(pmf.sum(), 1.0)
+    assert np.isclose(mean, 20.0)
+    assert np.isclose(((k - mean) ** 2 * pmf).sum(), 30.0)
+
+
+def test_interpolates_between_buckets_and_handles_missing():
+    p_over, _, _ = count_probs([10.02, np.nan], [9.5, 9.5], ["PTS", "PTS"])
+    lo, _, _ = count_probs([10.0], [9.5], ["PTS"])
+    hi, _, _ = count_probs([10.05], [9.5], ["PTS"])
+    assert lo[0] < p_over[0] < hi[0]
+    assert np.isnan(p_over[1])
+
+
+@pytest.mark.parametrize("stat", ["PTS", "REB"])
+def test_tables_are_cached_per_dispersion(stat):
+    count_probs([10.0], [9.5], [stat])
+    disp = distribution.STAT_DISPERSION[stat]
+    assert distribution.cdf_table(disp) is distribution._tables[disp]
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.artifacts import writer
+from app.core.metrics.edge import board_edges, calculate_edge, compute_edges
+from app.cli.main import init_db
+from app.core.storage.engine import create_db_engine
+from app.core.storage.repository import Edge, NBARepository
+
+NOW = datetime(2026, 2, 26, 18)
+
+
+@pytest.mark.parametrize("model", ["count", "normal"])
+def test_whole_number_line_pushes_and_edges_exclude_push(model):
+    res = compute_edges([20.0, 20.0], [20.0, 19.5], ["PTS", "PTS"], [-110, -110], [-110, -110], model=model)
+    assert res["p_push"][0] > 0 and res["p_push"][1] == 0
+    assert np.allclose(res["p_over"] + res["p_under"] + res["p_push"], 1.0)
+    # Win probability given no push vs break-even of -110
+    decided = 1 - res["p_push"][0]
+    assert np.isclose(res["edge_over"][0], (res["p_over"][0] / decided - 110 / 210) * 100)
+    assert np.isclose(res["fair_odds_over"][0], decided / res["p_over"][0])
+
+
+def test_calculate_edge_no_longer_crashes():
+    out = calculate_edge(21.5, -110, "PTS", "over", NOW)
+    # A one-sided price can't be devigged; pricing the market's own line gives no edge
+    assert np.isclose(out["edge"], 0, atol=1e-6) and 0 < out["p_model"] < 1 and out["fair_odds"] > 1
+
+
+def migrated_repo(tmp_path):
+    # Schema from the Alembic migrations (what `prop-ai init-db` builds), not create_all
+    url = f"sqlite:///{tmp_path / 'props.db'}"
+    init_db(url=url)
+    return NBARepository(session=sessionmaker(bind=create_db_engine(url))())
+
+
+def test_board_edges_rows_and_bulk_write(tmp_path):
+    board = [
+        {"market_id": "m1", "player_id": "A", "stat_type": "PTS", "line": 21.5, "projection": 24.0,
+         "over_price": -110, "under_price": -110, "last_update": (NOW - timedelta(hours=1)).isoformat()},
+        {"market_id": "m2", "player_id": "B", "stat_type": "REB", "line": 8.0, "projection": 7.2,
+         "over_price": None, "under_price": 120, "last_update": None},
+    ]
+    rows = board_edges(board, "2026-02-26", now=NOW)
+    a, b = rows
+    assert a["edge_over"] > 0 > a["edge_under"]
+    assert 0 < a["freshness_score"] < 1 and b["freshness_score"] == 1.0
+    assert b["edge_over"] is None and b["edge_under"] > 0 and b["p_push"] > 0
+    repo = migrated_repo(tmp_path)
+    repo.store_edges(rows)
+    repo.store_edges(board_edges(board, "2026-02-26", now=NOW + timedelta(minutes=5)))
+    # Same market/model/day updates in place
+    assert repo.session.scalar(select(func.count()).select_from(Edge)) == 2
+
+
+def test_edges_csv_has_one_model_version_column(monkeypatch, tmp_path):
+    monkeypatch.setattr(writer, "OUTPUT_DIR", str(tmp_path))
+    board = [{"market_id": "m1", "player_id": "A", "stat_type": "PTS", "line": 21.5, "projection": 24.0,
+              "over_price": -110, "under_price": -110, "last_update": None}]
+    writer.write_daily_edges("2026-02-26", board_edges(board, "2026-02-26", now=NOW), "run_1", "v1")
+    header = (tmp_path / "daily_edges_2026-02-26.csv").read_text().splitlines()[0].split(",")
+    assert header[:2] == ["run_id", "model_version"] and header.count("model_version") == 1
@@ -0,0 +1,101 @@
+from datetime import date
+
+import pytest
+
+from app.core.storage import gamelogs
+from app.core.storage.gamelogs import GameLogStore, parse_minutes
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class NoLimit:
+    def acquire(self):
+        pass
+
+
+def stat(player_id, game_id, day, pts, reb=5, ast=3, minutes="30:00"):
+    return {
+        "id": player_id * 1000 + game_id,
+        "min": minutes,
+        "pts": pts, "reb": reb, "ast": ast, "fg3m": 1, "stl": 0, "blk": 0, "turnover": 2,
+        "player": {"id": player_id, "first_name": "Player", "last_name": f"No{player_id}", "team_id": 7},
+        "team": {"id": 7},
+        "game": {"id": game_id, "date": f"{day}T00:00:00.000Z", "season": 2024},
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = GameLogStore(url=f"sqlite:///{tmp_path / 'gamelogs.db'}", rate_limiter=NoLimit())
+    yield s
+    s.close()
+
+
+def fake_api(monkeypatch, rows, page_size=2):
+    calls = []
+
+    def fake_get(url, params=None, timeout=None, **kwargs):
+        calls.append(dict(params))
+        start, end = params.get("start_date"), params.get("end_date")
+        data = [r for r in rows if (start is None or r["game"]["date"][:10] >= start)
+                and (end is None or r["game"]["date"][:10] <= end)]
+        page = params["page"]
+        chunk = data[(page - 1) * page_size:page * page_size]
+        next_page = page + 1 if page * page_size < len(data) else None
+        return FakeResponse({"data": chunk, "meta": {"next_page": next_page}})
+
+    monkeypatch.setattr(gamelogs.http_client, "get", fake_get)
+    return calls
+
+
+def test_parse_minutes():
+    assert parse_minutes("34:30") == 34.5
+    assert parse_minutes("12") == 12.0
+    assert parse_minutes("") == 0.0 and parse_minutes(None) == 0.0
+
+
+def test_refresh_pages_stores_and_precomputes_averages(monkeypatch, store):
+    rows = [stat(1, g, f"2024-11-{g:02d}", pts=g) for g in range(1, 13)]
+    rows.append(stat(2, 1, "2024-11-01", pts=20))
+    # DNP is stored but not averaged
+    rows.append(stat(2, 2, "2024-11-02", pts=0, minutes="00"))
+    calls = fake_api(monkeypatch, rows)
+
+    stored = store.refresh(through="2024-11-12", since="2024-11-01")
+    assert stored == 14
+    assert len(calls) == 7
+    assert store.last_refreshed() == date(2024, 11, 12)
+
+    feats = store.features([1, 2])
+    assert feats[1]["games"] == 12
+    assert feats[1]["pts"] == pytest.approx(6.5)
+    assert feats[1]["pts_l5"] == pytest.approx(10.0)
+    assert feats[1]["pts_l10"] == pytest.approx(7.5)
+    assert feats[1]["last_game_date"] == date(2024, 11, 12)
+    assert feats[2]["games"] == 1 and feats[2]["pts"] == 20
+
+    logs = store.game_logs([1], last_n=3)
+    assert logs["pts"].tolist() == [12, 11, 10]
+
+
+def test_refresh_is_incremental_and_updates_averages(monkeypatch, store):
+    rows = [stat(1, 1, "2024-11-01", pts=10), stat(1, 2, "2024-11-02", pts=20)]
+    calls = fake_api(monkeypatch, rows)
+    store.refresh(through="2024-11-02", since="2024-11-01")
+
+    rows.append(stat(1, 3, "2024-11-05", pts=30))
+    calls.clear()
+    assert store.refresh(through="2024-11-05") == 2
+    # Only the last refreshed day (overlap) onward is requested
+    assert calls[0]["start_date"] == "2024-11-02"
+    assert store.features([1])[1]["pts"] == pytest.approx(20.0)
+    assert store.last_refreshed() == date(2024, 11, 5)
@@ -0,0 +1,100 @@
+import json
+import time
+
+from app.core.utils import http_client
+from app.core.utils.http_client import ResponseCache
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = json.dumps(payload).encode() if payload is not None else b""
+
+
+def test_cache_key_ignores_api_key():
+    a = ResponseCache.key("https://x/events", {"apiKey": "one", "dateFormat": "iso"})
+    b = ResponseCache.key("https://x/events", {"dateFormat": "iso", "apiKey": "two"})
+    assert a == b
+
+
+def test_cached_get_serves_fresh_entries_and_revalidates_stale(monkeypatch, tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    calls = []
+
+    def fake_get(url, params=None, timeout=None, headers=None):
+        calls.append(headers or {})
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return FakeResponse(304)
+        return FakeResponse(200, [{"id": "e1"}], {"ETag": '"v1"'})
+
+    monkeypatch.setattr(http_client, "get", fake_get)
+    first = http_client.cached_get("https://x/events", {"apiKey": "k"}, ttl=60, cache=cache)
+    second = http_client.cached_get("https://x/events", {"apiKey": "k"}, ttl=60, cache=cache)
+    assert first.status_code == 200 and second.json() == [{"id": "e1"}]
+    assert len(calls) == 1
+
+    # Expire the entry; next call is a conditional request answered with 304
+    key = cache.key("https://x/events", {})
+    meta, body = cache.get(key)
+    cache.put(key, 200, meta["headers"], body, ttl=-1)
+    third = http_client.cached_get("https://x/events", {"apiKey": "k"}, ttl=60, cache=cache)
+    assert calls[-1]["If-None-Match"] == '"v1"'
+    assert third.json() == [{"id": "e1"}]
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=250)
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, 200, {}, b"x" * 100, ttl=60)
+        # Distinct mtimes so LRU order is deterministic
+        t = time.time() - 10 + i
+        import os
+        os.utime(tmp_path / f"{key}.body", (t, t))
+    cache.put("d", 200, {}, b"x" * 100, ttl=60)
+    assert cache.get("a") is None
+    assert cache.get("d") is not None
+
+
+def test_cache_writes_are_atomic(monkeypatch, tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put("a", 200, {"ETag": '"v1"'}, b"old", ttl=60)
+
+    def crash(src, dst):
+        raise OSError("disk full")
+
+    # A write that dies before the rename leaves the previous entry whole and no temp files
+    monkeypatch.setattr(http_client.os, "replace", crash)
+    try:
+        cache.put("a", 200, {"ETag": '"v2"'}, b"new", ttl=60)
+    except OSError:
+        pass
+    monkeypatch.undo()
+    meta, body = cache.get("a")
+    assert body == b"old" and meta["etag"] == '"v1"'
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.body", "a.meta"]
+    cache.clear()
+    assert not list(tmp_path.iterdir())
+
+
+def test_cache_never_pairs_a_body_with_another_bodys_meta(monkeypatch, tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put("a", 200, {"ETag": '"v1"'}, b"old", ttl=60)
+    real_replace = http_client.os.replace
+
+    def crash_on_meta(src, dst):
+        if dst.endswith(".meta"):
+            raise OSError("killed between the two renames")
+        real_replace(src, dst)
+
+    # New body landed, meta did not: a miss (refetch) rather than the new body under the v1 ETag
+    monkeypatch.setattr(http_client.os, "replace", crash_on_meta)
+    try:
+        cache.put("a", 200, {"ETag": '"v2"'}, b"new", ttl=60)
+    except OSError:
+        pass
+    monkeypatch.undo()
+    assert cache.get("a") is None
+    cache.put("a", 200, {"ETag": '"v2"'}, b"new", ttl=60)
+    meta, body = cache.get("a")
+    assert body == b"new" and meta["etag"] == '"v2"'
@@ -0,0 +1,63 @@
+import copy
+from datetime import datetime
+
+from app.core.modeling.board import build_board
+from app.core.modeling.incremental import BoardState, incremental_board
+
+NOW = datetime(2026, 2, 26, 18)
+DATE = "2026-02-26"
+
+
+def quote(player, stat, line, source, over, under):
+    return {"player_id": player, "stat_type": stat, "line": line, "source": source, "market_id": f"m-{player}-{stat}",
+            "over": over, "under": under, "last_update": NOW}
+
+
+QUOTES = [
+    quote("A", "PTS", 21.5, "FanDuel", -115, -105),
+    quote("A", "PTS", 21.5, "DraftKings", -110, -110),
+    quote("A", "REB", 7.5, "FanDuel", 100, -120),
+    quote("A", "AST", 4.5, "FanDuel", -110, -110),
+    quote("A", "PRA", 33.5, "FanDuel", -110, -110),
+    quote("B", "PTS", 18.5, "FanDuel", -120, 100),
+]
+
+
+def run(quotes, state, **kw):
+    return incremental_board(quotes, DATE, state=state, now=NOW, **kw)
+
+
+def test_only_moved_props_are_recomputed(tmp_path):
+    state = BoardState(DATE, root=str(tmp_path))
+    board, edges, changed, _, stats = run(QUOTES, state)
+    assert stats["dirty"] == 5 and len(changed) == 5
+    full, _ = build_board(QUOTES, now=NOW)
+    assert sorted(r["projection"] for r in board) == sorted(r["projection"] for r in full)
+    state.save()
+
+    # Reloaded state, same inputs in a different order: nothing to do
+    state = BoardState(DATE, root=str(tmp_path))
+    board2, edges2, changed, _, stats = run(list(reversed(QUOTES)), state)
+    assert stats["dirty"] == 0 and changed == []
+    assert len(board2) == 5 and len(edges2) == 5
+
+    # One book moves A's points: only that prop recomputes, combo model follows it
+    moved = copy.deepcopy(QUOTES)
+    moved[0]["over"] = -150
+    board3, _, changed, _, stats = run(moved, state)
+    assert stats["dirty"] == 1 and [e["player_id"] for e in changed] == ["A"]
+    pts = {r["stat_type"]: r for r in board3 if r["player_id"] == "A"}
+    assert pts["PTS"]["projection"] > next(r for r in board2 if r["player_id"] == "A" and r["stat_type"] == "PTS")["projection"]
+    assert pts["PRA"]["model_projection"] == round(pts["PTS"]["projection"] + pts["REB"]["projection"]
+                                                   + pts["AST"]["projection"], 2)
+
+
+def test_book_set_and_model_version_invalidate(tmp_path):
+    state = BoardState(DATE, root=str(tmp_path))
+    run(QUOTES, state)
+    _, _, _, _, stats = run(QUOTES + [quote("B", "PTS", 18.5, "Pinnacle", -125, 105)], state)
+    assert stats["dirty"] == 1
+    _, _, _, _, stats = run(QUOTES, state, model_version="v2")
+    assert stats["dirty"] == 5 and stats["dropped"] == 0
+    board, _, _, _, stats = run(QUOTES[:2], state, model_version="v2")
+    assert stats["dropped"] == 4 and len(board) == 1
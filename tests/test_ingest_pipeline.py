@@ -0,0 +1,129 @@
+import copy
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from app.core.adapters import ingest_pipeline
+from app.core.storage.snapshots import LineSnapshotStore
+
+# Upcoming game, so snapshot retention keeps it
+TIP = (datetime.now(timezone.utc) + timedelta(hours=6)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+EVENT = {
+    "id": "g1",
+    "commence_time": TIP,
+    "bookmakers": [
+        {
+            "title": "FanDuel",
+            "last_update": "2026-02-26T18:00:00Z",
+            "markets": [
+                {
+                    "key": "player_points",
+                    "outcomes": [
+                        {"name": "Over", "description": "LaMelo Ball", "point": 21.5, "price": -115},
+                        {"name": "Under", "description": "LaMelo Ball", "point": 21.5, "price": -105},
+                    ],
+                }
+            ],
+        }
+    ],
+}
+
+
+class FakeClient:
+    payload = [EVENT]
+
+    def iter_odds(self, date):
+        yield from copy.deepcopy(self.payload)
+
+
+class FakeRepo:
+    markets = []
+    lines = []
+    url = "sqlite:///a.db"
+
+    def store_markets(self, markets, on_conflict="update"):
+        FakeRepo.markets.extend(markets)
+
+    def database_url(self):
+        return FakeRepo.url
+
+    def existing_market_ids(self, market_ids):
+        return {m["id"] for m in FakeRepo.markets} & set(market_ids)
+
+    def store_lines(self, lines):
+        FakeRepo.lines.extend(lines)
+
+    def store_raw_response(self, response, date):
+        pass
+
+    @contextmanager
+    def transaction(self):
+        yield self
+
+    def ensure_line_partitions(self):
+        return []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+def test_delta_ingest_reuses_markets_and_skips_unchanged_lines(monkeypatch, tmp_path):
+    monkeypatch.setattr(ingest_pipeline, "TheOddsClient", FakeClient)
+    monkeypatch.setattr(ingest_pipeline, "NBARepository", FakeRepo)
+    FakeRepo.markets, FakeRepo.lines = [], []
+    path = str(tmp_path / "snap.json")
+
+    first = ingest_pipeline.ingest_nba_props("2026-02-26", delta=True, snapshots=LineSnapshotStore(path))
+    assert len(FakeRepo.markets) == 1 and len(FakeRepo.lines) == 2
+
+    # Unchanged board: no lines written, the market only re-sent as insert-if-missing under the same id
+    second = ingest_pipeline.ingest_nba_props("2026-02-26", delta=True, snapshots=LineSnapshotStore(path))
+    assert len(FakeRepo.lines) == 2
+    assert {m["id"] for m in FakeRepo.markets} == {m["id"] for m in second} == {m["id"] for m in first}
+
+    # Over price moves: exactly one new line on the existing market
+    moved = copy.deepcopy(EVENT)
+    moved["bookmakers"][0]["markets"][0]["outcomes"][0]["price"] = -125
+    monkeypatch.setattr(FakeClient, "payload", [moved])
+    ingest_pipeline.ingest_nba_props("2026-02-26", delta=True, snapshots=LineSnapshotStore(path))
+    assert len(FakeRepo.lines) == 3
+    assert FakeRepo.lines[-1]["price_american"] == -125
+    assert FakeRepo.lines[-1]["market_id"] == first[0]["id"]
+
+
+def test_delta_snapshot_resets_for_a_new_database(monkeypatch, tmp_path):
+    monkeypatch.setattr(ingest_pipeline, "TheOddsClient", FakeClient)
+    monkeypatch.setattr(ingest_pipeline, "NBARepository", FakeRepo)
+    monkeypatch.setattr(FakeClient, "payload", [EVENT])
+    FakeRepo.markets, FakeRepo.lines = [], []
+    path = str(tmp_path / "snap.json")
+    ingest_pipeline.ingest_nba_props("2026-02-26", delta=True, snapshots=LineSnapshotStore(path))
+    assert len(FakeRepo.lines) == 2
+    # Same URL but the DB was recreated: the snapshot's markets are gone, so every line is written again
+    FakeRepo.markets, FakeRepo.lines = [], []
+    ingest_pipeline.ingest_nba_props("2026-02-26", delta=True, snapshots=LineSnapshotStore(path))
+    assert len(FakeRepo.markets) == 1 and len(FakeRepo.lines) == 2
+    # Another DATABASE_URL: same
+    monkeypatch.setattr(FakeRepo, "url", "postgresql://u:***@h/db")
+    ingest_pipeline.ingest_nba_props("2026-02-26", delta=True, snapshots=LineSnapshotStore(path))
+    assert len(FakeRepo.lines) == 4
+    assert LineSnapshotStore(path).database_url == "postgresql://u:***@h/db"
+
+
+def test_iter_ingest_flushes_in_batches_while_streaming(monkeypatch, tmp_path):
+    monkeypatch.setattr(ingest_pipeline, "NBARepository", FakeRepo)
+    FakeRepo.markets, FakeRepo.lines = [], []
+    second_game = copy.deepcopy(EVENT)
+    second_game["id"] = "g2"
+    stream = ingest_pipeline.iter_ingest("2026-02-26", delta=False, events=iter([EVENT, second_game]), batch_size=2)
+    # Both outcomes of the first event are yielded once its batch has been written
+    next(stream)
+    next(stream)
+    next(stream)
+    assert len(FakeRepo.lines) == 2
+    rest = list(stream)
+    assert len(rest) == 1
+    assert len(FakeRepo.lines) == 4 and len(FakeRepo.markets) == 2
@@ -8,3 +8,14 @@ def test_remove_vig():
     p_over, p_under = remove_vig(0.55, 0.45)
     assert round(p_over + p_under, 4) == 1.0
     assert round(p_over, 4) == 0.55 / (0.55 + 0.45)
+
+def test_batch_matches_scalar_and_propagates_missing():
+    import numpy as np
+    from app.core.pricing.odds_math import american_to_implied_prob_array, remove_vig_array
+
+    odds = [-110, 150, -250, 100, None]
+    implied = american_to_implied_prob_array(odds)
+    assert np.allclose(implied[:4], [american_to_implied_prob(o) for o in odds[:4]])
+    assert np.isnan(implied[4])
+    p_over, p_under = remove_vig_array(implied[:2], implied[2:4])
+    assert np.allclose(p_over + p_under, 1.0)
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.storage.partitions import compact_lines
+from app.core.storage.repository import Base, Line, LineRollup, NBARepository
+
+
+def test_compact_rolls_up_hourly_ohlc_and_drops_old_raw_lines():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    repo = NBARepository(session=sessionmaker(bind=engine)())
+    old = datetime(2026, 2, 1, 19, 0)
+    prices = [-110, -120, -105, -115]
+    points = [21.5, 21.5, 22.5, 22.0]
+    lines = [{"id": f"old{i}", "market_id": "m1", "source": "FanDuel", "side": "over", "line_value": pt,
+              "price_american": pr, "timestamp": old + timedelta(minutes=10 * i)}
+             for i, (pr, pt) in enumerate(zip(prices, points))]
+    lines.append({"id": "new", "market_id": "m1", "source": "FanDuel", "side": "over", "line_value": 23.5,
+                  "price_american": -110, "timestamp": datetime(2026, 2, 26, 18)})
+    repo.store_lines(lines)
+
+    summary = compact_lines(repo, retention_days=14, now=datetime(2026, 2, 26, 20))
+    assert summary["rollups"] == 1 and summary["deleted_rows"] == 4
+    rollup = repo.session.execute(select(LineRollup)).scalar_one()
+    assert (rollup.open_price, rollup.high_price, rollup.low_price, rollup.close_price) == (-110, -105, -120, -115)
+    assert (rollup.open_point, rollup.high_point, rollup.low_point, rollup.close_point) == (21.5, 22.5, 21.5, 22.0)
+    assert rollup.bucket_start == old and rollup.n_obs == 4
+    assert repo.session.scalar(select(func.count()).select_from(Line)) == 1
+
+    # Re-running is idempotent
+    compact_lines(repo, retention_days=14, now=datetime(2026, 2, 26, 20))
+    assert repo.session.scalar(select(func.count()).select_from(LineRollup)) == 1
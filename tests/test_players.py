@@ -0,0 +1,94 @@
+import json
+
+from app.core.normalization.nba_props import normalize_props
+from app.core.normalization.players import PlayerIndex, normalize_name
+from app.core.storage.gamelogs import GameLogStore, players
+
+
+def make_index():
+    return PlayerIndex({
+        132: {"name": "Luka Doncic", "team_id": 7},
+        3547: {"name": "P.J. Washington", "team_id": 7},
+        666: {"name": "Nicolas Claxton", "team_id": 3},
+        237: {"name": "LeBron James", "team_id": 14},
+        3000: {"name": "Bronny James", "team_id": 14},
+    })
+
+
+def test_normalize_name():
+    assert normalize_name("Luka Dončić") == "luka doncic"
+    assert normalize_name("P.J. Washington Jr.") == "pj washington"
+    assert normalize_name("Shai Gilgeous-Alexander") == "shai gilgeous alexander"
+
+
+def test_resolve_exact_alias_and_fuzzy():
+    index = make_index()
+    assert index.resolve("luka dončić") == 132
+    assert index.resolve("PJ Washington") == 3547
+    assert index.resolve("Nic Claxton") == 666
+    # Shortened first name is caught by trigram similarity, unrelated names are not
+    assert index.resolve("Nico Claxton") == 666
+    assert index.resolve("Anthony Edwards") is None
+    # A different last name is never the same player
+    assert index.resolve("Lebron Jame") is None
+    assert index.canonical_name("PJ Washington Jr") == "P.J. Washington"
+    assert index.team_of("Lebron James") == "Los Angeles Lakers"
+    assert index.resolve_team("LA Clippers") == "Los Angeles Clippers"
+    assert index.resolve_team("Celtics") == "Boston Celtics"
+
+
+def test_near_miss_names_are_not_merged():
+    # Box-score index without the book's player: keep him unresolved, not his namesake
+    index = PlayerIndex({1: {"name": "Jaden McDaniels", "team_id": 18}, 2: {"name": "Keldon Johnson", "team_id": 27},
+                         3: {"name": "Jalen Williams", "team_id": 21}, 4: {"name": "Jaylin Williams", "team_id": 21}})
+    assert index.resolve("Jalen McDaniels") is None
+    assert index.resolve("Keon Johnson") is None
+    # Two close candidates: no clear winner
+    assert index.resolve("J Williams") is None
+    assert index.resolve("Jaden McDaniels Jr") == 1
+    # Nor is a misspelt last name
+    assert index.resolve("Jaden Mcdaniel") is None
+    # A fuzzy match must play for one of the event's teams; exact matches always stand
+    index = PlayerIndex({1: {"name": "Nicolas Claxton", "team_id": 3}})
+    assert index.resolve("Nico Claxton", teams={"Brooklyn Nets"}) == 1
+    assert index.resolve("Nico Claxton", teams={"Boston Celtics", "Miami Heat"}) is None
+    assert index.resolve("Nicolas Claxton", teams={"Boston Celtics"}) == 1
+
+    def outcome(name):
+        return {"name": "Over", "description": name, "point": 4.5, "price": -110}
+
+    event = {"id": "g1", "commence_time": "2024-01-01T00:00:00Z", "home_team": "Boston Celtics",
+             "away_team": "Brooklyn Nets", "bookmakers": [{"title": "FanDuel", "markets": [
+                 {"key": "player_assists", "outcomes": [outcome("Nico Claxton"), outcome("Jalen McDaniels")]}]}]}
+    index = PlayerIndex({1: {"name": "Nicolas Claxton", "team_id": 3}, 2: {"name": "Jaden McDaniels", "team_id": 18}})
+    rows = normalize_props([event], players=index)
+    assert [(r["player_id"], r["player_key"]) for r in rows] == [("Nicolas Claxton", 1), ("Jalen McDaniels", None)]
+
+
+def test_save_load_and_build_from_store(tmp_path):
+    store = GameLogStore(url=f"sqlite:///{tmp_path / 'g.db'}")
+    with store.engine.begin() as conn:
+        conn.execute(players.insert(), [{"player_id": 1, "first_name": "Jalen", "last_name": "Brunson", "team_id": 20}])
+    index = PlayerIndex.from_store(store, aliases={"J. Brunson": "Jalen Brunson"})
+    store.close()
+    path = str(tmp_path / "index.json")
+    index.save(path)
+    assert "Nic Claxton" not in json.load(open(path))["aliases"]
+    loaded = PlayerIndex.load(path)
+    assert loaded.resolve("J Brunson") == 1
+    assert loaded.team_of("jalen brunson") == "New York Knicks"
+
+
+def test_books_spellings_share_one_prop():
+    def outcome(name, side):
+        return {"name": side, "description": name, "point": 4.5, "price": -110}
+
+    event = {"id": "g1", "commence_time": "2024-01-01T00:00:00Z", "bookmakers": [
+        {"title": "DraftKings", "markets": [{"key": "player_assists", "outcomes": [outcome("P.J. Washington", "Over")]}]},
+        {"title": "FanDuel", "markets": [{"key": "player_assists", "outcomes": [outcome("PJ Washington Jr", "Under")]}]},
+    ]}
+    rows = normalize_props([event], players=make_index())
+    assert {r["player_id"] for r in rows} == {"P.J. Washington"}
+    assert {r["player_key"] for r in rows} == {3547}
+    # Unknown players keep the book's spelling
+    assert normalize_props([event], players=PlayerIndex())[1]["player_id"] == "PJ Washington Jr"
@@ -0,0 +1,23 @@
+import numpy as np
+
+from app.core.modeling.projection import consensus_mean, consensus_mean_array, price_props
+
+
+def test_consensus_mean_array_matches_scalar():
+    lines = [21.5, 8.5, 6.5, 30.5]
+    p_over = [0.55, 0.5, 0.4, 0.62]
+    stats = ["PTS", "REB", "AST", "BLK"]  # BLK falls back to the default stdev
+    batch = consensus_mean_array(lines, p_over, stats)
+    assert np.allclose(batch, [consensus_mean(l, p, s) for l, p, s in zip(lines, p_over, stats)])
+    assert batch[1] == 8.5
+    # Over favoured -> mean above the line
+    assert batch[0] > 21.5 and batch[2] < 6.5
+
+
+def test_price_props_one_sided_and_empty():
+    priced = price_props([-110, None], [-110, 120], [21.5, 5.5], ["PTS", "REB"])
+    assert np.allclose(priced["p_over"] + priced["p_under"], 1.0)
+    # Under-only prop: the over is the complement of the quoted under
+    assert np.isnan(priced["implied_over"][1]) and np.isnan(priced["hold"][1])
+    assert np.isclose(priced["p_over"][1], 1 - 100 / 220)
+    assert price_props([], [], [], [])["mean"].shape == (0,)
@@ -0,0 +1,72 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.storage.repository import Line, Market, NBARepository, Pick, Result
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def repo(tmp_path):
+    # Build the schema through the migrations, not create_all, so the test covers 002
+    url = f"sqlite:///{tmp_path / 'plans.db'}"
+    cfg = Config(os.path.join(ROOT, "alembic.ini"))
+    cfg.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    cfg.attributes["database_url"] = url
+    command.upgrade(cfg, "head")
+    engine = create_engine(url)
+    repo = NBARepository(session=sessionmaker(bind=engine)())
+    start = datetime(2026, 2, 26, 18)
+    markets = [{"id": f"m{i}", "game_id": f"g{i % 12}", "player_id": f"p{i}", "stat_type": "PTS",
+                "created_at": start + timedelta(days=i % 30)} for i in range(500)]
+    lines = [{"id": f"l{i}", "market_id": f"m{i % 500}", "source": "FanDuel", "side": "over",
+              "line_value": 20.5, "price_american": -110, "timestamp": start + timedelta(minutes=i)}
+             for i in range(5000)]
+    repo.store_markets(markets)
+    repo.store_lines(lines)
+    repo.store_results([{"id": f"r{i}", "market_id": f"m{i}", "actual_value": 20.0,
+                         "settled_at": start, "source": "bdl"} for i in range(500)])
+    repo.session.execute(Pick.__table__.insert(), [
+        {"id": f"k{i}", "user_tag": "u", "market_id": f"m{i}", "side": "over", "stake": 1.0,
+         "line_at_pick": 20.5, "price_at_pick": -110, "picked_at": start + timedelta(days=i % 30),
+         "model_version": "v", "projected_mean": 21.0, "p_hit": 0.55} for i in range(500)])
+    repo.session.commit()
+    repo.session.connection().exec_driver_sql("ANALYZE")
+    return repo
+
+
+def plan(repo, stmt):
+    sql = str(stmt.compile(repo.session.get_bind(), compile_kwargs={"literal_binds": True}))
+    rows = repo.session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + sql).fetchall()
+    return " | ".join(r[-1] for r in rows)
+
+
+def test_line_history_uses_market_timestamp_index(repo):
+    stmt = select(Line).where(Line.market_id == "m7").order_by(Line.timestamp)
+    detail = plan(repo, stmt)
+    assert "ix_lines_market_id_timestamp" in detail
+    # Ordering is satisfied by the index, no temp sort
+    assert "TEMP B-TREE" not in detail
+
+
+def test_market_lookups_use_indexes(repo):
+    assert "ix_markets_created_at" in plan(repo, select(Market).where(Market.created_at == datetime(2026, 2, 27, 18)))
+    stmt = select(Market).where(Market.game_id == "g1", Market.player_id == "p1", Market.stat_type == "PTS")
+    assert "ix_markets_game_player_stat" in plan(repo, stmt)
+
+
+def test_grading_join_uses_result_market_index(repo):
+    stmt = (
+        select(Pick.id, Result.actual_value)
+        .join(Result, Result.market_id == Pick.market_id)
+        .where(Pick.picked_at >= datetime(2026, 2, 27), Pick.picked_at < datetime(2026, 2, 28))
+    )
+    detail = plan(repo, stmt)
+    assert "ix_picks_picked_at" in detail
+    assert "ix_results_market_id" in detail
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+
+from app.core.adapters import quota
+from app.core.adapters.quota import COMBO_MARKETS, CORE_MARKETS, FULL_MARKETS, QuotaLedger, RequestPlanner
+
+NOW = datetime(2026, 2, 26, 18, 0, tzinfo=timezone.utc)
+
+
+def iso(hours):
+    return (NOW + timedelta(hours=hours)).isoformat().replace("+00:00", "Z")
+
+
+def test_ledger_records_headers_and_persists(tmp_path):
+    path = str(tmp_path / "quota.json")
+    ledger = QuotaLedger(path)
+    ledger.record({"x-requests-remaining": "480", "x-requests-used": "20", "x-requests-last": "4"}, "odds")
+    reloaded = QuotaLedger(path)
+    assert reloaded.remaining == 480
+    assert reloaded.used == 20
+    assert reloaded.state["history"][-1]["cost"] == 4
+
+
+def test_planner_skips_tipped_and_downgrades_far_events():
+    events = [
+        {"id": "live", "commence_time": iso(-1)},
+        {"id": "soon", "commence_time": iso(2)},
+        {"id": "tomorrow", "commence_time": iso(20)},
+    ]
+    decisions = {d.event_id: d for d in RequestPlanner(now=NOW, max_credits=0).plan(events)}
+    assert decisions["live"].action == "skip"
+    assert decisions["soon"].markets == FULL_MARKETS
+    assert decisions["tomorrow"].markets == CORE_MARKETS
+
+
+def test_planner_fits_remaining_budget(tmp_path):
+    ledger = QuotaLedger(str(tmp_path / "quota.json"))
+    budget = len(FULL_MARKETS) + 2
+    ledger.record({"x-requests-remaining": str(50 + budget)})
+    events = [{"id": f"e{h}", "commence_time": iso(h)} for h in (1, 2, 3)]
+    decisions = RequestPlanner(ledger, reserve=50, max_credits=0, now=NOW).plan(events)
+    # Nearest event keeps full markets, the two later ones drop to core
+    assert sum(d.cost for d in decisions) <= budget
+    assert decisions[0].markets == FULL_MARKETS
+    assert [d.reason for d in decisions[1:]] == ["budget: downgraded", "budget: downgraded"]
+
+
+def test_planner_drops_combo_markets_before_downgrading(monkeypatch, tmp_path):
+    # Combos are opt-in (THEODDS_COMBO_MARKETS); when on, a tight budget sheds them first
+    assert not set(COMBO_MARKETS) & set(FULL_MARKETS)
+    full = FULL_MARKETS + COMBO_MARKETS
+    monkeypatch.setattr(quota, "FULL_MARKETS", full)
+    ledger = QuotaLedger(str(tmp_path / "quota.json"))
+    budget = len(full) + len(FULL_MARKETS)
+    ledger.record({"x-requests-remaining": str(50 + budget)})
+    events = [{"id": f"e{h}", "commence_time": iso(h)} for h in (1, 2)]
+    decisions = RequestPlanner(ledger, reserve=50, max_credits=0, now=NOW).plan(events)
+    assert sum(d.cost for d in decisions) <= budget
+    assert decisions[0].markets == full
+    assert decisions[1].markets == FULL_MARKETS and decisions[1].reason == "budget: combos dropped"
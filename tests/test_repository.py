@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.storage.repository import Base, Grade, Line, Market, NBARepository
+
+
+def make_repo(batch_size=3):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return NBARepository(session=sessionmaker(bind=engine)(), batch_size=batch_size)
+
+
+def test_bulk_store_lines_in_batches():
+    repo = make_repo()
+    lines = [
+        {"id": f"l{i}", "market_id": "m1", "source": "FanDuel", "side": "over",
+         "line_value": 21.5, "price_american": -110, "timestamp": datetime(2026, 2, 26, 18, i)}
+        for i in range(7)
+    ]
+    repo.store_lines(lines)
+    assert repo.session.scalar(select(func.count()).select_from(Line)) == 7
+    # Missing optional columns are written as NULL
+    assert repo.session.scalar(select(Line.latency_ms).where(Line.id == "l0")) is None
+
+
+def test_transaction_rolls_back_whole_ingest():
+    repo = make_repo()
+    try:
+        with repo.transaction():
+            repo.store_markets([{"id": "m1", "game_id": "g1", "player_id": "p", "stat_type": "PTS",
+                                 "created_at": datetime(2026, 2, 26)}])
+            raise RuntimeError("fetch failed mid-run")
+    except RuntimeError:
+        pass
+    assert repo.session.scalar(select(func.count()).select_from(Market)) == 0
+
+
+def test_upserts_make_reruns_idempotent():
+    from app.core.utils.ids import line_id, market_id
+
+    repo = make_repo()
+    mid = market_id("g1", "LaMelo Ball", "PTS")
+    assert mid == market_id("g1", "LaMelo Ball", "PTS")
+    market = {"id": mid, "game_id": "g1", "player_id": "LaMelo Ball", "stat_type": "PTS",
+              "created_at": datetime(2026, 2, 27)}
+    ts = datetime(2026, 2, 26, 18, 0)
+    line = {"id": line_id(mid, "FanDuel", "over", 21.5, -115, ts.isoformat()), "market_id": mid,
+            "source": "FanDuel", "side": "over", "line_value": 21.5, "price_american": -115, "timestamp": ts}
+    for _ in range(2):
+        repo.store_markets([market])
+        repo.store_lines([line])
+    # Rescheduled tip updates the existing market row in place
+    repo.store_markets([{**market, "created_at": datetime(2026, 2, 27, 1)}])
+    assert repo.session.scalar(select(func.count()).select_from(Market)) == 1
+    assert repo.session.scalar(select(func.count()).select_from(Line)) == 1
+    assert repo.session.scalar(select(Market.created_at)) == datetime(2026, 2, 27, 1)
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.sql = []
+
+    def execute(self, sql):
+        self.sql.append(sql)
+
+    def copy_expert(self, sql, buf):
+        self.sql.append(sql)
+
+    def close(self):
+        pass
+
+
+def test_copy_merge_keeps_same_duplicate_as_executemany():
+    # Duplicate ids in one batch: last row wins on upsert, first on DO NOTHING
+    repo = make_repo()
+    market = {"id": "m1", "game_id": "g1", "player_id": "p", "stat_type": "PTS"}
+    repo.store_markets([{**market, "created_at": datetime(2026, 2, 27, h)} for h in range(3)])
+    assert repo.session.scalar(select(Market.created_at)) == datetime(2026, 2, 27, 2)
+
+    cursor = RecordingCursor()
+    bind = SimpleNamespace(dialect=SimpleNamespace(name="postgresql", driver="psycopg2"))
+    copy_repo = NBARepository(session=SimpleNamespace(
+        get_bind=lambda: bind, connection=lambda: SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cursor))))
+    copy_repo._bulk_insert(Market, [market, market], on_conflict="update")
+    copy_repo._bulk_insert(Line, [{"id": "l1"}], on_conflict="nothing")
+    merges = [sql for sql in cursor.sql if sql.startswith("INSERT")]
+    assert 'ORDER BY "id", _stage_pos DESC ON CONFLICT ("id") DO UPDATE' in merges[0]
+    assert 'ORDER BY "id", "timestamp", _stage_pos ASC ON CONFLICT ("id", "timestamp") DO NOTHING' in merges[1]
+
+
+def seed_board(repo):
+    start = datetime(2026, 2, 26, 18)
+    repo.store_markets([{"id": f"m{i}", "game_id": "g1", "player_id": f"p{i}", "stat_type": "PTS",
+                         "created_at": start} for i in range(3)])
+    repo.store_lines([{"id": f"l{i}{j}", "market_id": f"m{i}", "source": "FanDuel", "side": "over",
+                       "line_value": 20.5 + j, "price_american": -110 - j,
+                       "timestamp": start + timedelta(minutes=j)} for i in range(3) for j in range(3)])
+
+
+def test_batched_line_reads():
+    repo = make_repo()
+    seed_board(repo)
+    rows = repo.get_lines_for_markets(["m0", "m2"])
+    assert len(rows) == 6 and {r.market_id for r in rows} == {"m0", "m2"}
+    latest = {r.market_id: r for r in repo.get_latest_lines()}
+    assert latest["m1"].line_value == 22.5 and latest["m1"].player_id == "p1"
+    capped = repo.get_latest_lines(["m1"], before=datetime(2026, 2, 26, 18, 1))
+    assert [r.line_value for r in capped] == [21.5]
+
+
+def test_grader_uses_joined_picks_and_results():
+    from app.core.metrics.tracking import Grader
+
+    repo = make_repo()
+    seed_board(repo)
+    repo.store_results([{"id": "r0", "market_id": "m0", "actual_value": 25.0,
+                         "settled_at": datetime(2026, 2, 27), "source": "bdl"}])
+    for i, side in enumerate(["over", "under"]):
+        repo.store_pick({"id": f"k{i}", "user_tag": "u", "market_id": "m0", "side": side, "stake": 10.0,
+                         "line_at_pick": 20.5, "price_at_pick": 150, "picked_at": datetime(2026, 2, 26, 17),
+                         "model_version": "v", "projected_mean": 22.0, "p_hit": 0.55})
+    grades = {g["pick_id"]: g for g in Grader(repo).grade_picks("2026-02-26")}
+    assert grades["k0"]["won"] and grades["k0"]["profit"] == 15.0
+    assert not grades["k1"]["won"] and grades["k1"]["profit"] == -10.0
+    assert repo.session.scalar(select(func.count()).select_from(Grade)) == 2
@@ -0,0 +1,72 @@
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app.cli.main import init_db
+from app.core.adapters.ingest_pipeline import iter_ingest
+from app.core.metrics.tracking import Grader
+from app.core.storage import repository
+from app.core.storage.engine import create_db_engine
+from app.core.storage.repository import NBARepository
+
+EVENT = {
+    "id": "g1",
+    "commence_time": "2026-02-26T19:00:00Z",
+    "bookmakers": [
+        {
+            "title": "FanDuel",
+            "last_update": "2026-02-26T18:00:00Z",
+            "markets": [
+                {
+                    "key": "player_points",
+                    "outcomes": [
+                        {"name": "Over", "description": "LaMelo Ball", "point": 21.5, "price": -115},
+                        {"name": "Under", "description": "LaMelo Ball", "point": 21.5, "price": -105},
+                    ],
+                }
+            ],
+        }
+    ],
+}
+
+
+def test_file_engine_uses_wal_and_pragmas(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'db' / 'props.db'}")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+
+
+def test_memory_engine_is_shared_across_sessions():
+    engine = create_db_engine("sqlite://")
+    Session = sessionmaker(bind=engine)
+    repository.Base.metadata.create_all(engine)
+    NBARepository(session=Session()).store_markets([{"id": "m1", "game_id": "g1", "player_id": "p",
+                                                      "stat_type": "PTS", "created_at": datetime(2026, 2, 26)}])
+    assert Session().get(repository.Market, "m1") is not None
+
+
+def test_offline_ingest_to_grade(tmp_path, monkeypatch):
+    # Schema from the migrations, then the real pipeline against the file DB
+    monkeypatch.chdir(tmp_path)
+    url = f"sqlite:///{tmp_path / 'props.db'}"
+    init_db(url=url)
+    monkeypatch.setattr(repository, "Session", sessionmaker(bind=create_db_engine(url)))
+
+    rows = list(iter_ingest("2026-02-26", delta=False, events=[EVENT]))
+    assert {r["side"] for r in rows} == {"over", "under"}
+
+    with NBARepository() as repo:
+        market_id = rows[0]["id"]
+        latest = repo.get_latest_lines([market_id])
+        over = next(r for r in latest if r.side == "over")
+        repo.store_pick({"id": "k1", "user_tag": "u", "market_id": market_id, "side": "over", "stake": 10.0,
+                         "line_at_pick": over.line_value, "price_at_pick": over.price_american,
+                         "picked_at": datetime(2026, 2, 26, 18), "model_version": "v",
+                         "projected_mean": 23.0, "p_hit": 0.55})
+        repo.store_results([{"id": "r1", "market_id": market_id, "actual_value": 25.0,
+                             "settled_at": datetime(2026, 2, 27), "source": "bdl"}])
+        grades = Grader(repo).grade_picks("2026-02-26")
+    assert len(grades) == 1 and grades[0]["won"]
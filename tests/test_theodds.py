@@ -0,0 +1,79 @@
+import json
+import threading
+import time
+
+from app.core.adapters import theodds
+from app.core.adapters.quota import QuotaLedger
+from app.core.adapters.theodds import TheOddsClient
+from app.core.utils import http_client
+from app.core.utils.ratelimit import TokenBucket
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self._payload = payload
+        self.headers = headers or {}
+        self.text = str(payload)
+        self.content = json.dumps(payload).encode()
+
+    def json(self):
+        return self._payload
+
+
+def test_token_bucket_blocks_when_empty():
+    now = [0.0]
+    slept = []
+
+    def sleep(sec):
+        slept.append(sec)
+        now[0] += sec
+
+    bucket = TokenBucket(60, capacity=2, clock=lambda: now[0], sleep=sleep)
+    bucket.acquire()
+    bucket.acquire()
+    assert not bucket.try_acquire()
+    bucket.acquire()
+    assert round(sum(slept), 6) == 1.0
+
+
+def test_fetch_odds_concurrent_keeps_event_order_and_retries(monkeypatch, tmp_path):
+    monkeypatch.setattr(http_client, "_cache", http_client.ResponseCache(str(tmp_path)))
+    event_ids = [f"e{i}" for i in range(8)]
+    calls = {}
+    lock = threading.Lock()
+
+    def fake_get(url, params=None, **kwargs):
+        if url == theodds.EVENTS_URL:
+            return FakeResponse(200, [{"id": e} for e in event_ids])
+        event_id = url.split("/events/")[1].split("/")[0]
+        with lock:
+            calls[event_id] = calls.get(event_id, 0) + 1
+            attempt = calls[event_id]
+        # Later events finish first; e3 is throttled once
+        time.sleep(0.001 * (8 - int(event_id[1:])))
+        if event_id == "e3" and attempt == 1:
+            return FakeResponse(429, "slow down", {"Retry-After": "0"})
+        return FakeResponse(200, {"id": event_id})
+
+    monkeypatch.setattr(http_client, "get", fake_get)
+    client = TheOddsClient(api_key="k", max_workers=4, rate_limiter=TokenBucket(6000),
+                           ledger=QuotaLedger(str(tmp_path / "quota.json")))
+    props = client.fetch_odds("2026-02-26")
+    assert [p["id"] for p in props] == event_ids
+    assert calls["e3"] == 2
+
+
+def test_fetch_odds_gives_up_after_max_retries(monkeypatch, tmp_path):
+    monkeypatch.setattr(http_client, "_cache", http_client.ResponseCache(str(tmp_path)))
+    monkeypatch.setattr(theodds.time, "sleep", lambda sec: None)
+
+    def fake_get(url, params=None, **kwargs):
+        if url == theodds.EVENTS_URL:
+            return FakeResponse(200, [{"id": "e1"}])
+        return FakeResponse(503, "unavailable")
+
+    monkeypatch.setattr(http_client, "get", fake_get)
+    client = TheOddsClient(api_key="k", rate_limiter=TokenBucket(6000),
+                           ledger=QuotaLedger(str(tmp_path / "quota.json")))
+    assert client.fetch_odds("2026-02-26") == []
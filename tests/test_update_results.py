@@ -0,0 +1,65 @@
+import pandas as pd
+
+import update_results as ur
+from app.core.normalization.players import PlayerIndex, set_index
+from app.core.storage.gamelogs import GameLogStore
+
+
+class NoLimit:
+    def acquire(self):
+        pass
+
+
+def box(player_id, game_id, day, pts, reb, ast, minutes="30"):
+    return {"min": minutes, "pts": pts, "reb": reb, "ast": ast, "fg3m": 2,
+            "player": {"id": player_id, "first_name": "P", "last_name": str(player_id)},
+            "team": {"id": 1}, "game": {"id": game_id, "date": day, "season": 2024}}
+
+
+def test_update_results_settles_by_date_in_one_pass(monkeypatch, tmp_path):
+    store = GameLogStore(url=f"sqlite:///{tmp_path / 'g.db'}", rate_limiter=NoLimit())
+    payload = [box(1, 10, "2024-11-01", pts=25, reb=8, ast=7),
+               box(2, 10, "2024-11-01", pts=10, reb=4, ast=2),
+               box(3, 10, "2024-11-01", pts=0, reb=0, ast=0, minutes="00"),
+               box(1, 11, "2024-11-02", pts=30, reb=5, ast=5)]
+    calls = []
+
+    class Resp:
+        def __init__(self, data):
+            self.data = data
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"data": self.data, "meta": {"next_page": None}}
+
+    def fake_get(url, params=None, **kwargs):
+        calls.append(params)
+        days = params["dates[]"]
+        return Resp([b for b in payload if b["game"]["date"] in days])
+
+    monkeypatch.setattr(ur.http_client, "get", fake_get)
+    set_index(PlayerIndex({1: {"name": "Alpha One", "team_id": 1}, 2: {"name": "Beta Two", "team_id": 1},
+                           3: {"name": "Gamma Three", "team_id": 1}}))
+    log = tmp_path / "pick_log.csv"
+    pd.DataFrame([
+        {"date": "2024-11-01", "player_id": "Alpha One", "stat_type": "PRA", "prop_line": 39.5, "recommended_side": "Over"},
+        {"date": "2024-11-01", "player_id": "Beta Two", "stat_type": "PTS", "prop_line": 10.0, "recommended_side": "Over"},
+        {"date": "2024-11-01", "player_id": "Beta Two", "stat_type": "REB", "prop_line": 5.5, "recommended_side": "Under"},
+        {"date": "2024-11-01", "player_id": "Gamma Three", "stat_type": "AST", "prop_line": 1.5, "recommended_side": "Under"},
+        {"date": "2024-11-02", "player_id": "Alpha One", "stat_type": "PA", "prop_line": 35.5, "recommended_side": "Under"},
+        {"date": "2024-11-02", "player_id": "Beta Two", "stat_type": "PTS", "prop_line": 9.5, "recommended_side": "Over"},
+    ]).to_csv(log, index=False)
+    try:
+        ur.update_results(str(log), store=store)
+    finally:
+        set_index(None)
+        store.close()
+    out = pd.read_csv(log)
+    assert out["final_result"].tolist()[:5] == ["hit", "push", "hit", "void", "hit"]
+    # No box score for that player-day: left open
+    assert pd.isna(out["final_result"][5])
+    assert out["actual"].tolist()[:3] == [40, 10, 4]
+    # Both dates fetched in a single request
+    assert len(calls) == 1
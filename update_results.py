@@ -1,60 +1,100 @@
-import requests
 import pandas as pd
+import numpy as np
 import os
-from datetime import datetime
+from contextlib import nullcontext
+from datetime import date
+from app.core.modeling.config import COMBO_COMPONENTS
+from app.core.normalization.players import get_index
+from app.core.storage.gamelogs import BALLDONTLIE_BASE_URL, GameLogStore
+from app.core.utils import http_client
 
-BALLDONTLIE_BASE_URL = "https://www.balldontlie.io/api/v1/"
+# Box score column behind each single stat; combos sum their components
+STAT_COLUMNS = {"PTS": "pts", "REB": "reb", "AST": "ast", "3PM": "fg3m"}
 
 def get_game_stats(game_id):
-    resp = requests.get(f"{BALLDONTLIE_BASE_URL}stats", params={"game_ids[]": game_id, "per_page": 100})
+    resp = http_client.get(f"{BALLDONTLIE_BASE_URL}stats", params={"game_ids[]": game_id, "per_page": 100})
     resp.raise_for_status()
     return resp.json()["data"]
 
-def update_results(log_path="output/pick_log.csv"):
+def search_player_id(name):
+    # Not in the local index yet: fall back to the balldontlie search
+    resp = http_client.cached_get(f"{BALLDONTLIE_BASE_URL}players", params={"search": name}, ttl=86400)
+    resp.raise_for_status()
+    data = resp.json()["data"]
+    return data[0]["id"] if data else None
+
+def stat_actuals(box):
+    """Long table of (player_id, game_date, minutes, stat_type, actual) for every stat we settle."""
+    wide = pd.DataFrame({stat: box[col].astype(float) for stat, col in STAT_COLUMNS.items()}, index=box.index)
+    for combo, parts in COMBO_COMPONENTS.items():
+        wide[combo] = wide[list(parts)].sum(axis=1)
+    wide[["player_id", "game_date", "minutes"]] = box[["player_id", "game_date", "minutes"]]
+    return wide.melt(id_vars=["player_id", "game_date", "minutes"], var_name="stat_type", value_name="actual")
+
+def settle(picks, box):
+    """
+    Settle pick rows (player_key, date, stat_type, prop_line, recommended_side)
+    against box scores in one join. Returns (final_result, actual) aligned to
+    picks.index: hit / miss, push when the stat lands on the line, void when
+    the player is on the box score but did not play; NaN when there is no box
+    score for the player that day (left open).
+    """
+    long = stat_actuals(box).drop_duplicates(["player_id", "game_date", "stat_type"])
+    merged = picks[["player_key", "date", "stat_type", "prop_line", "recommended_side"]].merge(
+        long, how="left", left_on=["player_key", "date", "stat_type"],
+        right_on=["player_id", "game_date", "stat_type"])
+    merged.index = picks.index
+    actual = merged["actual"]
+    line = merged["prop_line"].astype(float)
+    side = merged["recommended_side"].astype(str).str.lower()
+    hit = ((side == "over") & (actual > line)) | ((side == "under") & (actual < line))
+    result = np.select(
+        [actual.isna(), merged["minutes"] <= 0, actual == line, hit],
+        [None, "void", "push", "hit"],
+        default="miss",
+    )
+    result = pd.Series(result, index=picks.index, dtype=object)
+    return result, actual.where(merged["minutes"] > 0)
+
+def update_results(log_path="output/pick_log.csv", store=None):
     if not os.path.exists(log_path):
         print("No pick log found.")
         return
     df = pd.read_csv(log_path)
-    # Only update picks without a final_result
-    mask = df["final_result"].isnull() if "final_result" in df.columns else [True]*len(df)
-    df["final_result"] = df.get("final_result", pd.Series([None]*len(df)))
-    for idx, row in df[mask].iterrows():
-        # Try to get yesterday's or earlier games
+    for col in ("final_result", "actual"):
+        if col not in df.columns:
+            df[col] = None
+    df["final_result"] = df["final_result"].astype(object)
+    # Only update picks without a final_result, for games that have finished
+    dates = pd.to_datetime(df["date"]).dt.date
+    open_rows = df[df["final_result"].isnull() & (dates < date.today())]
+    if open_rows.empty:
+        print("No open picks to settle.")
+        return
+    # One id lookup per distinct player, not per pick row
+    players = get_index()
+    keys = {}
+    for name in open_rows["player_id"].dropna().unique():
+        try:
+            keys[name] = players.resolve(name) or search_player_id(name)
+        except Exception as e:
+            print(f"Error resolving player {name}: {e}")
+    picks = open_rows.assign(player_key=open_rows["player_id"].map(keys), date=dates[open_rows.index])
+    game_dates = sorted(picks["date"].unique())
+    # A store passed in stays open for the caller; one opened here is closed
+    with nullcontext(store) if store is not None else GameLogStore() as store:
         try:
-            player = row["player_id"]
-            stat_type = row["stat_type"]
-            game_date = row["date"]
-            # Find the game for the player on that date
-            player_id = None
-            # Use balldontlie to get player id
-            player_search = requests.get(f"{BALLDONTLIE_BASE_URL}players", params={"search": player})
-            player_search.raise_for_status()
-            pdata = player_search.json()["data"]
-            if not pdata:
-                continue
-            player_id = pdata[0]["id"]
-            # Get all games for player on that date
-            stats = requests.get(f"{BALLDONTLIE_BASE_URL}stats", params={"player_ids[]": player_id, "dates[]": game_date, "per_page": 1}).json()["data"]
-            if not stats:
-                continue
-            stat_row = stats[0]
-            # Determine hit/miss
-            stat_map = {"PTS": "pts", "REB": "reb", "AST": "ast", "PRA": None}
-            if stat_type == "PRA":
-                actual = stat_row["pts"] + stat_row["reb"] + stat_row["ast"]
-            else:
-                actual = stat_row[stat_map[stat_type]]
-            prop_line = float(row["prop_line"])
-            side = row["recommended_side"]
-            if (side == "Over" and actual > prop_line) or (side == "Under" and actual < prop_line):
-                df.at[idx, "final_result"] = "hit"
-            else:
-                df.at[idx, "final_result"] = "miss"
-            df.at[idx, "actual"] = actual
+            # Whole-league box scores per date, only for dates not already local
+            store.ensure_dates(game_dates)
         except Exception as e:
-            print(f"Error updating result for {row['player_id']} {row['stat_type']} {row['date']}: {e}")
+            print(f"Error fetching box scores for {game_dates}: {e}")
+        box = store.box_scores(game_dates)
+    result, actual = settle(picks, box)
+    settled = result.notna()
+    df.loc[settled[settled].index, "final_result"] = result[settled]
+    df.loc[settled[settled].index, "actual"] = actual[settled]
     df.to_csv(log_path, index=False)
-    print("Results updated.")
+    print(f"Results updated: {int(settled.sum())} of {len(picks)} open picks settled.")
 
 if __name__ == "__main__":
     update_results()